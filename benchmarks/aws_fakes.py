@@ -0,0 +1,391 @@
+"""
+In-memory stand-ins for the S3, DynamoDB, Textract, Bedrock and OpenSearch calls made by the Lambda handlers
+
+Only the operations the handlers use are implemented. The fakes are
+thread-safe so they can sit behind the concurrent download paths.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+from typing import Dict, List
+
+class FakeClientError(Exception):
+    """Stand-in for botocore's ClientError, carrying the same response shape"""
+
+    def __init__(self, code: str, operation: str):
+        super().__init__(f"An error occurred ({code}) when calling the {operation} operation")
+        self.response = {'Error': {'Code': code}}
+
+class FakeS3Client:
+    """Minimal S3 client keeping objects in a dict"""
+
+    def __init__(self):
+        self.objects: Dict[tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body=b'', **kwargs) -> Dict:
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+        if isinstance(Body, str):
+            Body = Body.encode()
+        etag = f'"{hashlib.md5(Body).hexdigest()}"'
+        with self._lock:
+            self.objects[(Bucket, Key)] = {
+                'Body': bytes(Body),
+                'ContentType': kwargs.get('ContentType', ''),
+                'ContentEncoding': kwargs.get('ContentEncoding', ''),
+                'Metadata': kwargs.get('Metadata', {}),
+                'ETag': etag
+            }
+        return {'ETag': etag}
+
+    def upload_fileobj(self, Fileobj, Bucket: str, Key: str, ExtraArgs: Dict = None, Config=None, **kwargs):
+        # Read in chunks like the real transfer manager rather than all at once
+        body = io.BytesIO()
+        for chunk in iter(lambda: Fileobj.read(1024 * 1024), b''):
+            body.write(chunk)
+        self.put_object(Bucket=Bucket, Key=Key, Body=body.getvalue(), **(ExtraArgs or {}))
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        with self._lock:
+            obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise FakeClientError('NoSuchKey', 'GetObject')
+        return {
+            'Body': io.BytesIO(obj['Body']),
+            'ContentType': obj['ContentType'],
+            'ContentEncoding': obj['ContentEncoding'],
+            'Metadata': obj['Metadata'],
+            'ContentLength': len(obj['Body']),
+            'ETag': obj['ETag']
+        }
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict:
+        with self._lock:
+            obj = self.objects.get((Bucket, Key))
+        if obj is None:
+            raise FakeClientError('404', 'HeadObject')
+        return {'ContentLength': len(obj['Body']), 'Metadata': obj['Metadata'], 'ETag': obj['ETag']}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = '', ContinuationToken: str = None,
+                        MaxKeys: int = 1000, **kwargs) -> Dict:
+        with self._lock:
+            keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+            start = int(ContinuationToken or 0)
+            page = [{'Key': key, 'ETag': self.objects[(Bucket, key)]['ETag'],
+                     'Size': len(self.objects[(Bucket, key)]['Body'])}
+                    for key in keys[start:start + MaxKeys]]
+        response = {'Contents': page, 'KeyCount': len(page), 'IsTruncated': start + MaxKeys < len(keys)}
+        if response['IsTruncated']:
+            response['NextContinuationToken'] = str(start + MaxKeys)
+        return response
+
+class FakeTable:
+    """Minimal DynamoDB Table resource for a single string partition key"""
+
+    def __init__(self, name: str, key_name: str, lock: threading.Lock):
+        self.name = name
+        self.key_name = key_name
+        self.items: Dict[str, Dict] = {}
+        self._lock = lock
+
+    def get_item(self, Key: Dict, **kwargs) -> Dict:
+        with self._lock:
+            item = self.items.get(Key[self.key_name])
+        return {'Item': dict(item)} if item is not None else {}
+
+    def put_item(self, Item: Dict, **kwargs) -> Dict:
+        with self._lock:
+            self.items[Item[self.key_name]] = dict(Item)
+        return {}
+
+    def batch_writer(self, **kwargs):
+        # Writes go straight through; the real writer buffers and retries them
+        return contextlib.nullcontext(self)
+
+    def update_item(self, Key: Dict, UpdateExpression: str,
+                    ExpressionAttributeNames: Dict = None,
+                    ExpressionAttributeValues: Dict = None, **kwargs) -> Dict:
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        assignments = re.match(r'\s*SET\s+(.*)$', UpdateExpression, re.IGNORECASE).group(1)
+        with self._lock:
+            item = self.items.setdefault(Key[self.key_name], dict(Key))
+            for assignment in assignments.split(','):
+                name, value = (part.strip() for part in assignment.split('='))
+                item[names.get(name, name)] = values[value]
+        return {}
+
+class FakeDynamoDBResource:
+    """Minimal boto3 DynamoDB service resource"""
+
+    def __init__(self, key_names: Dict[str, str] = None):
+        self.key_names = key_names or {}
+        self.tables: Dict[str, FakeTable] = {}
+        self._lock = threading.Lock()
+
+    def Table(self, name: str) -> FakeTable:
+        with self._lock:
+            if name not in self.tables:
+                self.tables[name] = FakeTable(name, self.key_names.get(name, 'document_id'), self._lock)
+            return self.tables[name]
+
+    def batch_get_item(self, RequestItems: Dict) -> Dict:
+        responses: Dict[str, List[Dict]] = {}
+        for table_name, request in RequestItems.items():
+            table = self.Table(table_name)
+            responses[table_name] = [
+                response['Item'] for response in map(table.get_item, request['Keys'])
+                if 'Item' in response
+            ]
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+def pdf_page_lines(pdf_bytes: bytes) -> List[List[str]]:
+    """Text-layer lines of each PDF page, standing in for Textract's OCR output"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = []
+    for page in reader.pages:
+        lines = [line.strip() for line in (page.extract_text() or '').splitlines() if line.strip()]
+        # Scanned pages have no text layer; Textract would still read something
+        pages.append(lines or ['Scanned page text recognised by OCR'])
+    return pages
+
+def document_page_lines(document: bytes) -> List[List[str]]:
+    """OCR stand-in: PDF text-layer lines, or the UTF-8 text held in a fake image"""
+    if document.startswith(b'%PDF'):
+        return pdf_page_lines(document)
+    return [document.decode('utf-8').splitlines()]
+
+def line_blocks(pages: List[List[str]], first_page: int = 1) -> List[Dict]:
+    """Textract-shaped PAGE and LINE blocks for the given page lines"""
+    blocks = []
+    for page_number, lines in enumerate(pages, start=first_page):
+        ids = [f"line-{page_number}-{i}" for i in range(len(lines))]
+        blocks.append({'Id': f"page-{page_number}", 'BlockType': 'PAGE', 'Page': page_number,
+                       'Relationships': [{'Type': 'CHILD', 'Ids': ids}]})
+        blocks.extend({'Id': block_id, 'BlockType': 'LINE', 'Text': line, 'Page': page_number}
+                      for block_id, line in zip(ids, lines))
+    return blocks
+
+class FakeTextractClient:
+    """Textract stand-in answering from PDFs held in a FakeS3Client
+
+    Fake images are plain UTF-8 text. Async jobs complete immediately; sync
+    calls sleep for latency_ms. With max_tps set, analyze_document calls
+    beyond that rate in any one-second window raise ThrottlingException;
+    analyzing any key in bad_keys raises UnsupportedDocumentException.
+    """
+
+    def __init__(self, s3_client: FakeS3Client, latency_ms: float = 0, page_size: int = 1000,
+                 max_tps: float = None, bad_keys: frozenset = frozenset()):
+        self.s3_client = s3_client
+        self.bad_keys = bad_keys
+        self.latency_ms = latency_ms
+        self.page_size = page_size
+        self.max_tps = max_tps
+        self.recent_calls: List[float] = []
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self.jobs: Dict[str, List[Dict]] = {}
+        self.tokens: Dict[str, str] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, operation: str):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def _document_bytes(self, location: Dict) -> bytes:
+        if 'Bytes' in location:
+            return location['Bytes']
+        s3_object = location['S3Object']
+        return self.s3_client.get_object(Bucket=s3_object['Bucket'], Key=s3_object['Name'])['Body'].read()
+
+    def _admit(self, operation: str):
+        """Reject a call beyond max_tps in the last second, like a Textract throttle"""
+        if not self.max_tps:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.recent_calls = [t for t in self.recent_calls if now - t < 1.0]
+            if len(self.recent_calls) >= self.max_tps:
+                self.calls['throttled'] = self.calls.get('throttled', 0) + 1
+                raise FakeClientError('ThrottlingException', operation)
+            self.recent_calls.append(now)
+
+    def analyze_document(self, Document: Dict, FeatureTypes: List[str] = None, **kwargs) -> Dict:
+        self._admit('AnalyzeDocument')
+        self._count('analyze_document')
+        if Document.get('S3Object', {}).get('Name') in self.bad_keys:
+            raise FakeClientError('UnsupportedDocumentException', 'AnalyzeDocument')
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            time.sleep(self.latency_ms / 1000)
+            return {'Blocks': line_blocks(document_page_lines(self._document_bytes(Document))[:1])}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def start_document_analysis(self, DocumentLocation: Dict, ClientRequestToken: str = None, **kwargs) -> Dict:
+        self._count('start_document_analysis')
+        # Like Textract, a repeated ClientRequestToken returns the original job
+        with self._lock:
+            if ClientRequestToken in self.tokens:
+                return {'JobId': self.tokens[ClientRequestToken]}
+            blocks = line_blocks(pdf_page_lines(self._document_bytes(DocumentLocation)))
+            job_id = f"job-{len(self.jobs) + 1:06d}"
+            self.jobs[job_id] = blocks
+            if ClientRequestToken:
+                self.tokens[ClientRequestToken] = job_id
+        return {'JobId': job_id}
+
+    def get_document_analysis(self, JobId: str, NextToken: str = None, **kwargs) -> Dict:
+        self._count('get_document_analysis')
+        blocks = self.jobs[JobId]
+        start = int(NextToken or 0)
+        response = {'JobStatus': 'SUCCEEDED', 'Blocks': blocks[start:start + self.page_size]}
+        if start + self.page_size < len(blocks):
+            response['NextToken'] = str(start + self.page_size)
+        return response
+
+class FakeBedrockClient:
+    """Bedrock runtime stand-in returning deterministic Titan-sized embeddings"""
+
+    def __init__(self, dimensions: int = 1536, latency_ms: float = 0):
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+        self.calls = 0
+        self._lock = threading.Lock()
+        # Only the first component varies, so building a response costs little
+        self._tail = ', '.join(f"{(i % 1000) / 1000}" for i in range(1, dimensions))
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        seed = int(hashlib.md5(json.loads(body)['inputText'].encode()).hexdigest()[:8], 16)
+        return {'body': io.BytesIO(f'{{"embedding": [{seed / 2 ** 32}, {self._tail}]}}'.encode())}
+
+class FakeOpenSearchIndices:
+    def __init__(self, client: 'FakeOpenSearchClient'):
+        self.client = client
+
+    def exists(self, index: str, **kwargs) -> bool:
+        return index in self.client.indices_created
+
+    def create(self, index: str, body: Dict = None, **kwargs) -> Dict:
+        self.client.indices_created.add(index)
+        self.client.mappings[index] = dict((body or {}).get('mappings', {}).get('properties', {}))
+        return {'acknowledged': True}
+
+    def get_mapping(self, index: str, **kwargs) -> Dict:
+        return {index: {'mappings': {'properties': dict(self.client.mappings.get(index, {}))}}}
+
+    def put_mapping(self, index: str, body: Dict, **kwargs) -> Dict:
+        self.client.mappings.setdefault(index, {}).update(body.get('properties', {}))
+        return {'acknowledged': True}
+
+class FakeOpenSearchClient:
+    """OpenSearch stand-in for bulk index/delete and term-filtered searches
+
+    Searches support term filters (alone or in a bool filter), size,
+    _source field lists and a single sort field with search_after. As in
+    OpenSearch, a term filter on a field mapped as text never matches a
+    whole value, while its .keyword sub-field does. Bulk requests sleep
+    latency_ms plus index_ms_per_doc per indexed document and are counted by
+    action and by serialised size; stored sources drop their embeddings.
+    """
+
+    def __init__(self, latency_ms: float = 0, index_ms_per_doc: float = 0):
+        self.latency_ms = latency_ms
+        self.index_ms_per_doc = index_ms_per_doc
+        self.indices_created = set()
+        self.mappings: Dict[str, Dict] = {}
+        self.indices = FakeOpenSearchIndices(self)
+        self.docs: Dict[tuple, Dict] = {}
+        self.actions: Dict[str, int] = {}
+        self.bulk_requests = 0
+        self.max_bulk_bytes = 0
+        self._lock = threading.Lock()
+
+    def bulk(self, body, **kwargs) -> Dict:
+        """Apply a bulk request given as a list of actions/sources or as NDJSON"""
+        if isinstance(body, str):
+            size = len(body)
+            body = [json.loads(line) for line in body.splitlines() if line]
+        else:
+            size = sum(len(json.dumps(line)) + 1 for line in body)
+        indexed = sum(1 for line in body if 'index' in line and len(line) == 1)
+        time.sleep((self.latency_ms + indexed * self.index_ms_per_doc) / 1000)
+        items = []
+        with self._lock:
+            self.bulk_requests += 1
+            self.max_bulk_bytes = max(self.max_bulk_bytes, size)
+            lines = iter(body)
+            for line in lines:
+                action, meta = next(iter(line.items()))
+                key = (meta['_index'], meta['_id'])
+                self.actions[action] = self.actions.get(action, 0) + 1
+                if action == 'delete':
+                    status = 200 if self.docs.pop(key, None) is not None else 404
+                elif action == 'update':
+                    partial = next(lines)['doc']
+                    status = 200 if key in self.docs else 404
+                    if status == 200:
+                        source = self.docs[key]
+                        # Objects are merged field by field, like a partial update
+                        self.docs[key] = {**source, **partial,
+                                          'metadata': {**source.get('metadata', {}), **partial.get('metadata', {})}}
+                else:
+                    # Vectors are never searched here; keeping them would swamp memory readings
+                    self.docs[key] = {k: v for k, v in next(lines).items() if k != 'embedding'}
+                    status = 201
+                items.append({action: {'_id': meta['_id'], 'status': status}})
+        return {'errors': False, 'items': items}
+
+    def _matches(self, source: Dict, query: Dict, mapping: Dict) -> bool:
+        if 'bool' in query:
+            return all(self._matches(source, clause, mapping) for clause in query['bool'].get('filter', []))
+        if 'term' in query:
+            field, value = next(iter(query['term'].items()))
+            if field.endswith('.keyword'):
+                field = field[:-len('.keyword')]
+            elif mapping.get(field, {}).get('type') == 'text':
+                return False
+            return source.get(field) == value
+        return True
+
+    def search(self, index: str, body: Dict, **kwargs) -> Dict:
+        mapping = self.mappings.get(index, {})
+        with self._lock:
+            hits = [(doc_id, source) for (doc_index, doc_id), source in self.docs.items()
+                    if doc_index == index and self._matches(source, body.get('query', {}), mapping)]
+        sort_field = next(iter(body['sort'][0])) if body.get('sort') else None
+        if sort_field:
+            hits.sort(key=lambda hit: hit[1].get(sort_field))
+            if body.get('search_after'):
+                hits = [hit for hit in hits if hit[1].get(sort_field) > body['search_after'][0]]
+        fields = body.get('_source')
+        page = [
+            {
+                '_id': doc_id,
+                '_source': {field: source.get(field) for field in fields} if isinstance(fields, list) else source,
+                **({'sort': [source.get(sort_field)]} if sort_field else {})
+            }
+            for doc_id, source in hits[:body.get('size', 10)]
+        ]
+        return {'hits': {'total': {'value': len(hits)}, 'hits': page}}
+
+    def document_count(self, index: str, document_id: str) -> int:
+        with self._lock:
+            return sum(1 for (doc_index, _), source in self.docs.items()
+                       if doc_index == index and source.get('document_id') == document_id)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+TextChunker.chunk_text on a large regulation text
+
+Generates --megabytes of numbered regulation paragraphs and chunks them with
+the previous string-concatenating chunker (reproduced below) and with the
+offset-based TextChunker, by characters (1000 with 200 overlap, the
+vectorize_content defaults) and by a token budget with a margin under the
+Titan input limit. Reports time, peak traced memory, how full the chunks are and how
+many exceed the size limit.
+
+Usage:
+    python benchmarks/bench_chunker.py --megabytes 5 --max-tokens 6000
+"""
+
+import argparse
+import hashlib
+import random
+import re
+import time
+import tracemalloc
+
+from lambda_loader import load_lambda_app
+
+def regulation_text(megabytes: float) -> str:
+    words = ('relevant entity must ensure that the board and senior management maintain '
+             'oversight of technology risk outsourcing arrangements customer data within '
+             'the period specified by the Authority under paragraph').split()
+    rng = random.Random(3)
+    paragraphs = []
+    size = 0
+    while size < megabytes * 1024 * 1024:
+        section = len(paragraphs) // 12 + 1
+        sentences = [' '.join(rng.choice(words) for _ in range(rng.randint(8, 30))).capitalize() + '.'
+                     for _ in range(rng.randint(1, 5))]
+        paragraph = f"{section}.{len(paragraphs) % 12 + 1} " + ' '.join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 1
+    return '\n'.join(paragraphs)
+
+def legacy_chunk_text(text: str, chunk_size: int, overlap: int) -> list:
+    """The chunker before the offset rewrite, less logging"""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', ' ', text).strip()
+    sentences = [s.strip() for s in re.split(r'[.!?]+(?=\s|$)', text) if s.strip()]
+
+    def overlap_text(chunk):
+        words = chunk.split()
+        return " ".join(words[-overlap//10:] if len(words) > overlap//10 else words)
+
+    chunks = []
+    current_chunk = ""
+    current_length = 0
+    for sentence in sentences:
+        if current_length + len(sentence) > chunk_size and current_chunk:
+            chunks.append({'text': current_chunk.strip(),
+                           'chunk_id': hashlib.md5(current_chunk.encode()).hexdigest()[:16]})
+            current_chunk = overlap_text(current_chunk) + " " + sentence
+            current_length = len(current_chunk)
+        else:
+            current_chunk += " " + sentence if current_chunk else sentence
+            current_length += len(sentence)
+    if current_chunk.strip():
+        chunks.append({'text': current_chunk.strip(),
+                       'chunk_id': hashlib.md5(current_chunk.encode()).hexdigest()[:16]})
+    return chunks
+
+def measure(chunk, repeat: int) -> dict:
+    """Best of repeat untraced timings, then one traced run for peak memory"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = chunk()
+        seconds.append(time.perf_counter() - start)
+    del chunks
+    tracemalloc.start()
+    chunks = chunk()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': min(seconds), 'peak_mb': peak / 1024 / 1024, 'chunks': chunks}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--megabytes', type=float, default=5)
+    parser.add_argument('--max-tokens', type=int, default=6000, help='token budget (Titan accepts 8192; leave a margin)')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N timings')
+    args = parser.parse_args()
+
+    app = load_lambda_app('vectorize_content', {})
+    app.logger.setLevel('WARNING')
+    text = regulation_text(args.megabytes)
+
+    print("🧪 Chunking a regulation text")
+    print("=" * 72)
+    print(f"   {len(text) / 1024 / 1024:.1f} MB, {text.count(chr(10)) + 1} paragraphs")
+    print(f"\n   {'sizing':24s} {'chunker':8s} {'seconds':>8s} {'MB/s':>6s} {'peak MB':>8s} "
+          f"{'chunks':>7s} {'mean fill':>9s} {'oversized':>9s}")
+
+    for sizing, chunker in (('1000 chars, 200 overlap', app.TextChunker()),
+                            (f"{args.max_tokens} tokens, 50 overlap",
+                             app.TextChunker(overlap=50, max_tokens=args.max_tokens))):
+        for name, chunk in (('legacy', lambda: legacy_chunk_text(text, chunker.max_chars, chunker.overlap_chars)),
+                            ('offsets', lambda: chunker.chunk_text(text))):
+            best = measure(chunk, args.repeat)
+            chunks = best['chunks']
+            fill = sum(len(c['text']) for c in chunks) / len(chunks) / chunker.max_chars
+            over = sum(len(c['text']) > chunker.max_chars for c in chunks)
+            print(f"   {sizing:24s} {name:8s} {best['seconds']:8.2f} {len(text) / 1024 / 1024 / best['seconds']:6.1f} "
+                  f"{best['peak_mb']:8.1f} {len(chunks):7d} {fill:9.1%} {over:9d}")
+            sizing = ''
+
+if __name__ == '__main__':
+    main()
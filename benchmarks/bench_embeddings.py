@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput of BedrockEmbeddings.generate_embeddings_batch
+
+Runs a local stand-in for the Bedrock runtime InvokeModel endpoint that
+sleeps --latency-ms per request and answers a --throttle-rate fraction of
+requests with ThrottlingException. The vectorize_content embedder talks to
+it through a real botocore client (SigV4, connection pool, error parsing),
+first serially (max in flight 1, the previous behaviour) and then with each
+--max-in-flight setting, and checks every run returns the same embeddings
+in the same order.
+
+The cache runs then embed the document, a revision with --revised-fraction
+of its chunks changed, and the same revision in a cold container (empty
+in-process LRU, warm DynamoDB table fake), reporting Bedrock calls and the
+cache hit rate.
+
+Usage:
+    python benchmarks/bench_embeddings.py --chunks 600 --latency-ms 60 --max-in-flight 4 8 16
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from aws_fakes import FakeDynamoDBResource
+from bench_warm_invocations import start
+from lambda_loader import load_lambda_app
+
+DIMENSIONS = 1536
+
+def serve_fake_bedrock(latency_ms: float, throttle_rate: float, ready):
+    """Answer InvokeModel like Titan embeddings, with injected latency and throttles"""
+    # The first component identifies the input, so callers can check ordering
+    tail = ', '.join(['0.001'] * (DIMENSIONS - 1))
+
+    class FakeBedrockHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; avoid Nagle/delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            time.sleep(latency_ms / 1000)
+            if random.random() < throttle_rate:
+                self._send(429, b'{"message": "Too many requests, please wait before trying again."}',
+                           {'x-amzn-ErrorType': 'ThrottlingException'})
+                return
+            text = request['inputText']
+            body = f'{{"embedding": [{len(text) + sum(map(ord, text[:32])) / 1e4}, {tail}], ' \
+                   f'"inputTextTokenCount": {len(text.split())}}}'
+            self._send(200, body.encode())
+
+        def _send(self, status: int, body: bytes, headers: dict = None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBedrockHandler)
+    server.daemon_threads = True
+    # Clients drop connections that answered with an error; not worth a traceback
+    server.handle_error = lambda request, client_address: None
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+def sample_chunks(count: int) -> list:
+    words = ('relevant entity must ensure administrative accounts security patches '
+             'cyber hygiene notice authority outsourcing risk management').split()
+    rng = random.Random(7)
+    return [f"{i}. " + ' '.join(rng.choice(words) for _ in range(150)) for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunks', type=int, default=600)
+    parser.add_argument('--latency-ms', type=float, default=60, help='latency of one InvokeModel call')
+    parser.add_argument('--throttle-rate', type=float, default=0.02, help='fraction of calls throttled')
+    parser.add_argument('--max-in-flight', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--revised-fraction', type=float, default=0.05, help='chunks changed by the revision')
+    args = parser.parse_args()
+
+    # SigV4 signing needs credentials even though the local server ignores them
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    endpoint = start(serve_fake_bedrock, latency_ms=args.latency_ms, throttle_rate=args.throttle_rate)
+
+    app = load_lambda_app('vectorize_content', {
+        'EMBEDDING_MAX_IN_FLIGHT': str(max(args.max_in_flight)),
+        # The fake has no rate limit of its own; throttles come from --throttle-rate
+        'BEDROCK_EMBED_TPS': '10000',
+        'BEDROCK_BACKOFF_BASE_MS': '50'
+    })
+    app.logger.setLevel('WARNING')
+    app.aws_clients.get_client('bedrock-runtime', endpoint, config={
+        'retries': {'mode': 'standard', 'total_max_attempts': 1},
+        'max_pool_connections': max(10, max(args.max_in_flight))
+    })
+    app.bedrock_client = app.aws_clients.get_client('bedrock-runtime', endpoint)
+    texts = sample_chunks(args.chunks)
+
+    print("🧪 Bedrock embedding batch")
+    print("=" * 72)
+    print(f"   {args.chunks} chunks, InvokeModel {args.latency_ms:.0f} ms, "
+          f"{args.throttle_rate:.0%} of calls throttled")
+    print(f"\n   {'max in flight':>13s} {'seconds':>8s} {'chunks/s':>9s} {'speedup':>8s} "
+          f"{'throttles':>9s}  ordered")
+
+    baseline = None
+    for max_in_flight in [1] + args.max_in_flight:
+        embedder = app.BedrockEmbeddings(max_in_flight=max_in_flight)
+        app.throttling.reset()
+        start_time = time.perf_counter()
+        embeddings = embedder.generate_embeddings_batch(texts)
+        elapsed = time.perf_counter() - start_time
+        stats = app.throttling.get_limiter('bedrock.invoke_model', 1).stats()
+
+        firsts = [embedding[0] for embedding in embeddings]
+        if baseline is None:
+            baseline = (elapsed, firsts)
+        print(f"   {max_in_flight:13d} {elapsed:8.2f} {len(texts) / elapsed:9.1f} {baseline[0] / elapsed:7.1f}x "
+              f"{stats['throttles']:9d}  {'yes' if firsts == baseline[1] else 'NO'}")
+
+
+    cache_table = 'benchmark-embedding-cache'
+    app.dynamodb = FakeDynamoDBResource({cache_table: 'cache_key'})
+    app.EmbeddingCache._memory.clear()
+    embedder = app.BedrockEmbeddings(max_in_flight=max(args.max_in_flight),
+                                     cache=app.EmbeddingCache(cache_table, max_entries=len(texts) * 2))
+    step = max(1, round(1 / args.revised_fraction))
+    revised = [text + ' (amended)' if i % step == 0 else text for i, text in enumerate(texts)]
+
+    print(f"\n   {'embedding cache run':34s} {'seconds':>8s} {'Bedrock calls':>13s} {'hit rate':>9s}")
+    for name, batch, cold in (('first version', texts, False),
+                              (f"revision ({args.revised_fraction:.0%} of chunks changed)", revised, False),
+                              ('same revision, cold container', revised, True)):
+        if cold:
+            app.EmbeddingCache._memory.clear()
+        app.throttling.reset()
+        start_time = time.perf_counter()
+        embedder.generate_embeddings_batch(batch)
+        elapsed = time.perf_counter() - start_time
+        calls = app.throttling.get_limiter('bedrock.invoke_model', 1).stats()['calls']
+        print(f"   {name:34s} {elapsed:8.2f} {calls:13d} {embedder.cache.report()['hit_rate']:9.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for MASDocumentScraper link extraction
+
+Compares the original BeautifulSoup 'html.parser' full-tree parse against the
+SoupStrainer-restricted and lxml-backed extraction paths on saved MAS pages.
+
+Usage:
+    python benchmarks/bench_html_parsing.py [--repeat 20]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+
+from lambda_loader import FIXTURES_DIR, load_lambda_app
+
+def baseline_links(content: bytes):
+    """Link extraction as originally implemented: full html.parser tree"""
+    soup = BeautifulSoup(content, 'html.parser')
+    links = []
+    for anchor in soup.find_all('a', href=True):
+        title = anchor.get_text(strip=True) or anchor.get('title', 'Unknown Document')
+        links.append((anchor.get('href'), title))
+    return links
+
+def time_call(func, content: bytes, repeat: int) -> list:
+    """Return per-call wall times in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    app = load_lambda_app('mas_monitor', {'MAS_DOCS_BUCKET': 'benchmark-bucket'})
+    scraper = app.MASDocumentScraper()
+    
+    candidates = {
+        'html.parser (baseline)': baseline_links,
+        'html.parser + SoupStrainer': lambda c: scraper.extract_links(c, parser='html.parser'),
+        'lxml tree (default)': lambda c: scraper.extract_links(c, parser='lxml'),
+    }
+    
+    print("🧪 MAS link extraction benchmark")
+    print("=" * 60)
+    
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'mas', '*.html'))):
+        with open(path, 'rb') as f:
+            content = f.read()
+        
+        expected = baseline_links(content)
+        print(f"\n📄 {os.path.basename(path)} ({len(content) / 1024:.0f} KiB, {len(expected)} links)")
+        
+        baseline_ms = None
+        for name, func in candidates.items():
+            if func(content) != expected:
+                print(f"   ❌ {name}: extracted links differ from baseline")
+                continue
+            timings = time_call(func, content, args.repeat)
+            median_ms = statistics.median(timings)
+            baseline_ms = baseline_ms or median_ms
+            print(f"   ⏱️  {name:<28} median {median_ms:8.2f} ms  ({baseline_ms / median_ms:5.1f}x)")
+
+if __name__ == '__main__':
+    main()
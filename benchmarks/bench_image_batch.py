@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Bulk scan upload: per-record image processing vs batched image mode
+
+Uploads N page images (fake images holding their OCR text) under one
+folder of an in-memory S3 and processes them two ways against a fake
+Textract that sleeps --latency-ms per AnalyzeDocument call and throttles
+anything above --textract-tps:
+
+- per record: one process_document call per S3 record, one after another,
+  as the handler's record loop did, producing a processed document per page
+- batched: the _UPLOAD_COMPLETE marker's record, processed as a single
+  upload with --concurrency analyze_document calls in flight under the
+  shared TPS limiter, producing one combined processed document
+
+--bad-pages images are rejected by Textract; the batch reports them and
+saves the remaining pages.
+
+Usage:
+    python benchmarks/bench_image_batch.py --images 200 --latency-ms 400 --textract-tps 10 --bad-pages 2
+"""
+
+import argparse
+import json
+import time
+
+from aws_fakes import FakeS3Client, FakeTextractClient
+from lambda_loader import load_lambda_app
+
+RAW_BUCKET = 'benchmark-raw'
+PROCESSED_BUCKET = 'benchmark-processed'
+UPLOAD_PREFIX = 'scans/upload-0001/'
+
+def page_image(page: int) -> bytes:
+    """A fake scanned page: its OCR lines as UTF-8 text"""
+    section = (page - 1) // 10 + 1
+    lines = [f"{section} Scanned Requirements {section}"] if page % 10 == 1 else []
+    lines += [
+        f"{section}.{page} A relevant entity must keep records of page {page} of the scanned annex.",
+        "It must produce them to the Authority on request."
+    ]
+    return '\n'.join(lines).encode('utf-8')
+
+def s3_record(key: str, etag: str) -> dict:
+    return {
+        'eventSource': 'aws:s3',
+        's3': {'bucket': {'name': RAW_BUCKET}, 'object': {'key': key, 'eTag': etag.strip('"')}}
+    }
+
+def upload(s3: FakeS3Client, images: int) -> list:
+    """Put the page images and return their S3 event records"""
+    records = []
+    for page in range(1, images + 1):
+        key = f"{UPLOAD_PREFIX}page-{page}.png"
+        etag = s3.put_object(Bucket=RAW_BUCKET, Key=key, Body=page_image(page))['ETag']
+        records.append(s3_record(key, etag))
+    return records
+
+def run(app, images: int, latency_ms: float, textract_tps: float, batched: bool, bad_pages: int = 0) -> dict:
+    s3 = FakeS3Client()
+    # Rejected pages are spread evenly through the upload
+    step = images // bad_pages if bad_pages else 0
+    bad_keys = frozenset(f"{UPLOAD_PREFIX}page-{step * n}.png" for n in range(1, bad_pages + 1))
+    textract = FakeTextractClient(s3, latency_ms=latency_ms, max_tps=textract_tps, bad_keys=bad_keys)
+    app.s3_client = s3
+    app.textract_client = textract
+    app.throttling.reset()
+    records = upload(s3, images)
+
+    start = time.perf_counter()
+    if batched:
+        marker = UPLOAD_PREFIX + app.IMAGE_BATCH_MARKER
+        etag = s3.put_object(Bucket=RAW_BUCKET, Key=marker, Body=b'')['ETag']
+        response = app.lambda_handler({'Records': [s3_record(marker, etag)]}, None)
+        failed = len(response['body']['results'][0]['result'].get('failed_pages', []))
+    else:
+        failed = 0
+        for record in records:
+            response = app.lambda_handler({'Records': [record]}, None)
+            failed += response['body']['records_failed']
+    elapsed = time.perf_counter() - start
+
+    outputs = [key for bucket, key in s3.objects if bucket == PROCESSED_BUCKET and key.endswith('.json')]
+    pages = sum(json.loads(s3.get_object(Bucket=PROCESSED_BUCKET, Key=key)['Body'].read())['page_count']
+                if batched else 1 for key in outputs)
+    return {
+        'seconds': elapsed,
+        'failed': failed,
+        'outputs': len(outputs),
+        'pages': pages,
+        'throttled': textract.calls.get('throttled', 0),
+        'in_flight': textract.max_in_flight
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=400, help='latency of one AnalyzeDocument call')
+    parser.add_argument('--textract-tps', type=float, default=10, help='fake Textract AnalyzeDocument limit')
+    parser.add_argument('--concurrency', type=int, default=8, help='IMAGE_BATCH_CONCURRENCY')
+    parser.add_argument('--bad-pages', type=int, default=0, help='images Textract rejects')
+    args = parser.parse_args()
+
+    app = load_lambda_app('textract_processor', {
+        'PROCESSED_DOCS_BUCKET': PROCESSED_BUCKET,
+        'TEXTRACT_ANALYZE_TPS': str(args.textract_tps),
+        'IMAGE_BATCH_CONCURRENCY': str(args.concurrency)
+    })
+    app.logger.setLevel('WARNING')
+    # Metrics records go to stdout; keep the report readable
+    app.throttling.emit_metrics = lambda namespace, reset=True: None
+
+    print("🧪 Bulk image upload")
+    print("=" * 72)
+    print(f"   {args.images} images, AnalyzeDocument {args.latency_ms:.0f} ms, "
+          f"Textract limit {args.textract_tps:.0f} TPS, batch concurrency {args.concurrency}")
+
+    serial = run(app, args.images, args.latency_ms, args.textract_tps, batched=False, bad_pages=args.bad_pages)
+    batched = run(app, args.images, args.latency_ms, args.textract_tps, batched=True, bad_pages=args.bad_pages)
+
+    for name, result in (('per record', serial), ('batched', batched)):
+        print(f"\n📊 {name}")
+        print(f"   {result['seconds']:7.2f} s, {result['outputs']} processed documents, "
+              f"{result['pages']} pages, {result['failed']} failed pages")
+        print(f"   {result['throttled']} throttled calls, {result['in_flight']} max in flight")
+    print(f"\n   speedup {serial['seconds'] / batched['seconds']:.1f}x "
+          f"(floor at {args.textract_tps:.0f} TPS: {args.images / args.textract_tps:.1f} s)")
+
+if __name__ == '__main__':
+    main()
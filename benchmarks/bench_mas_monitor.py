@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the mas_monitor Lambda
+
+Starts the local MAS replay server in a separate process, swaps the handler's
+S3 and DynamoDB clients for in-memory fakes and runs lambda_handler against N
+synthetic documents. Reports documents/sec, p50/p95 per-document download
+latency and peak RSS. A second run shows the cost of an incremental run where
+nothing has changed.
+
+The small-budget runs then start over with CRAWL_PAGE_BUDGET set to
+--small-budget, too few pages to crawl every listing in one run, and repeat
+the handler until a run finds nothing new. Every document must still end up
+in S3: runs cut short by the budget resume where they stopped.
+
+Usage:
+    python benchmarks/bench_mas_monitor.py --documents 300 --latency-ms 20 --concurrency 8
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import threading
+import time
+
+from aws_fakes import FakeDynamoDBResource, FakeS3Client
+from lambda_loader import load_lambda_app
+from mas_replay_server import LISTINGS, PAGE_SIZE, serve
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=20, help='latency injected per HTTP request')
+    parser.add_argument('--pdf-kb', type=int, default=256, help='size of each synthetic PDF')
+    parser.add_argument('--concurrency', type=int, default=8, help='DOWNLOAD_CONCURRENCY')
+    parser.add_argument('--per-host', type=int, default=8, help='MAX_REQUESTS_PER_HOST')
+    parser.add_argument('--small-budget', type=int, default=3, help='CRAWL_PAGE_BUDGET of the small-budget runs')
+    parser.add_argument('--max-runs', type=int, default=20, help='cap on small-budget runs')
+    args = parser.parse_args()
+
+    ready = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve,
+        kwargs={
+            'documents': args.documents,
+            'latency_ms': args.latency_ms,
+            'pdf_bytes': args.pdf_kb * 1024,
+            'ready': ready
+        },
+        daemon=True
+    )
+    server.start()
+    base_url = f"http://127.0.0.1:{ready.get(timeout=10)}"
+
+    pages_needed = len(LISTINGS) * (args.documents // (PAGE_SIZE * len(LISTINGS)) + 2)
+    app = load_lambda_app('mas_monitor', {
+        'MAS_DOCS_BUCKET': 'benchmark-mas-docs',
+        'TRACKING_TABLE': 'benchmark-tracking',
+        'MAS_BASE_URL': base_url,
+        'DOWNLOAD_CONCURRENCY': str(args.concurrency),
+        'MAX_REQUESTS_PER_HOST': str(args.per_host),
+        'CRAWL_PAGE_BUDGET': str(pages_needed)
+    })
+    app.s3_client = FakeS3Client()
+    app.dynamodb = FakeDynamoDBResource()
+
+    # Time every document download as the handler performs it
+    latencies = []
+    latencies_lock = threading.Lock()
+    download_document = app.DocumentDownloader.download_document
+
+    def timed_download(self, doc_info):
+        start = time.perf_counter()
+        try:
+            return download_document(self, doc_info)
+        finally:
+            with latencies_lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    app.DocumentDownloader.download_document = timed_download
+
+    print("🧪 mas_monitor offline benchmark")
+    print("=" * 60)
+    print(f"   {args.documents} documents, {args.pdf_kb} KiB each, {args.latency_ms:.0f} ms injected latency")
+    print(f"   concurrency {args.concurrency}, {args.per_host} per host")
+    rss_before = peak_rss_mb()
+
+    try:
+        for label in ('cold run', 'incremental run'):
+            latencies.clear()
+            start = time.perf_counter()
+            result = app.lambda_handler({}, None)
+            elapsed = time.perf_counter() - start
+            body = result['body']
+
+            print(f"\n📊 {label}: status {result['statusCode']} in {elapsed:.2f} s")
+            print(f"   found {body.get('total_documents_found', 0)}, "
+                  f"new {body.get('new_documents_downloaded', 0)}, "
+                  f"unchanged {body.get('unchanged_documents', 0)}, "
+                  f"failed {body.get('failed_downloads', 0)}")
+            if latencies:
+                print(f"   ⚡ {len(latencies) / elapsed:.1f} documents/sec")
+                print(f"   ⏱️  per document p50 {statistics.median(latencies):.1f} ms, "
+                      f"p95 {percentile(latencies, 95):.1f} ms")
+        print(f"\n💾 Peak RSS {peak_rss_mb():.1f} MiB (after imports {rss_before:.1f} MiB)")
+        print(f"   {len(app.s3_client.objects)} objects in fake S3")
+
+        small = load_lambda_app('mas_monitor', {'CRAWL_PAGE_BUDGET': str(args.small_budget)})
+        small.s3_client = FakeS3Client()
+        small.dynamodb = FakeDynamoDBResource()
+        print(f"\n📊 page budget {args.small_budget}: new documents per run")
+        runs = []
+        for _ in range(args.max_runs):
+            body = small.lambda_handler({}, None)['body']
+            runs.append(body.get('new_documents_downloaded', 0))
+            if not body.get('total_documents_found'):
+                break
+        stored = len(small.s3_client.objects)
+        print(f"   {runs}")
+        print(f"   {stored} of {args.documents} documents in fake S3 after {len(runs)} runs"
+              f"{'' if stored == args.documents else ' ❌'}")
+    finally:
+        server.terminate()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Wall time of the PDF text-layer fast path vs the async Textract path
+
+Builds a small corpus from benchmarks/fixtures/mas/sample.pdf: the fixture
+itself, 50- and 300-page notices assembled from its pages, and a notice with
+two scanned (image-only) pages. Each document goes through
+TextractProcessor.process_document twice against in-memory S3/Textract fakes:
+
+- fast path: local text-layer extraction, scanned pages sent to sync
+  AnalyzeDocument (each call sleeps --sync-latency-ms)
+- Textract path: StartDocumentAnalysis plus result handling. The async job
+  itself is not run; its duration is modelled as --job-overhead-s plus
+  --job-seconds-per-page and added to the measured handling time.
+
+Usage:
+    python benchmarks/bench_pdf_text_layer.py --job-overhead-s 20 --job-seconds-per-page 0.5
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from aws_fakes import FakeS3Client, FakeTextractClient
+from lambda_loader import FIXTURES_DIR, load_lambda_app
+
+def add_scanned_page(writer: PdfWriter):
+    """Append a page that only draws an image, like a scanned sheet"""
+    page = writer.add_blank_page(612, 792)
+    image = DecodedStreamObject()
+    image.set_data(b'\x80')
+    image.update({
+        NameObject('/Type'): NameObject('/XObject'),
+        NameObject('/Subtype'): NameObject('/Image'),
+        NameObject('/Width'): NumberObject(1),
+        NameObject('/Height'): NumberObject(1),
+        NameObject('/ColorSpace'): NameObject('/DeviceGray'),
+        NameObject('/BitsPerComponent'): NumberObject(8)
+    })
+    page[NameObject('/Resources')] = DictionaryObject({
+        NameObject('/XObject'): DictionaryObject({NameObject('/Im0'): writer._add_object(image)})
+    })
+    content = DecodedStreamObject()
+    content.set_data(b'q 612 0 0 792 0 0 cm /Im0 Do Q')
+    page[NameObject('/Contents')] = writer._add_object(content)
+
+def build_pdf(source: PdfReader, pages: int, scanned_pages: int = 0) -> bytes:
+    writer = PdfWriter()
+    for index in range(pages):
+        writer.add_page(source.pages[index % len(source.pages)])
+    for _ in range(scanned_pages):
+        add_scanned_page(writer)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def build_corpus() -> dict:
+    path = os.path.join(FIXTURES_DIR, 'mas', 'sample.pdf')
+    with open(path, 'rb') as f:
+        sample = f.read()
+    source = PdfReader(io.BytesIO(sample))
+    return {
+        'sample.pdf': sample,
+        'notice-50p.pdf': build_pdf(source, 50),
+        'notice-300p.pdf': build_pdf(source, 300),
+        'notice-scanned-annex.pdf': build_pdf(source, 20, scanned_pages=2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync-latency-ms', type=float, default=1500, help='latency of one AnalyzeDocument call')
+    parser.add_argument('--job-overhead-s', type=float, default=20, help='modelled async job queue/start time')
+    parser.add_argument('--job-seconds-per-page', type=float, default=0.5, help='modelled async job time per page')
+    args = parser.parse_args()
+
+    app = load_lambda_app('textract_processor', {'PROCESSED_DOCS_BUCKET': 'benchmark-processed'})
+    corpus = build_corpus()
+
+    print("🧪 PDF text-layer fast path vs Textract")
+    print("=" * 72)
+    print(f"   sync AnalyzeDocument {args.sync_latency_ms:.0f} ms/page; async job modelled as "
+          f"{args.job_overhead_s:.0f} s + {args.job_seconds_per_page:.2f} s/page")
+    print(f"\n   {'document':26s} {'pages':>5s} {'fast path':>11s} {'Textract':>11s} {'speedup':>8s}  method")
+
+    totals = [0.0, 0.0]
+    for name, pdf in corpus.items():
+        s3 = FakeS3Client()
+        s3.put_object(Bucket='benchmark-raw', Key=f"mas-documents/{name}", Body=pdf)
+        textract = FakeTextractClient(s3, latency_ms=args.sync_latency_ms)
+        processor = app.TextractProcessor()
+        processor.s3_client = s3
+        processor.textract_client = textract
+        pages = len(PdfReader(io.BytesIO(pdf)).pages)
+
+        app.PDF_TEXT_LAYER_FAST_PATH = True
+        start = time.perf_counter()
+        fast = processor.process_document('benchmark-raw', f"mas-documents/{name}")
+        fast_s = time.perf_counter() - start
+
+        # Outputs are content-addressed; drop them so the Textract path does not skip
+        s3.objects = {k: v for k, v in s3.objects.items() if k[0] != 'benchmark-processed'}
+        app.PDF_TEXT_LAYER_FAST_PATH = False
+        start = time.perf_counter()
+        job = processor.process_document('benchmark-raw', f"mas-documents/{name}")
+        processor.process_textract_completion(job['job_id'])
+        textract_s = time.perf_counter() - start + args.job_overhead_s + pages * args.job_seconds_per_page
+
+        totals[0] += fast_s
+        totals[1] += textract_s
+        print(f"   {name:26s} {pages:5d} {fast_s:9.2f} s {textract_s:9.2f} s {textract_s / fast_s:7.0f}x  "
+              f"{fast.get('extraction_method')} ({fast.get('pages_sent_to_textract')} OCR pages)")
+
+    print(f"\n📊 corpus total: fast path {totals[0]:.2f} s, Textract {totals[1]:.2f} s "
+          f"({totals[1] / totals[0]:.0f}x)")
+
+if __name__ == '__main__':
+    main()
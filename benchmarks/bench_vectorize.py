@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Re-vectorizing a revised document, and the streaming vectorize pipeline
+
+Builds a synthetic notice of --paragraphs numbered paragraphs under
+headings, segments it the way the Textract processor does, and vectorizes
+it into an in-memory OpenSearch fake. A revision then amends
+--amended-fraction of the paragraphs, drops a few and adds a few, and is
+vectorized again, from its own versioned S3 key, with
+INCREMENTAL_VECTORIZATION off (the previous behaviour) and on, and on
+again after an attempt that failed part-way, once some bulk requests had
+gone out. Each run reports chunks left on the old version's metadata and
+whether vectorizing the revision a second time is skipped. The embedding cache is disabled so Bedrock calls show
+what each mode embeds.
+
+The pipeline runs then vectorize a --stream-paragraphs notice from scratch
+with Bedrock taking --embed-latency-ms per call and OpenSearch
+--bulk-latency-ms per bulk request plus --index-ms-per-doc per vector: once the way vectorize_document used to
+(every chunk, then every embedding, then one bulk request, reproduced
+below) and once through the streaming pipeline. Peak memory comes from a
+second, tracemalloc-traced run, which is too slow to time.
+
+Usage:
+    python benchmarks/bench_vectorize.py --paragraphs 2000 --amended-fraction 0.05 --stream-paragraphs 3000
+"""
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from aws_fakes import FakeBedrockClient, FakeOpenSearchClient, line_blocks
+from lambda_loader import load_lambda_app
+
+OPENSEARCH_ENDPOINT = 'http://fake-opensearch'
+INDEX = 'documents'
+# Keys as the MAS monitor writes them: each revision under its download date
+SOURCE = 's3://benchmark-raw/mas-documents/2026/03/02/notice-626-v1.pdf'
+REVISED_SOURCE = 's3://benchmark-raw/mas-documents/2026/06/15/notice-626-v2.pdf'
+
+def build_pages(paragraphs: int, amended: set = frozenset(), removed: set = frozenset(),
+                added: int = 0, lines_per_page: int = 45) -> list:
+    """Page lines of a notice: a heading every 10 paragraphs, each paragraph 2-4 lines"""
+    rng = random.Random(11)
+    words = ('relevant entity must ensure that the board and senior management maintain '
+             'oversight of technology risk outsourcing arrangements customer data').split()
+    lines = []
+    for index in range(paragraphs + added):
+        section, paragraph = index // 10 + 1, index % 10 + 1
+        if paragraph == 1:
+            lines.append(f"{section} Requirements on Topic {section}")
+        body = [' '.join(rng.choice(words) for _ in range(14)) for _ in range(rng.randint(2, 4))]
+        if index in removed:
+            continue
+        if index in amended:
+            body[-1] += ' save where the Authority approves otherwise'
+        lines.append(f"{section}.{paragraph} {body[0]}")
+        lines.extend(body[1:])
+        lines[-1] += '.'
+    return [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+
+def processed_document(textract_app, pages: list, content_id: str, source: str = SOURCE) -> dict:
+    segmenter = textract_app.SectionSegmenter()
+    blocks = [block for block in line_blocks(pages) if block['BlockType'] == 'LINE']
+    segmenter.add_lines(blocks)
+    return {
+        'text': '\n'.join(block['Text'] for block in blocks),
+        'sections': segmenter.finish(),
+        'source_document': source,
+        'content_id': content_id
+    }
+
+def interrupt(vectorizer, app, windows: int):
+    """Fail embedding after windows windows, with bulk requests small enough to go out before then"""
+    embed = vectorizer.embeddings.generate_embeddings_batch
+    store = vectorizer.vector_store
+    calls = []
+
+    def failing(texts):
+        calls.append(len(texts))
+        if len(calls) > windows:
+            raise RuntimeError("Bedrock retries exhausted")
+        return embed(texts)
+
+    vectorizer.embeddings.generate_embeddings_batch = failing
+    store.bulk_indexer = lambda: app.BulkIndexer(store, max_bytes=64 * 1024)
+
+def run(app, search, original: dict, revision: dict, incremental: bool, interrupted: bool) -> dict:
+    bedrock = FakeBedrockClient()
+    app.bedrock_client = bedrock
+    app.VectorizationRegistry._local_entries.clear()
+    vectorizer = app.DocumentVectorizer()
+    vectorizer.embeddings.cache = app.EmbeddingCache(None, max_entries=0)
+
+    app.INCREMENTAL_VECTORIZATION = False
+    vectorizer.vectorize_document(original)
+
+    app.INCREMENTAL_VECTORIZATION = incremental
+    if interrupted:
+        interrupt(vectorizer, app, windows=2)
+        app.logger.setLevel('CRITICAL')
+        try:
+            vectorizer.vectorize_document(revision)
+        except RuntimeError:
+            pass
+        app.logger.setLevel('WARNING')
+        del vectorizer.embeddings.generate_embeddings_batch, vectorizer.vector_store.bulk_indexer
+    bedrock.calls = 0
+    search.actions = {}
+    start = time.perf_counter()
+    result = vectorizer.vectorize_document(revision)
+    elapsed = time.perf_counter() - start
+    if result['status'] == 'skipped':
+        result['document_id'] = vectorizer._generate_document_id(revision)
+
+    current = {chunk['chunk_id'] for chunk in vectorizer.chunker.chunk_sections(revision['text'], revision['sections'])}
+    indexed = search.document_count(INDEX, result['document_id'])
+    old_version = sum(1 for (index, _), source in search.docs.items()
+                      if index == INDEX and source.get('content_id') != revision['content_id'])
+    return {
+        'seconds': elapsed,
+        'chunks': len(current),
+        'bedrock_calls': bedrock.calls,
+        'indexed': search.actions.get('index', 0),
+        'updated': search.actions.get('update', 0),
+        'deleted': search.actions.get('delete', 0),
+        'stale': indexed - len(current),
+        'old_version': old_version,
+        'status': result['status'],
+        'repeat': vectorizer.vectorize_document(revision)['status']
+    }
+
+def vectorize_materialized(vectorizer, document: dict, document_id: str):
+    """vectorize_document before streaming, less logging and version checks"""
+    metadata = {'document_id': document_id, 'content_id': document['content_id']}
+    chunks = vectorizer.chunker.chunk_sections(document['text'], document['sections'], metadata)
+    embeddings = vectorizer.embeddings.generate_embeddings_batch([chunk['text'] for chunk in chunks])
+    store = vectorizer.vector_store
+    bulk_body = []
+    for chunk, embedding in zip(chunks, embeddings):
+        bulk_body.append({"index": {"_index": store.index_name, "_id": store._vector_id(document_id, chunk['chunk_id'])}})
+        bulk_body.append(store._vector_document(chunk, embedding, metadata))
+    # opensearch-py serialises a list body into one NDJSON string before sending
+    store.client.bulk(body='\n'.join(json.dumps(line) for line in bulk_body) + '\n')
+
+def run_pipeline(app, document: dict, embed_latency_ms: float, bulk_latency_ms: float, index_ms_per_doc: float,
+                 streaming: bool, traced: bool = False) -> dict:
+    search = FakeOpenSearchClient(latency_ms=bulk_latency_ms, index_ms_per_doc=index_ms_per_doc)
+    app.aws_clients.register_opensearch_client(OPENSEARCH_ENDPOINT, app.AWS_REGION, search)
+    app.OpenSearchVectorStore._verified_indices.clear()
+    app.bedrock_client = FakeBedrockClient(latency_ms=embed_latency_ms)
+    app.INCREMENTAL_VECTORIZATION = False
+    vectorizer = app.DocumentVectorizer()
+    vectorizer.embeddings.cache = app.EmbeddingCache(None, max_entries=0)
+
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if streaming:
+        document_id = vectorizer.vectorize_document(document)['document_id']
+    else:
+        document_id = vectorizer._generate_document_id(document)
+        vectorize_materialized(vectorizer, document, document_id)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if traced else 0
+    tracemalloc.stop()
+    return {
+        'seconds': elapsed,
+        'peak_mb': peak / 1024 / 1024,
+        'indexed': search.document_count(INDEX, document_id),
+        'requests': search.bulk_requests,
+        'max_bulk_mb': search.max_bulk_bytes / 1024 / 1024
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paragraphs', type=int, default=2000)
+    parser.add_argument('--amended-fraction', type=float, default=0.05)
+    parser.add_argument('--removed', type=int, default=10, help='paragraphs dropped by the revision')
+    parser.add_argument('--added', type=int, default=10, help='paragraphs appended by the revision')
+    parser.add_argument('--stream-paragraphs', type=int, default=3000, help='size of the pipeline runs\' notice')
+    parser.add_argument('--embed-latency-ms', type=float, default=30, help='latency of one InvokeModel call')
+    parser.add_argument('--bulk-latency-ms', type=float, default=100, help='fixed latency of one bulk request')
+    parser.add_argument('--index-ms-per-doc', type=float, default=2, help='bulk latency per indexed vector')
+    args = parser.parse_args()
+
+    textract_app = load_lambda_app('textract_processor', {'PROCESSED_DOCS_BUCKET': 'benchmark-processed'})
+    app = load_lambda_app('vectorize_content', {
+        'OPENSEARCH_ENDPOINT': OPENSEARCH_ENDPOINT,
+        # The fakes have no rate limit; pacing comes from --embed-latency-ms
+        'BEDROCK_EMBED_TPS': '10000'
+    })
+    textract_app.logger.setLevel('WARNING')
+    app.throttling.emit_metrics = lambda namespace, reset=True: None
+
+    rng = random.Random(5)
+    amended = set(rng.sample(range(args.paragraphs), int(args.paragraphs * args.amended_fraction)))
+    removed = set(rng.sample(sorted(set(range(args.paragraphs)) - amended), args.removed))
+    original = processed_document(textract_app, build_pages(args.paragraphs), 'v1')
+    revision = processed_document(textract_app, build_pages(args.paragraphs, amended, removed, args.added), 'v2',
+                                  REVISED_SOURCE)
+
+    print("🧪 Re-vectorizing a revised notice")
+    print("=" * 72)
+    print(f"   {args.paragraphs} paragraphs, {len(amended)} amended, {args.removed} removed, {args.added} added")
+    print(f"\n   {'mode':14s} {'status':>9s} {'chunks':>6s} {'Bedrock calls':>13s} {'indexed':>8s} {'updated':>8s} "
+          f"{'deleted':>8s} {'stale left':>10s} {'old version':>11s} {'seconds':>8s} {'repeat':>9s}")
+
+    for name, incremental, interrupted in (('full', False, False), ('incremental', True, False),
+                                           ('after failure', True, True)):
+        search = FakeOpenSearchClient()
+        app.aws_clients.register_opensearch_client(OPENSEARCH_ENDPOINT, app.AWS_REGION, search)
+        app.OpenSearchVectorStore._verified_indices.clear()
+        app.logger.setLevel('WARNING')
+        result = run(app, search, original, revision, incremental, interrupted)
+        print(f"   {name:14s} {result['status']:>9s} {result['chunks']:6d} {result['bedrock_calls']:13d} "
+              f"{result['indexed']:8d} {result['updated']:8d} {result['deleted']:8d} {result['stale']:10d} "
+              f"{result['old_version']:11d} {result['seconds']:8.2f} {result['repeat']:>9s}")
+
+    document = processed_document(textract_app, build_pages(args.stream_paragraphs), 'v1')
+    print(f"\n   {args.stream_paragraphs}-paragraph notice, InvokeModel {args.embed_latency_ms:.0f} ms, "
+          f"bulk {args.bulk_latency_ms:.0f} ms + {args.index_ms_per_doc:g} ms per vector")
+    print(f"\n   {'pipeline':12s} {'seconds':>8s} {'peak MB':>8s} {'indexed':>8s} {'bulk requests':>13s} "
+          f"{'largest MB':>10s}")
+    for name, streaming in (('materialized', False), ('streaming', True)):
+        latencies = (args.embed_latency_ms, args.bulk_latency_ms, args.index_ms_per_doc)
+        result = run_pipeline(app, document, *latencies, streaming)
+        result['peak_mb'] = run_pipeline(app, document, *latencies, streaming, traced=True)['peak_mb']
+        print(f"   {name:12s} {result['seconds']:8.2f} {result['peak_mb']:8.1f} {result['indexed']:8d} "
+              f"{result['requests']:13d} {result['max_bulk_mb']:10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Warm-invocation latency with and without the shared client registry
+
+"before" drops every cached client between invocations (aws_clients.reset()),
+reproducing handlers that build sessions, OpenSearch clients and index checks
+per call. "after" keeps the registry warm, as Lambda does between invocations.
+Both run against local servers that charge a fixed cost per new connection to
+stand in for the TCP/TLS handshake.
+
+Usage:
+    python benchmarks/bench_warm_invocations.py --invocations 20 --connect-latency-ms 40
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from aws_fakes import FakeDynamoDBResource, FakeS3Client
+from lambda_loader import load_lambda_app
+from mas_replay_server import serve
+
+def serve_fake_opensearch(connect_latency_ms: float, ready):
+    """Answer index-exists, mapping and search calls like an empty OpenSearch index"""
+
+    class FakeOpenSearchHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; avoid Nagle/delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(connect_latency_ms / 1000)
+            super().setup()
+
+        def do_HEAD(self):
+            self._send(b'')
+
+        def do_GET(self):
+            if self.path.endswith('/_mapping'):
+                index = self.path.split('/')[1]
+                self._send(json.dumps({index: {'mappings': {'properties': {'content_id': {'type': 'keyword'}}}}}).encode())
+            else:
+                self._send(b'{"hits": {"total": {"value": 0}, "hits": []}}')
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            self.do_GET()
+
+        def _send(self, body: bytes):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOpenSearchHandler)
+    server.daemon_threads = True
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+def start(target, **kwargs) -> str:
+    """Start a server process and return its base URL"""
+    ready = multiprocessing.Queue()
+    multiprocessing.Process(target=target, kwargs={**kwargs, 'ready': ready}, daemon=True).start()
+    return f"http://127.0.0.1:{ready.get(timeout=10)}"
+
+def measure(invoke, reset, invocations: int) -> list:
+    """Per-invocation latency in ms, resetting cached clients first if given"""
+    invoke()
+    timings = []
+    for _ in range(invocations):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        invoke()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def report(name: str, before: list, after: list):
+    before_ms, after_ms = statistics.median(before), statistics.median(after)
+    print(f"\n📊 {name}")
+    print(f"   before (per-invocation clients)  p50 {before_ms:7.1f} ms")
+    print(f"   after  (shared registry)         p50 {after_ms:7.1f} ms  ({before_ms / after_ms:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--invocations', type=int, default=20)
+    parser.add_argument('--connect-latency-ms', type=float, default=40)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    # SigV4 signing needs credentials even though the local servers ignore them
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+
+    mas_url = start(serve, documents=60, latency_ms=args.latency_ms,
+                    connect_latency_ms=args.connect_latency_ms)
+    opensearch_url = start(serve_fake_opensearch, connect_latency_ms=args.connect_latency_ms)
+
+    print("🧪 Warm-invocation benchmark")
+    print("=" * 60)
+    print(f"   {args.invocations} invocations, {args.connect_latency_ms:.0f} ms per new connection")
+
+    # mas_monitor: an incremental run (landing page 304, first listing pages)
+    mas_app = load_lambda_app('mas_monitor', {
+        'MAS_DOCS_BUCKET': 'benchmark-mas-docs',
+        'MAS_BASE_URL': mas_url
+    })
+    mas_app.s3_client = FakeS3Client()
+    mas_app.dynamodb = FakeDynamoDBResource()
+    aws_clients = mas_app.aws_clients
+
+    mas_invoke = lambda: mas_app.lambda_handler({}, None)
+    report('mas_monitor incremental run',
+           measure(mas_invoke, aws_clients.reset, args.invocations),
+           measure(mas_invoke, None, args.invocations))
+
+    # vectorize_content / opensearch_query: client construction, index check, one search
+    vector_app = load_lambda_app('vectorize_content', {'OPENSEARCH_ENDPOINT': opensearch_url})
+    query_app = load_lambda_app('opensearch_query', {'OPENSEARCH_ENDPOINT': opensearch_url})
+    query = json.dumps({'size': 1, 'query': {'match_all': {}}})
+
+    def opensearch_invoke():
+        vector_app.OpenSearchVectorStore()
+        query_app.OpenSearchQueryService().client.search(index='documents', body=query)
+
+    def opensearch_reset():
+        aws_clients.reset()
+        vector_app.OpenSearchVectorStore._verified_indices.clear()
+
+    report('OpenSearch store + query setup',
+           measure(opensearch_invoke, opensearch_reset, args.invocations),
+           measure(opensearch_invoke, None, args.invocations))
+
+if __name__ == '__main__':
+    main()
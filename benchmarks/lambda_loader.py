@@ -0,0 +1,32 @@
+"""
+Helpers for loading Lambda handler modules in local benchmarks
+"""
+
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_ROOT = os.path.join(REPO_ROOT, 'src', 'lambda')
+SHARED_LAYER_DIR = os.path.join(LAMBDA_ROOT, 'shared', 'python')
+FIXTURES_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'fixtures')
+
+def load_lambda_app(function_dir: str, env: dict = None):
+    """Import src/lambda/<function_dir>/app.py under a unique module name"""
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    for name, value in (env or {}).items():
+        os.environ[name] = value
+    
+    # Lambda puts the layer on the path under /opt/python
+    if SHARED_LAYER_DIR not in sys.path:
+        sys.path.insert(0, SHARED_LAYER_DIR)
+    app_dir = os.path.join(LAMBDA_ROOT, function_dir)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    
+    module_name = f"{function_dir}_app"
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(app_dir, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
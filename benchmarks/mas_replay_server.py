@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for www.mas.gov.sg
+
+Serves a synthetic site with N documents laid out like the MAS regulation
+pages: a landing page at /regulation, paginated listings under
+/regulation/<listing>?page=N (newest first) and a PDF per document. Saved
+fixture pages are replayed under /fixtures/<name>.html with their links
+rewritten to this server. Responses carry ETags and honour If-None-Match.
+
+Usage:
+    python benchmarks/mas_replay_server.py --documents 200 --port 8765
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from lambda_loader import FIXTURES_DIR
+
+LISTINGS = ['circulars', 'notices', 'guidelines']
+PAGE_SIZE = 20
+LANDING_PAGE_DOCUMENTS = 20
+
+def synthetic_pdf(doc_index: int, size_bytes: int) -> bytes:
+    """Build a small valid PDF, padded with comment lines to size_bytes"""
+    with open(os.path.join(FIXTURES_DIR, 'mas', 'sample.pdf'), 'rb') as f:
+        body = f.read()
+    padding = f"% document {doc_index}\n".encode()
+    if size_bytes > len(body):
+        filler = b'% ' + b'x' * 78 + b'\n'
+        padding += filler * ((size_bytes - len(body)) // len(filler))
+    return body + padding
+
+class MASSite:
+    """Synthetic MAS site content, generated once up front"""
+
+    def __init__(self, documents: int, pdf_bytes: int, revision: int = 0):
+        self.documents = documents
+        self.pdf_bytes = pdf_bytes
+        self.revision = revision
+        newest = date(2025, 6, 30)
+        # Documents are spread across listings, newest first within each
+        self.entries = [
+            {
+                'index': i,
+                'listing': LISTINGS[i % len(LISTINGS)],
+                'published': (newest - timedelta(days=i)).isoformat(),
+                'title': f"{LISTINGS[i % len(LISTINGS)][:-1].title()} {i:05d} on Technology Risk Management"
+            }
+            for i in range(documents)
+        ]
+
+    def landing_page(self) -> bytes:
+        return self._render('Regulation', self.entries[:LANDING_PAGE_DOCUMENTS])
+
+    def listing_page(self, listing: str, page: int) -> bytes:
+        entries = [e for e in self.entries if e['listing'] == listing]
+        start = (page - 1) * PAGE_SIZE
+        # Listing pages carry an undated header link that looks like a document
+        return self._render(listing.title(), entries[start:start + PAGE_SIZE],
+                            nav='<a href="/regulation/overview">Regulation Overview</a>')
+
+    def pdf(self, doc_index: int) -> bytes:
+        return synthetic_pdf(doc_index + self.revision * self.documents, self.pdf_bytes)
+
+    def _render(self, title: str, entries: list, nav: str = '') -> bytes:
+        cards = '\n'.join(
+            f'<article class="mas-search-card">'
+            f'<div class="mas-search-card__meta"><time datetime="{e["published"]}">{e["published"]}</time></div>'
+            f'<h3><a href="/-/media/mas/{e["listing"]}/{e["index"]:05d}.pdf">{e["title"]}</a></h3>'
+            f'</article>'
+            for e in entries
+        )
+        return (
+            f'<!DOCTYPE html><html><head><title>{title}</title></head><body>'
+            f'<nav><a href="/about-mas">About MAS</a>{nav}</nav>'
+            f'<main>{cards}</main></body></html>'
+        ).encode()
+
+def make_handler(site: MASSite, latency_ms: float, base_url: str, connect_latency_ms: float = 0):
+    """Build a request handler class bound to a site and injected latency"""
+
+    class MASReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; avoid Nagle/delayed-ACK stalls
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            # Runs once per connection; stands in for the TCP/TLS handshake
+            time.sleep(connect_latency_ms / 1000)
+            super().setup()
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            parsed = urlparse(self.path)
+            page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+            parts = [p for p in parsed.path.split('/') if p]
+
+            if parsed.path == '/regulation':
+                self._send(site.landing_page(), 'text/html; charset=utf-8')
+            elif len(parts) == 2 and parts[0] == 'regulation' and parts[1] in LISTINGS:
+                self._send(site.listing_page(parts[1], page), 'text/html; charset=utf-8')
+            elif parsed.path.startswith('/-/media/mas/') and parsed.path.endswith('.pdf'):
+                self._send(site.pdf(int(parts[-1][:-4])), 'application/pdf')
+            elif parts[:1] == ['fixtures'] and len(parts) == 2:
+                self._send_fixture(parts[1])
+            else:
+                self._send(b'Not found', 'text/plain', status=404)
+
+        def _send_fixture(self, name: str):
+            path = os.path.join(FIXTURES_DIR, 'mas', os.path.basename(name))
+            if not os.path.exists(path):
+                self._send(b'Not found', 'text/plain', status=404)
+                return
+            with open(path, 'rb') as f:
+                body = f.read().replace(b'https://www.mas.gov.sg', base_url.encode())
+            self._send(body, 'text/html; charset=utf-8')
+
+        def _send(self, body: bytes, content_type: str, status: int = 200):
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MASReplayHandler
+
+def serve(documents: int, port: int = 0, latency_ms: float = 0, pdf_bytes: int = 64 * 1024,
+          revision: int = 0, connect_latency_ms: float = 0, ready=None):
+    """Run the replay server until interrupted, reporting the bound port via ready"""
+    site = MASSite(documents, pdf_bytes, revision)
+    server = ThreadingHTTPServer(('127.0.0.1', port), None)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.RequestHandlerClass = make_handler(site, latency_ms, base_url, connect_latency_ms)
+    server.daemon_threads = True
+    if ready is not None:
+        ready.put(server.server_address[1])
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--connect-latency-ms', type=float, default=0)
+    parser.add_argument('--pdf-kb', type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"🌐 Serving {args.documents} synthetic MAS documents on http://127.0.0.1:{args.port}")
+    serve(args.documents, args.port, args.latency_ms, args.pdf_kb * 1024,
+          connect_latency_ms=args.connect_latency_ms)
+
+if __name__ == '__main__':
+    main()
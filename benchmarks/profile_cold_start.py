@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cold-start import profile for every Lambda handler
+
+Imports each src/lambda/<function>/app.py in a fresh interpreter under
+`python -X importtime`, the same work Lambda does in its init phase, and
+reports total import time, the heaviest modules and whether boto3 was pulled
+in before the first invocation. Also times the api_handler OPTIONS and
+/health paths in a fresh process and checks they never import boto3.
+
+Usage:
+    python benchmarks/profile_cold_start.py --top 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from lambda_loader import LAMBDA_ROOT, SHARED_LAYER_DIR
+
+FAST_PATH_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import app
+init_ms = (time.perf_counter() - start) * 1000
+timings = {}
+for name, event in (('OPTIONS', {'httpMethod': 'OPTIONS', 'path': '/gaps'}),
+                    ('GET /health', {'httpMethod': 'GET', 'path': '/health'})):
+    start = time.perf_counter()
+    status = app.lambda_handler(event, None)['statusCode']
+    timings[name] = {'ms': (time.perf_counter() - start) * 1000, 'status': status}
+print(json.dumps({'init_ms': init_ms, 'paths': timings, 'boto3': 'boto3' in sys.modules}))
+'''
+
+def handler_dirs() -> list:
+    return sorted(
+        name for name in os.listdir(LAMBDA_ROOT)
+        if name != 'shared' and os.path.exists(os.path.join(LAMBDA_ROOT, name, 'app.py'))
+    )
+
+def run_in_handler(function_dir: str, args: list) -> subprocess.CompletedProcess:
+    """Run the interpreter from a handler directory with the shared layer on the path"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SHARED_LAYER_DIR, env.get('PYTHONPATH')]))
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    return subprocess.run(
+        [sys.executable] + args,
+        cwd=os.path.join(LAMBDA_ROOT, function_dir),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+
+def parse_importtime(stderr: str) -> list:
+    """Parse `import time: self [us] | cumulative | name` lines into (name, self_us, cumulative_us)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def profile_handler(function_dir: str, top: int) -> dict:
+    result = run_in_handler(function_dir, ['-X', 'importtime', '-c', 'import app'])
+    entries = parse_importtime(result.stderr)
+    app_entry = next((e for e in entries if e[0] == 'app'), None)
+    # Top-level packages only: the name without leading indentation dots
+    top_level = [e for e in entries if not e[0].startswith('.') and e[0] != 'app']
+    return {
+        'ok': result.returncode == 0 and app_entry is not None,
+        'error': result.stderr.strip().splitlines()[-1] if result.returncode else '',
+        'total_ms': sum(e[1] for e in entries) / 1000,
+        'app_ms': app_entry[2] / 1000 if app_entry else 0.0,
+        'boto3': any(e[0].strip('. ') == 'boto3' for e in entries),
+        'heaviest': sorted(top_level, key=lambda e: e[2], reverse=True)[:top]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=5, help='heaviest imports to list per handler')
+    args = parser.parse_args()
+
+    print("🧊 Lambda cold-start import profile")
+    print("=" * 60)
+
+    for function_dir in handler_dirs():
+        profile = profile_handler(function_dir, args.top)
+        if not profile['ok']:
+            print(f"\n❌ {function_dir}: import failed ({profile['error']})")
+            continue
+        print(f"\n📦 {function_dir}: {profile['total_ms']:.1f} ms total imports, "
+              f"app.py {profile['app_ms']:.1f} ms, boto3 at init: {'yes' if profile['boto3'] else 'no'}")
+        for name, _, cumulative_us in profile['heaviest']:
+            print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+    result = run_in_handler('api_handler', ['-c', FAST_PATH_SCRIPT])
+    if result.returncode != 0:
+        print(f"\n❌ api_handler fast paths failed: {result.stderr.strip().splitlines()[-1]}")
+        return
+    fast = json.loads(result.stdout.strip().splitlines()[-1])
+    print(f"\n⚡ api_handler fast paths (init {fast['init_ms']:.1f} ms)")
+    for name, timing in fast['paths'].items():
+        print(f"   {name:12s} {timing['ms']:6.2f} ms  status {timing['status']}")
+    print(f"   boto3 imported: {'yes' if fast['boto3'] else 'no'}")
+
+if __name__ == '__main__':
+    main()
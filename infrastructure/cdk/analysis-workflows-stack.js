@@ -23,12 +23,20 @@ class AnalysisWorkflowsStack extends cdk.Stack {
         cdk.Tags.of(this).add('Component', 'AnalysisWorkflows');
     }
     createLambdaFunctions(gapsTable, amendmentsTable, vectorCollection, encryptionKey) {
+        // Shared client registry layer used by every handler (src/lambda/shared)
+        const sharedClientsLayer = new lambda.LayerVersion(this, 'SharedClientsLayer', {
+            layerVersionName: 'CompliAgent-SharedClients',
+            code: lambda.Code.fromAsset('../../src/lambda/shared'),
+            compatibleRuntimes: [lambda.Runtime.PYTHON_3_10],
+            description: 'Shared AWS and HTTP client registry for Lambda handlers',
+        });
         // OpenSearch Query Lambda
         this.opensearchQueryFunction = new lambda.Function(this, 'OpenSearchQueryFunction', {
             functionName: 'CompliAgent-OpenSearchQuery',
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/opensearch_query'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -68,6 +76,7 @@ class AnalysisWorkflowsStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/bedrock_gap_analysis'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(10),
             memorySize: 1024,
             environment: {
@@ -99,6 +108,7 @@ class AnalysisWorkflowsStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/bedrock_draft_amendments'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(10),
             memorySize: 1024,
             environment: {
@@ -130,6 +140,7 @@ class AnalysisWorkflowsStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/store_gaps'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -176,6 +187,7 @@ class AnalysisWorkflowsStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/retrieve_gap'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -219,6 +231,7 @@ class AnalysisWorkflowsStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/store_amendments'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -125,6 +125,16 @@ class CompliAgentStack extends cdk.Stack {
             partitionKey: { name: 'url', type: dynamodb.AttributeType.STRING },
             projectionType: dynamodb.ProjectionType.ALL,
         });
+        // Embeddings keyed by model and chunk-text hash; derived data, expired by TTL
+        const embeddingCacheTable = new dynamodb.Table(this, 'EmbeddingCacheTable', {
+            tableName: 'CompliAgent-EmbeddingCache',
+            partitionKey: { name: 'cache_key', type: dynamodb.AttributeType.STRING },
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            encryption: dynamodb.TableEncryption.CUSTOMER_MANAGED,
+            encryptionKey: this.encryptionKey,
+            removalPolicy: cdk.RemovalPolicy.DESTROY,
+            timeToLiveAttribute: 'expires_at',
+        });
         // Create OpenSearch Serverless security policies
         const encryptionPolicy = new opensearchserverless.CfnSecurityPolicy(this, 'VectorCEPolicy', {
             name: 'vector-ce-policy',
@@ -181,12 +191,20 @@ class CompliAgentStack extends cdk.Stack {
                 }),
             },
         });
+        // Shared client registry layer used by every handler (src/lambda/shared)
+        const sharedClientsLayer = new lambda.LayerVersion(this, 'SharedClientsLayer', {
+            layerVersionName: 'CompliAgent-SharedClients',
+            code: lambda.Code.fromAsset('../../src/lambda/shared'),
+            compatibleRuntimes: [lambda.Runtime.PYTHON_3_10],
+            description: 'Shared AWS and HTTP client registry for Lambda handlers',
+        });
         // Create MAS Monitor Lambda function
         const masMonitorFunction = new lambda.Function(this, 'MasMonitorFunction', {
             functionName: 'CompliAgent-MasMonitor',
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/mas_monitor'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(15),
             memorySize: 512,
             environment: {
@@ -206,6 +224,7 @@ class CompliAgentStack extends cdk.Stack {
                                 actions: [
                                     's3:PutObject',
                                     's3:PutObjectAcl',
+                                    's3:AbortMultipartUpload',
                                 ],
                                 resources: [this.masDocsRawBucket.arnForObjects('*')],
                             }),
@@ -213,6 +232,7 @@ class CompliAgentStack extends cdk.Stack {
                                 effect: iam.Effect.ALLOW,
                                 actions: [
                                     'dynamodb:GetItem',
+                                    'dynamodb:BatchGetItem',
                                     'dynamodb:PutItem',
                                     'dynamodb:UpdateItem',
                                     'dynamodb:Query',
@@ -254,12 +274,14 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/textract_processor'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(15),
             memorySize: 1024,
             environment: {
                 PROCESSED_DOCS_BUCKET: this.processedDocsJsonBucket.bucketName,
                 SNS_TOPIC_ARN: textractCompletionTopic.topicArn,
                 TEXTRACT_ROLE_ARN: textractServiceRole.roleArn,
+                TRACKING_TABLE: documentTrackingTable.tableName,
             },
             role: new iam.Role(this, 'TextractProcessorRole', {
                 assumedBy: new iam.ServicePrincipal('lambda.amazonaws.com'),
@@ -273,9 +295,12 @@ class CompliAgentStack extends cdk.Stack {
                                 effect: iam.Effect.ALLOW,
                                 actions: [
                                     's3:GetObject',
+                                    's3:ListBucket',
                                 ],
                                 resources: [
+                                    this.masDocsRawBucket.bucketArn,
                                     this.masDocsRawBucket.arnForObjects('*'),
+                                    this.internalDocsRawBucket.bucketArn,
                                     this.internalDocsRawBucket.arnForObjects('*'),
                                 ],
                             }),
@@ -286,6 +311,17 @@ class CompliAgentStack extends cdk.Stack {
                                 ],
                                 resources: [this.processedDocsJsonBucket.arnForObjects('*')],
                             }),
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    's3:GetObject',
+                                    's3:ListBucket',
+                                ],
+                                resources: [
+                                    this.processedDocsJsonBucket.bucketArn,
+                                    this.processedDocsJsonBucket.arnForObjects('*'),
+                                ],
+                            }),
                             new iam.PolicyStatement({
                                 effect: iam.Effect.ALLOW,
                                 actions: [
@@ -295,6 +331,15 @@ class CompliAgentStack extends cdk.Stack {
                                 ],
                                 resources: ['*'],
                             }),
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    'dynamodb:GetItem',
+                                    'dynamodb:PutItem',
+                                    'dynamodb:UpdateItem',
+                                ],
+                                resources: [documentTrackingTable.tableArn],
+                            }),
                             new iam.PolicyStatement({
                                 effect: iam.Effect.ALLOW,
                                 actions: [
@@ -321,11 +366,14 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/vectorize_content'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(15),
             memorySize: 1024,
             environment: {
                 OPENSEARCH_ENDPOINT: `https://${this.vectorCollection.attrCollectionEndpoint}`,
                 OPENSEARCH_INDEX: 'documents',
+                EMBEDDING_CACHE_TABLE: embeddingCacheTable.tableName,
+                TRACKING_TABLE: documentTrackingTable.tableName,
             },
             role: new iam.Role(this, 'VectorizeContentRole', {
                 assumedBy: new iam.ServicePrincipal('lambda.amazonaws.com'),
@@ -335,6 +383,22 @@ class CompliAgentStack extends cdk.Stack {
                 inlinePolicies: {
                     VectorizeContentPolicy: new iam.PolicyDocument({
                         statements: [
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    'dynamodb:BatchGetItem',
+                                    'dynamodb:BatchWriteItem',
+                                ],
+                                resources: [embeddingCacheTable.tableArn],
+                            }),
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    'dynamodb:GetItem',
+                                    'dynamodb:PutItem',
+                                ],
+                                resources: [documentTrackingTable.tableArn],
+                            }),
                             new iam.PolicyStatement({
                                 effect: iam.Effect.ALLOW,
                                 actions: [
@@ -372,6 +436,9 @@ class CompliAgentStack extends cdk.Stack {
         // Trigger Textract processor when new documents are uploaded to MAS docs bucket
         this.masDocsRawBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(textractProcessorFunction), { suffix: '.pdf' });
         this.internalDocsRawBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(textractProcessorFunction), { suffix: '.pdf' });
+        // A folder of scanned page images is processed as one document once its
+        // _UPLOAD_COMPLETE marker is written after the last image
+        this.internalDocsRawBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(textractProcessorFunction), { suffix: '_UPLOAD_COMPLETE' });
         // Trigger vectorization when processed documents are uploaded
         this.processedDocsJsonBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(vectorizeContentFunction), { prefix: 'textract-output/', suffix: '.json' });
         // Subscribe Textract processor to SNS topic for job completion notifications
@@ -423,6 +490,7 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/opensearch_query'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -462,6 +530,7 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/bedrock_gap_analysis'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(10),
             memorySize: 1024,
             environment: {
@@ -493,6 +562,7 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/store_gaps'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -624,6 +694,7 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/api_handler'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
@@ -757,6 +828,7 @@ class CompliAgentStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/websocket_handler'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(5),
             memorySize: 512,
             environment: {
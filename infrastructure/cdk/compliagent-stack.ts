@@ -179,6 +179,24 @@ export class CompliAgentStack extends cdk.Stack {
       projectionType: dynamodb.ProjectionType.ALL,
     });
 
+    // Embeddings keyed by model and chunk-text hash; derived data, expired by TTL
+    const embeddingCacheTable = new dynamodb.Table(
+      this,
+      "EmbeddingCacheTable",
+      {
+        tableName: "CompliAgent-EmbeddingCache",
+        partitionKey: {
+          name: "cache_key",
+          type: dynamodb.AttributeType.STRING,
+        },
+        billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+        encryption: dynamodb.TableEncryption.CUSTOMER_MANAGED,
+        encryptionKey: this.encryptionKey,
+        removalPolicy: cdk.RemovalPolicy.DESTROY,
+        timeToLiveAttribute: "expires_at",
+      }
+    );
+
     // Create OpenSearch Serverless security policies
     const encryptionPolicy = new opensearchserverless.CfnSecurityPolicy(
       this,
@@ -264,12 +282,25 @@ export class CompliAgentStack extends cdk.Stack {
       },
     });
 
+    // Shared client registry layer used by every handler (src/lambda/shared)
+    const sharedClientsLayer = new lambda.LayerVersion(
+      this,
+      "SharedClientsLayer",
+      {
+        layerVersionName: "CompliAgent-SharedClients",
+        code: lambda.Code.fromAsset("../../src/lambda/shared"),
+        compatibleRuntimes: [lambda.Runtime.PYTHON_3_10],
+        description: "Shared AWS and HTTP client registry for Lambda handlers",
+      }
+    );
+
     // Create MAS Monitor Lambda function
     const masMonitorFunction = new lambda.Function(this, "MasMonitorFunction", {
       functionName: "CompliAgent-MasMonitor",
       runtime: lambda.Runtime.PYTHON_3_10,
       handler: "app.lambda_handler",
       code: lambda.Code.fromAsset("../../src/lambda/mas_monitor"),
+      layers: [sharedClientsLayer],
       timeout: cdk.Duration.minutes(15),
       memorySize: 512,
       environment: {
@@ -288,13 +319,18 @@ export class CompliAgentStack extends cdk.Stack {
             statements: [
               new iam.PolicyStatement({
                 effect: iam.Effect.ALLOW,
-                actions: ["s3:PutObject", "s3:PutObjectAcl"],
+                actions: [
+                  "s3:PutObject",
+                  "s3:PutObjectAcl",
+                  "s3:AbortMultipartUpload",
+                ],
                 resources: [this.masDocsRawBucket.arnForObjects("*")],
               }),
               new iam.PolicyStatement({
                 effect: iam.Effect.ALLOW,
                 actions: [
                   "dynamodb:GetItem",
+                  "dynamodb:BatchGetItem",
                   "dynamodb:PutItem",
                   "dynamodb:UpdateItem",
                   "dynamodb:Query",
@@ -341,12 +377,14 @@ export class CompliAgentStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/textract_processor"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(15),
         memorySize: 1024,
         environment: {
           PROCESSED_DOCS_BUCKET: this.processedDocsJsonBucket.bucketName,
           SNS_TOPIC_ARN: textractCompletionTopic.topicArn,
           TEXTRACT_ROLE_ARN: textractServiceRole.roleArn,
+          TRACKING_TABLE: documentTrackingTable.tableName,
         },
         role: new iam.Role(this, "TextractProcessorRole", {
           assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
@@ -360,9 +398,11 @@ export class CompliAgentStack extends cdk.Stack {
               statements: [
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
-                  actions: ["s3:GetObject"],
+                  actions: ["s3:GetObject", "s3:ListBucket"],
                   resources: [
+                    this.masDocsRawBucket.bucketArn,
                     this.masDocsRawBucket.arnForObjects("*"),
+                    this.internalDocsRawBucket.bucketArn,
                     this.internalDocsRawBucket.arnForObjects("*"),
                   ],
                 }),
@@ -371,6 +411,14 @@ export class CompliAgentStack extends cdk.Stack {
                   actions: ["s3:PutObject"],
                   resources: [this.processedDocsJsonBucket.arnForObjects("*")],
                 }),
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: ["s3:GetObject", "s3:ListBucket"],
+                  resources: [
+                    this.processedDocsJsonBucket.bucketArn,
+                    this.processedDocsJsonBucket.arnForObjects("*"),
+                  ],
+                }),
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
                   actions: [
@@ -380,6 +428,15 @@ export class CompliAgentStack extends cdk.Stack {
                   ],
                   resources: ["*"],
                 }),
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: [
+                    "dynamodb:GetItem",
+                    "dynamodb:PutItem",
+                    "dynamodb:UpdateItem",
+                  ],
+                  resources: [documentTrackingTable.tableArn],
+                }),
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
                   actions: ["iam:PassRole"],
@@ -406,11 +463,14 @@ export class CompliAgentStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/vectorize_content"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(15),
         memorySize: 1024,
         environment: {
           OPENSEARCH_ENDPOINT: `https://${this.vectorCollection.attrCollectionEndpoint}`,
           OPENSEARCH_INDEX: "documents",
+          EMBEDDING_CACHE_TABLE: embeddingCacheTable.tableName,
+          TRACKING_TABLE: documentTrackingTable.tableName,
         },
         role: new iam.Role(this, "VectorizeContentRole", {
           assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
@@ -422,6 +482,16 @@ export class CompliAgentStack extends cdk.Stack {
           inlinePolicies: {
             VectorizeContentPolicy: new iam.PolicyDocument({
               statements: [
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: ["dynamodb:BatchGetItem", "dynamodb:BatchWriteItem"],
+                  resources: [embeddingCacheTable.tableArn],
+                }),
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: ["dynamodb:GetItem", "dynamodb:PutItem"],
+                  resources: [documentTrackingTable.tableArn],
+                }),
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
                   actions: ["s3:GetObject"],
@@ -465,6 +535,14 @@ export class CompliAgentStack extends cdk.Stack {
       { suffix: ".pdf" }
     );
 
+    // A folder of scanned page images is processed as one document once its
+    // _UPLOAD_COMPLETE marker is written after the last image
+    this.internalDocsRawBucket.addEventNotification(
+      s3.EventType.OBJECT_CREATED,
+      new s3n.LambdaDestination(textractProcessorFunction),
+      { suffix: "_UPLOAD_COMPLETE" }
+    );
+
     // Trigger vectorization when processed documents are uploaded
     this.processedDocsJsonBucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
@@ -534,6 +612,7 @@ export class CompliAgentStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/opensearch_query"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(5),
         memorySize: 512,
         environment: {
@@ -578,6 +657,7 @@ export class CompliAgentStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/bedrock_gap_analysis"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(10),
         memorySize: 1024,
         environment: {
@@ -613,6 +693,7 @@ export class CompliAgentStack extends cdk.Stack {
       runtime: lambda.Runtime.PYTHON_3_10,
       handler: "app.lambda_handler",
       code: lambda.Code.fromAsset("../../src/lambda/store_gaps"),
+      layers: [sharedClientsLayer],
       timeout: cdk.Duration.minutes(5),
       memorySize: 512,
       environment: {
@@ -778,6 +859,7 @@ export class CompliAgentStack extends cdk.Stack {
       runtime: lambda.Runtime.PYTHON_3_10,
       handler: "app.lambda_handler",
       code: lambda.Code.fromAsset("../../src/lambda/api_handler"),
+      layers: [sharedClientsLayer],
       timeout: cdk.Duration.minutes(5),
       memorySize: 512,
       environment: {
@@ -930,6 +1012,7 @@ export class CompliAgentStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/websocket_handler"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(5),
         memorySize: 512,
         environment: {
@@ -32,6 +32,16 @@ class DocumentProcessingStack extends cdk.Stack {
             partitionKey: { name: 'url', type: dynamodb.AttributeType.STRING },
             projectionType: dynamodb.ProjectionType.ALL,
         });
+        // Embeddings keyed by model and chunk-text hash; derived data, expired by TTL
+        this.embeddingCacheTable = new dynamodb.Table(this, 'EmbeddingCacheTable', {
+            tableName: 'CompliAgent-EmbeddingCache',
+            partitionKey: { name: 'cache_key', type: dynamodb.AttributeType.STRING },
+            billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+            encryption: dynamodb.TableEncryption.CUSTOMER_MANAGED,
+            encryptionKey: coreInfrastructure.encryptionKey,
+            removalPolicy: cdk.RemovalPolicy.DESTROY,
+            timeToLiveAttribute: 'expires_at',
+        });
         // Create SNS topic for Textract completion notifications
         this.textractCompletionTopic = new sns.Topic(this, 'TextractCompletionTopic', {
             topicName: 'CompliAgent-TextractCompletion',
@@ -53,12 +63,20 @@ class DocumentProcessingStack extends cdk.Stack {
                 }),
             },
         });
+        // Shared client registry layer used by every handler (src/lambda/shared)
+        const sharedClientsLayer = new lambda.LayerVersion(this, 'SharedClientsLayer', {
+            layerVersionName: 'CompliAgent-SharedClients',
+            code: lambda.Code.fromAsset('../../src/lambda/shared'),
+            compatibleRuntimes: [lambda.Runtime.PYTHON_3_10],
+            description: 'Shared AWS and HTTP client registry for Lambda handlers',
+        });
         // Create MAS Monitor Lambda function
         this.masMonitorFunction = new lambda.Function(this, 'MasMonitorFunction', {
             functionName: 'CompliAgent-MasMonitor',
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/mas_monitor'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(15),
             memorySize: 512,
             environment: {
@@ -78,6 +96,7 @@ class DocumentProcessingStack extends cdk.Stack {
                                 actions: [
                                     's3:PutObject',
                                     's3:PutObjectAcl',
+                                    's3:AbortMultipartUpload',
                                 ],
                                 resources: [coreInfrastructure.masDocsRawBucket.arnForObjects('*')],
                             }),
@@ -85,6 +104,7 @@ class DocumentProcessingStack extends cdk.Stack {
                                 effect: iam.Effect.ALLOW,
                                 actions: [
                                     'dynamodb:GetItem',
+                                    'dynamodb:BatchGetItem',
                                     'dynamodb:PutItem',
                                     'dynamodb:UpdateItem',
                                     'dynamodb:Query',
@@ -126,12 +146,14 @@ class DocumentProcessingStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/textract_processor'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(15),
             memorySize: 1024,
             environment: {
                 PROCESSED_DOCS_BUCKET: coreInfrastructure.processedDocsJsonBucket.bucketName,
                 SNS_TOPIC_ARN: this.textractCompletionTopic.topicArn,
                 TEXTRACT_ROLE_ARN: textractServiceRole.roleArn,
+                TRACKING_TABLE: this.documentTrackingTable.tableName,
             },
             role: new iam.Role(this, 'TextractProcessorRole', {
                 assumedBy: new iam.ServicePrincipal('lambda.amazonaws.com'),
@@ -145,9 +167,12 @@ class DocumentProcessingStack extends cdk.Stack {
                                 effect: iam.Effect.ALLOW,
                                 actions: [
                                     's3:GetObject',
+                                    's3:ListBucket',
                                 ],
                                 resources: [
+                                    coreInfrastructure.masDocsRawBucket.bucketArn,
                                     coreInfrastructure.masDocsRawBucket.arnForObjects('*'),
+                                    coreInfrastructure.internalDocsRawBucket.bucketArn,
                                     coreInfrastructure.internalDocsRawBucket.arnForObjects('*'),
                                 ],
                             }),
@@ -158,6 +183,17 @@ class DocumentProcessingStack extends cdk.Stack {
                                 ],
                                 resources: [coreInfrastructure.processedDocsJsonBucket.arnForObjects('*')],
                             }),
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    's3:GetObject',
+                                    's3:ListBucket',
+                                ],
+                                resources: [
+                                    coreInfrastructure.processedDocsJsonBucket.bucketArn,
+                                    coreInfrastructure.processedDocsJsonBucket.arnForObjects('*'),
+                                ],
+                            }),
                             new iam.PolicyStatement({
                                 effect: iam.Effect.ALLOW,
                                 actions: [
@@ -167,6 +203,15 @@ class DocumentProcessingStack extends cdk.Stack {
                                 ],
                                 resources: ['*'],
                             }),
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    'dynamodb:GetItem',
+                                    'dynamodb:PutItem',
+                                    'dynamodb:UpdateItem',
+                                ],
+                                resources: [this.documentTrackingTable.tableArn],
+                            }),
                             new iam.PolicyStatement({
                                 effect: iam.Effect.ALLOW,
                                 actions: [
@@ -193,11 +238,14 @@ class DocumentProcessingStack extends cdk.Stack {
             runtime: lambda.Runtime.PYTHON_3_10,
             handler: 'app.lambda_handler',
             code: lambda.Code.fromAsset('../../src/lambda/vectorize_content'),
+            layers: [sharedClientsLayer],
             timeout: cdk.Duration.minutes(15),
             memorySize: 1024,
             environment: {
                 OPENSEARCH_ENDPOINT: `https://${coreInfrastructure.vectorCollection.attrCollectionEndpoint}`,
                 OPENSEARCH_INDEX: 'documents',
+                EMBEDDING_CACHE_TABLE: this.embeddingCacheTable.tableName,
+                TRACKING_TABLE: this.documentTrackingTable.tableName,
             },
             role: new iam.Role(this, 'VectorizeContentRole', {
                 assumedBy: new iam.ServicePrincipal('lambda.amazonaws.com'),
@@ -207,6 +255,22 @@ class DocumentProcessingStack extends cdk.Stack {
                 inlinePolicies: {
                     VectorizeContentPolicy: new iam.PolicyDocument({
                         statements: [
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    'dynamodb:BatchGetItem',
+                                    'dynamodb:BatchWriteItem',
+                                ],
+                                resources: [this.embeddingCacheTable.tableArn],
+                            }),
+                            new iam.PolicyStatement({
+                                effect: iam.Effect.ALLOW,
+                                actions: [
+                                    'dynamodb:GetItem',
+                                    'dynamodb:PutItem',
+                                ],
+                                resources: [this.documentTrackingTable.tableArn],
+                            }),
                             new iam.PolicyStatement({
                                 effect: iam.Effect.ALLOW,
                                 actions: [
@@ -244,6 +308,9 @@ class DocumentProcessingStack extends cdk.Stack {
         // Trigger Textract processor when new documents are uploaded to MAS docs bucket
         coreInfrastructure.masDocsRawBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(this.textractProcessorFunction), { suffix: '.pdf' });
         coreInfrastructure.internalDocsRawBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(this.textractProcessorFunction), { suffix: '.pdf' });
+        // A folder of scanned page images is processed as one document once its
+        // _UPLOAD_COMPLETE marker is written after the last image
+        coreInfrastructure.internalDocsRawBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(this.textractProcessorFunction), { suffix: '_UPLOAD_COMPLETE' });
         // Trigger vectorization when processed documents are uploaded
         coreInfrastructure.processedDocsJsonBucket.addEventNotification(s3.EventType.OBJECT_CREATED, new s3n.LambdaDestination(this.vectorizeContentFunction), { prefix: 'textract-output/', suffix: '.json' });
         // Subscribe Textract processor to SNS topic for job completion notifications
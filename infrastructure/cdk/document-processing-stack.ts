@@ -22,6 +22,7 @@ export class DocumentProcessingStack extends cdk.Stack {
   public readonly vectorizeContentFunction: lambda.Function;
   public readonly textractCompletionTopic: sns.Topic;
   public readonly documentTrackingTable: dynamodb.Table;
+  public readonly embeddingCacheTable: dynamodb.Table;
 
   constructor(
     scope: Construct,
@@ -57,6 +58,24 @@ export class DocumentProcessingStack extends cdk.Stack {
       projectionType: dynamodb.ProjectionType.ALL,
     });
 
+    // Embeddings keyed by model and chunk-text hash; derived data, expired by TTL
+    this.embeddingCacheTable = new dynamodb.Table(
+      this,
+      "EmbeddingCacheTable",
+      {
+        tableName: "CompliAgent-EmbeddingCache",
+        partitionKey: {
+          name: "cache_key",
+          type: dynamodb.AttributeType.STRING,
+        },
+        billingMode: dynamodb.BillingMode.PAY_PER_REQUEST,
+        encryption: dynamodb.TableEncryption.CUSTOMER_MANAGED,
+        encryptionKey: coreInfrastructure.encryptionKey,
+        removalPolicy: cdk.RemovalPolicy.DESTROY,
+        timeToLiveAttribute: "expires_at",
+      }
+    );
+
     // Create SNS topic for Textract completion notifications
     this.textractCompletionTopic = new sns.Topic(
       this,
@@ -84,12 +103,25 @@ export class DocumentProcessingStack extends cdk.Stack {
       },
     });
 
+    // Shared client registry layer used by every handler (src/lambda/shared)
+    const sharedClientsLayer = new lambda.LayerVersion(
+      this,
+      "SharedClientsLayer",
+      {
+        layerVersionName: "CompliAgent-SharedClients",
+        code: lambda.Code.fromAsset("../../src/lambda/shared"),
+        compatibleRuntimes: [lambda.Runtime.PYTHON_3_10],
+        description: "Shared AWS and HTTP client registry for Lambda handlers",
+      }
+    );
+
     // Create MAS Monitor Lambda function
     this.masMonitorFunction = new lambda.Function(this, "MasMonitorFunction", {
       functionName: "CompliAgent-MasMonitor",
       runtime: lambda.Runtime.PYTHON_3_10,
       handler: "app.lambda_handler",
       code: lambda.Code.fromAsset("../../src/lambda/mas_monitor"),
+      layers: [sharedClientsLayer],
       timeout: cdk.Duration.minutes(15),
       memorySize: 512,
       environment: {
@@ -108,7 +140,11 @@ export class DocumentProcessingStack extends cdk.Stack {
             statements: [
               new iam.PolicyStatement({
                 effect: iam.Effect.ALLOW,
-                actions: ["s3:PutObject", "s3:PutObjectAcl"],
+                actions: [
+                  "s3:PutObject",
+                  "s3:PutObjectAcl",
+                  "s3:AbortMultipartUpload",
+                ],
                 resources: [
                   coreInfrastructure.masDocsRawBucket.arnForObjects("*"),
                 ],
@@ -117,6 +153,7 @@ export class DocumentProcessingStack extends cdk.Stack {
                 effect: iam.Effect.ALLOW,
                 actions: [
                   "dynamodb:GetItem",
+                  "dynamodb:BatchGetItem",
                   "dynamodb:PutItem",
                   "dynamodb:UpdateItem",
                   "dynamodb:Query",
@@ -163,6 +200,7 @@ export class DocumentProcessingStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/textract_processor"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(15),
         memorySize: 1024,
         environment: {
@@ -170,6 +208,7 @@ export class DocumentProcessingStack extends cdk.Stack {
             coreInfrastructure.processedDocsJsonBucket.bucketName,
           SNS_TOPIC_ARN: this.textractCompletionTopic.topicArn,
           TEXTRACT_ROLE_ARN: textractServiceRole.roleArn,
+          TRACKING_TABLE: this.documentTrackingTable.tableName,
         },
         role: new iam.Role(this, "TextractProcessorRole", {
           assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
@@ -183,9 +222,11 @@ export class DocumentProcessingStack extends cdk.Stack {
               statements: [
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
-                  actions: ["s3:GetObject"],
+                  actions: ["s3:GetObject", "s3:ListBucket"],
                   resources: [
+                    coreInfrastructure.masDocsRawBucket.bucketArn,
                     coreInfrastructure.masDocsRawBucket.arnForObjects("*"),
+                    coreInfrastructure.internalDocsRawBucket.bucketArn,
                     coreInfrastructure.internalDocsRawBucket.arnForObjects("*"),
                   ],
                 }),
@@ -198,6 +239,14 @@ export class DocumentProcessingStack extends cdk.Stack {
                     ),
                   ],
                 }),
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: ["s3:GetObject", "s3:ListBucket"],
+                  resources: [
+                    coreInfrastructure.processedDocsJsonBucket.bucketArn,
+                    coreInfrastructure.processedDocsJsonBucket.arnForObjects("*"),
+                  ],
+                }),
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
                   actions: [
@@ -207,6 +256,15 @@ export class DocumentProcessingStack extends cdk.Stack {
                   ],
                   resources: ["*"],
                 }),
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: [
+                    "dynamodb:GetItem",
+                    "dynamodb:PutItem",
+                    "dynamodb:UpdateItem",
+                  ],
+                  resources: [this.documentTrackingTable.tableArn],
+                }),
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
                   actions: ["iam:PassRole"],
@@ -233,11 +291,14 @@ export class DocumentProcessingStack extends cdk.Stack {
         runtime: lambda.Runtime.PYTHON_3_10,
         handler: "app.lambda_handler",
         code: lambda.Code.fromAsset("../../src/lambda/vectorize_content"),
+        layers: [sharedClientsLayer],
         timeout: cdk.Duration.minutes(15),
         memorySize: 1024,
         environment: {
           OPENSEARCH_ENDPOINT: `https://${coreInfrastructure.vectorCollection.attrCollectionEndpoint}`,
           OPENSEARCH_INDEX: "documents",
+          EMBEDDING_CACHE_TABLE: this.embeddingCacheTable.tableName,
+          TRACKING_TABLE: this.documentTrackingTable.tableName,
         },
         role: new iam.Role(this, "VectorizeContentRole", {
           assumedBy: new iam.ServicePrincipal("lambda.amazonaws.com"),
@@ -249,6 +310,16 @@ export class DocumentProcessingStack extends cdk.Stack {
           inlinePolicies: {
             VectorizeContentPolicy: new iam.PolicyDocument({
               statements: [
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: ["dynamodb:BatchGetItem", "dynamodb:BatchWriteItem"],
+                  resources: [this.embeddingCacheTable.tableArn],
+                }),
+                new iam.PolicyStatement({
+                  effect: iam.Effect.ALLOW,
+                  actions: ["dynamodb:GetItem", "dynamodb:PutItem"],
+                  resources: [this.documentTrackingTable.tableArn],
+                }),
                 new iam.PolicyStatement({
                   effect: iam.Effect.ALLOW,
                   actions: ["s3:GetObject"],
@@ -296,6 +367,14 @@ export class DocumentProcessingStack extends cdk.Stack {
       { suffix: ".pdf" }
     );
 
+    // A folder of scanned page images is processed as one document once its
+    // _UPLOAD_COMPLETE marker is written after the last image
+    coreInfrastructure.internalDocsRawBucket.addEventNotification(
+      s3.EventType.OBJECT_CREATED,
+      new s3n.LambdaDestination(this.textractProcessorFunction),
+      { suffix: "_UPLOAD_COMPLETE" }
+    );
+
     // Trigger vectorization when processed documents are uploaded
     coreInfrastructure.processedDocsJsonBucket.addEventNotification(
       s3.EventType.OBJECT_CREATED,
@@ -1,8 +1,9 @@
 import json
-import boto3
+import aws_clients
 import logging
 from datetime import datetime
 import os
+from functools import cached_property
 from typing import Dict, List, Optional
 import uuid
 
@@ -11,8 +12,8 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-stepfunctions_client = boto3.client('stepfunctions')
+dynamodb = aws_clients.lazy_resource('dynamodb')
+stepfunctions_client = aws_clients.lazy_client('stepfunctions')
 
 # Environment variables
 GAPS_TABLE_NAME = os.environ.get('GAPS_TABLE_NAME', 'CompliAgent-GapsTable')
@@ -23,9 +24,14 @@ AMENDMENT_DRAFTING_STATE_MACHINE_ARN = os.environ.get('AMENDMENT_DRAFTING_STATE_
 class APIHandler:
     """Main API handler for CompliAgent-SG REST API"""
     
-    def __init__(self):
-        self.gaps_table = dynamodb.Table(GAPS_TABLE_NAME)
-        self.amendments_table = dynamodb.Table(AMENDMENTS_TABLE_NAME)
+    # Tables are resolved on first use so OPTIONS and /health never touch boto3
+    @cached_property
+    def gaps_table(self):
+        return dynamodb.Table(GAPS_TABLE_NAME)
+    
+    @cached_property
+    def amendments_table(self):
+        return dynamodb.Table(AMENDMENTS_TABLE_NAME)
     
     def handle_request(self, event: Dict) -> Dict:
         """Route and handle API requests"""
@@ -1,5 +1,5 @@
 import json
-import boto3
+import aws_clients
 import logging
 from datetime import datetime
 import os
@@ -11,7 +11,7 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-bedrock_client = boto3.client('bedrock-runtime')
+bedrock_client = aws_clients.lazy_client('bedrock-runtime')
 
 # Environment variables
 CLAUDE_MODEL_ID = os.environ.get('CLAUDE_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
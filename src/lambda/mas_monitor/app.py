@@ -1,54 +1,263 @@
 import json
-import boto3
-import requests
-from bs4 import BeautifulSoup
+import aws_clients
+import lxml.html
 import logging
 from datetime import datetime
 import hashlib
 import os
-from urllib.parse import urljoin, urlparse
-from typing import List, Dict, Optional
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from typing import Iterator, List, Dict, Optional, Tuple
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+s3_client = aws_clients.lazy_client('s3')
+dynamodb = aws_clients.lazy_resource('dynamodb')
 
 # Environment variables
 BUCKET_NAME = os.environ.get('MAS_DOCS_BUCKET')
 TRACKING_TABLE = os.environ.get('TRACKING_TABLE', 'CompliAgent-DocumentTracking')
+MAS_BASE_URL = os.environ.get('MAS_BASE_URL', 'https://www.mas.gov.sg')
+DOWNLOAD_CONCURRENCY = int(os.environ.get('DOWNLOAD_CONCURRENCY', '8'))
+MAX_REQUESTS_PER_HOST = int(os.environ.get('MAX_REQUESTS_PER_HOST', '4'))
+HTML_PARSER = os.environ.get('HTML_PARSER', 'lxml')
+LISTING_PATHS = os.environ.get(
+    'LISTING_PATHS',
+    '/regulation/circulars,/regulation/notices,/regulation/guidelines'
+)
+CRAWL_PAGE_BUDGET = int(os.environ.get('CRAWL_PAGE_BUDGET', '30'))
+
+# Publish dates on listing cards are found within this many ancestors of a link
+PUBLISH_DATE_MAX_DEPTH = 3
+PUBLISH_DATE_FORMATS = ['%Y-%m-%d', '%d %b %Y', '%d %B %Y']
+
+# Downloads are streamed through a bounded buffer that spills to /tmp
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+MULTIPART_CHUNK_BYTES = 8 * 1024 * 1024
+
+# DynamoDB BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+
+def _http_session():
+    """Shared session for MAS requests, kept alive across warm invocations"""
+    # Size the connection pool so concurrent workers reuse keep-alive connections
+    return aws_clients.get_http_session(
+        'mas',
+        headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
+        pool_maxsize=max(DOWNLOAD_CONCURRENCY, 10)
+    )
+
+def _upload_config():
+    """S3 transfer settings, imported on first upload to keep boto3 out of init"""
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=MULTIPART_CHUNK_BYTES,
+        multipart_chunksize=MULTIPART_CHUNK_BYTES,
+        max_concurrency=2
+    )
+
+def _conditional_headers(validators: Optional[Dict]) -> Dict:
+    """Build If-None-Match/If-Modified-Since headers from stored validators"""
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+def _response_validators(response) -> Dict:
+    """Extract ETag/Last-Modified validators from an HTTP response"""
+    validators = {}
+    if response.headers.get('ETag'):
+        validators['etag'] = response.headers['ETag']
+    if response.headers.get('Last-Modified'):
+        validators['last_modified'] = response.headers['Last-Modified']
+    return validators
+
+def _latest(*dates: Optional[str]) -> Optional[str]:
+    """Latest of some ISO dates, ignoring missing ones"""
+    present = [d for d in dates if d]
+    return max(present) if present else None
 
 class MASDocumentScraper:
     """Scraper for MAS regulatory documents"""
     
     def __init__(self):
-        self.base_url = "https://www.mas.gov.sg"
+        self.base_url = MAS_BASE_URL.rstrip('/')
         self.regulations_url = f"{self.base_url}/regulation"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.session = _http_session()
+        self.listing_urls = [
+            urljoin(self.base_url, path.strip())
+            for path in LISTING_PATHS.split(',') if path.strip()
+        ]
+        self.page_validators: Dict = {}
+        self.crawl_cursors: Dict[str, str] = {}
+        self._page_budget = 0
+        self._page_budget_lock = threading.Lock()
+    
+    def crawl_listings(self, cursors: Optional[Dict[str, Dict]] = None,
+                       page_budget: int = CRAWL_PAGE_BUDGET) -> List[Dict]:
+        """Crawl paginated listings concurrently, newest first, until seen items
+        
+        cursors maps each listing URL to its crawl cursor: the newest publish
+        date crawled through (high_water_mark) and, when the page budget cut an
+        earlier walk short, where that walk stopped (resume_page) and the newest
+        date it saw (resume_mark). All listings together fetch at most
+        page_budget pages.
+        """
+        cursors = cursors or {}
+        self._page_budget = page_budget
+        self.crawl_cursors = dict(cursors)
+        documents = []
+        
+        if not self.listing_urls:
+            return documents
+        
+        max_workers = min(len(self.listing_urls), MAX_REQUESTS_PER_HOST)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._crawl_listing, url, cursors.get(url)): url
+                for url in self.listing_urls
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    listing_documents, cursor = future.result()
+                except Exception as e:
+                    logger.error(f"Error crawling listing {url}: {str(e)}")
+                    continue
+                documents.extend(listing_documents)
+                cursor = {k: v for k, v in cursor.items() if v}
+                if cursor:
+                    self.crawl_cursors[url] = cursor
+        
+        logger.info(f"Found {len(documents)} new documents across {len(self.listing_urls)} listings")
+        return documents
+    
+    def _crawl_listing(self, listing_url: str, cursor: Optional[Dict]) -> Tuple[List[Dict], Dict]:
+        """Walk one listing page by page, returning new documents and its next cursor
+        
+        The high-water mark only advances once a walk gets down to it or to the
+        end of the listing. A walk cut short by the page budget records a resume
+        point instead, and the next run first carries on from that page down to
+        the mark, then walks from the top down to the newest date the cut-short
+        walk saw. Items published in between only push older ones to later
+        pages, so nothing is skipped; items seen twice are caught by the tracker.
+        """
+        cursor = cursor or {}
+        high_water_mark = cursor.get('high_water_mark')
+        documents = []
+        
+        if cursor.get('resume_page'):
+            finished, page, _ = self._walk_listing(listing_url, cursor['resume_page'], high_water_mark, documents)
+            if not finished:
+                return documents, {**cursor, 'resume_page': page}
+            # Everything up to the newest item of the cut-short walk is now crawled
+            high_water_mark = _latest(cursor.get('resume_mark'), high_water_mark)
+        
+        finished, page, newest = self._walk_listing(listing_url, 1, high_water_mark, documents)
+        if not finished and page > 1:
+            return documents, {
+                'high_water_mark': high_water_mark,
+                'resume_page': page,
+                'resume_mark': _latest(newest, high_water_mark)
+            }
+        if not finished:
+            return documents, {'high_water_mark': high_water_mark}
+        return documents, {'high_water_mark': _latest(newest, high_water_mark)}
+    
+    def _walk_listing(self, listing_url: str, page: int, stop_mark: Optional[str],
+                      documents: List[Dict]) -> Tuple[bool, int, Optional[str]]:
+        """Collect documents from page onwards until one older than stop_mark
+        
+        Only dated listing cards count: undated links that look like documents
+        (navigation, footers) repeat on every page, so a page without a dated
+        card is the end of the listing. Returns whether the walk finished
+        (reached stop_mark or the end of the listing), the page it stopped at
+        and the newest publish date seen.
+        """
+        newest = None
+        
+        while self._take_page_budget():
+            page_url = self._listing_page_url(listing_url, page)
+            response = self.session.get(page_url, timeout=30)
+            response.raise_for_status()
+            
+            links = self._extract_links_lxml(response.content, with_dates=True)
+            page_documents = []
+            reached_seen = False
+            for href, title, published_at in links:
+                if not published_at or not self._is_document_link(href):
+                    continue
+                # Same-day items may have been published after the mark was taken
+                if stop_mark and published_at < stop_mark:
+                    reached_seen = True
+                    continue
+                doc_info = self._extract_document_info(href, title)
+                if doc_info:
+                    doc_info['published_at'] = published_at
+                    newest = _latest(newest, published_at)
+                    page_documents.append(doc_info)
+            
+            documents.extend(page_documents)
+            logger.info(f"Listing page {page_url}: {len(page_documents)} new documents")
+            if reached_seen or not page_documents:
+                return True, page, newest
+            page += 1
+        
+        logger.info(f"Page budget exhausted at page {page} of {listing_url}")
+        return False, page, newest
+    
+    def _take_page_budget(self) -> bool:
+        """Claim one page from the per-invocation crawl budget"""
+        with self._page_budget_lock:
+            if self._page_budget <= 0:
+                return False
+            self._page_budget -= 1
+            return True
     
-    def scrape_documents(self) -> List[Dict]:
-        """Scrape MAS website for regulatory documents"""
+    def _listing_page_url(self, listing_url: str, page: int) -> str:
+        """Build the URL of a listing page via its ?page= query parameter"""
+        parsed = urlparse(listing_url)
+        query = dict(parse_qsl(parsed.query))
+        query['page'] = str(page)
+        return urlunparse(parsed._replace(query=urlencode(query)))
+    
+    def scrape_documents(self, validators: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """Scrape MAS website for regulatory documents
+        
+        Returns None when the page is unchanged since the given validators.
+        """
         try:
             logger.info(f"Starting scrape of {self.regulations_url}")
-            response = self.session.get(self.regulations_url, timeout=30)
+            response = self.session.get(
+                self.regulations_url,
+                headers=_conditional_headers(validators),
+                timeout=30
+            )
+            if response.status_code == 304:
+                logger.info(f"{self.regulations_url} not modified since last run")
+                self.page_validators = {**(validators or {}), **_response_validators(response)}
+                return None
             response.raise_for_status()
+            self.page_validators = _response_validators(response)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
             documents = []
             
             # Look for document links (adjust selectors based on actual MAS website structure)
-            document_links = soup.find_all('a', href=True)
-            
-            for link in document_links:
-                href = link.get('href')
+            for href, title in self.extract_links(response.content):
                 if self._is_document_link(href):
-                    doc_info = self._extract_document_info(link, href)
+                    doc_info = self._extract_document_info(href, title)
                     if doc_info:
                         documents.append(doc_info)
             
@@ -59,6 +268,84 @@ class MASDocumentScraper:
             logger.error(f"Error scraping MAS website: {str(e)}")
             raise
     
+    def extract_links(self, content: bytes, parser: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Extract (href, title) pairs for every anchor with an href"""
+        parser = parser or HTML_PARSER
+        if parser == 'lxml':
+            return self._extract_links_lxml(content)
+        return self._extract_links_soup(content, parser)
+    
+    def _extract_links_lxml(self, content: bytes, with_dates: bool = False) -> List[Tuple]:
+        """Extract links by walking only <a> elements of an lxml tree
+        
+        With with_dates, each tuple also carries the ISO publish date of the
+        listing card the link sits in, or None.
+        """
+        if not content or not content.strip():
+            return []
+        
+        links = []
+        for anchor in lxml.html.fromstring(content).iter('a'):
+            href = anchor.get('href')
+            if href is None:
+                continue
+            # Match BeautifulSoup's get_text(strip=True)
+            title = ''.join(text.strip() for text in anchor.itertext())
+            if not title:
+                title = anchor.get('title', 'Unknown Document')
+            if with_dates:
+                links.append((href, title, self._find_publish_date(anchor)))
+            else:
+                links.append((href, title))
+        return links
+    
+    def _find_publish_date(self, anchor) -> Optional[str]:
+        """Find the publish date of the listing card enclosing an anchor
+        
+        The first ancestor holding a <time> is the card, unless it holds
+        several: then the anchor sits outside the cards (navigation next to
+        the listing) and has no date.
+        """
+        element = anchor
+        for _ in range(PUBLISH_DATE_MAX_DEPTH):
+            element = element.getparent()
+            if element is None:
+                return None
+            time_elements = list(islice(element.iter('time'), 2))
+            if len(time_elements) > 1:
+                return None
+            if time_elements:
+                return self._parse_publish_date(
+                    time_elements[0].get('datetime') or time_elements[0].text_content()
+                )
+        return None
+    
+    def _parse_publish_date(self, value: str) -> Optional[str]:
+        """Normalise a listing date to YYYY-MM-DD so dates compare as strings"""
+        value = (value or '').strip()
+        if len(value) > 10 and value[4:5] == '-':
+            # Drop the time part of an ISO timestamp
+            value = value[:10]
+        for fmt in PUBLISH_DATE_FORMATS:
+            try:
+                return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+            except ValueError:
+                continue
+        return None
+    
+    def _extract_links_soup(self, content: bytes, parser: str) -> List[Tuple[str, str]]:
+        """Extract links with BeautifulSoup, building only the anchor elements"""
+        from bs4 import BeautifulSoup, SoupStrainer
+        
+        soup = BeautifulSoup(content, parser, parse_only=SoupStrainer('a', href=True))
+        links = []
+        for anchor in soup.find_all('a', href=True):
+            title = anchor.get_text(strip=True)
+            if not title:
+                title = anchor.get('title', 'Unknown Document')
+            links.append((anchor.get('href'), title))
+        return links
+    
     def _is_document_link(self, href: str) -> bool:
         """Check if link points to a document"""
         if not href:
@@ -75,17 +362,12 @@ class MASDocumentScraper:
         
         return any(indicator in href.lower() for indicator in document_indicators)
     
-    def _extract_document_info(self, link_element, href: str) -> Optional[Dict]:
-        """Extract document information from link element"""
+    def _extract_document_info(self, href: str, title: str) -> Optional[Dict]:
+        """Extract document information from a link's href and title"""
         try:
             # Make URL absolute
             full_url = urljoin(self.base_url, href)
             
-            # Extract title
-            title = link_element.get_text(strip=True)
-            if not title:
-                title = link_element.get('title', 'Unknown Document')
-            
             # Generate document ID based on URL
             doc_id = hashlib.md5(full_url.encode()).hexdigest()
             
@@ -125,81 +407,273 @@ class DocumentTracker:
     """Track processed documents to avoid duplicates"""
     
     def __init__(self, table_name: str):
+        self.table_name = table_name
         self.table = dynamodb.Table(table_name)
     
-    def is_document_processed(self, doc_id: str) -> bool:
-        """Check if document has already been processed"""
-        try:
-            response = self.table.get_item(Key={'document_id': doc_id})
-            return 'Item' in response
-        except Exception as e:
-            logger.warning(f"Error checking document status: {str(e)}")
-            return False
+    def get_tracked_documents(self, doc_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch tracking records (validators and content hash) keyed by document ID"""
+        unique_ids = list(dict.fromkeys(doc_ids))
+        tracked = {}
+        
+        for i in range(0, len(unique_ids), BATCH_GET_MAX_KEYS):
+            page = unique_ids[i:i + BATCH_GET_MAX_KEYS]
+            try:
+                for item in self._batch_get_items(page):
+                    tracked[item['document_id']] = item
+            except Exception as e:
+                logger.warning(f"Error batch checking document status: {str(e)}")
+        
+        return tracked
+    
+    def _batch_get_items(self, doc_ids: List[str]) -> List[Dict]:
+        """Fetch tracking items for up to 100 doc_ids, retrying unprocessed keys"""
+        found_items = []
+        attributes = ['document_id', 'etag', 'last_modified', 'content_sha256', 'version']
+        request_items = {
+            self.table_name: {
+                'Keys': [{'document_id': doc_id} for doc_id in doc_ids],
+                'ProjectionExpression': ', '.join(f'#a{i}' for i in range(len(attributes))),
+                'ExpressionAttributeNames': {f'#a{i}': name for i, name in enumerate(attributes)}
+            }
+        }
+        
+        for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            found_items.extend(response.get('Responses', {}).get(self.table_name, []))
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                return found_items
+            
+            # Back off exponentially before retrying throttled keys
+            time.sleep(min(0.05 * (2 ** attempt), 2.0))
+        
+        unprocessed = len(request_items.get(self.table_name, {}).get('Keys', []))
+        logger.warning(f"{unprocessed} keys still unprocessed after {BATCH_GET_MAX_RETRIES} retries")
+        return found_items
     
     def mark_document_processed(self, doc_info: Dict):
         """Mark document as processed"""
         try:
-            self.table.put_item(Item={
+            item = {
                 'document_id': doc_info['document_id'],
                 'title': doc_info['title'],
                 'url': doc_info['url'],
                 'type': doc_info['type'],
                 'processed_at': datetime.utcnow().isoformat(),
-                'status': 'downloaded'
-            })
+                'status': 'downloaded',
+                'version': doc_info.get('version', 1)
+            }
+            if doc_info.get('content_sha256'):
+                item['content_sha256'] = doc_info['content_sha256']
+            if doc_info.get('s3_key'):
+                item['s3_key'] = doc_info['s3_key']
+            if doc_info.get('published_at'):
+                item['published_at'] = doc_info['published_at']
+            item.update(doc_info.get('validators', {}))
+            self.table.put_item(Item=item)
         except Exception as e:
             logger.error(f"Error marking document as processed: {str(e)}")
+    
+    def refresh_validators(self, doc_info: Dict):
+        """Update validators for a document whose content has not changed"""
+        validators = doc_info.get('validators')
+        if not validators:
+            return
+        try:
+            self.table.update_item(
+                Key={'document_id': doc_info['document_id']},
+                UpdateExpression='SET ' + ', '.join(f'#{k} = :{k}' for k in validators) + ', #checked_at = :checked_at',
+                ExpressionAttributeNames={**{f'#{k}': k for k in validators}, '#checked_at': 'checked_at'},
+                ExpressionAttributeValues={
+                    **{f':{k}': v for k, v in validators.items()},
+                    ':checked_at': datetime.utcnow().isoformat()
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error refreshing validators for {doc_info['document_id']}: {str(e)}")
+    
+    def get_page_validators(self, url: str) -> Dict:
+        """Get the stored ETag/Last-Modified validators for a listing page"""
+        try:
+            response = self.table.get_item(Key={'document_id': self._page_key(url)})
+            item = response.get('Item', {})
+            return {k: item[k] for k in ('etag', 'last_modified') if item.get(k)}
+        except Exception as e:
+            logger.warning(f"Error reading page validators for {url}: {str(e)}")
+            return {}
+    
+    def save_page_validators(self, url: str, validators: Dict):
+        """Persist ETag/Last-Modified validators for a listing page"""
+        if not validators:
+            return
+        try:
+            self.table.put_item(Item={
+                'document_id': self._page_key(url),
+                'url': url,
+                'type': 'listing_page',
+                'checked_at': datetime.utcnow().isoformat(),
+                **validators
+            })
+        except Exception as e:
+            logger.error(f"Error saving page validators for {url}: {str(e)}")
+    
+    def get_crawl_cursors(self, urls: List[str]) -> Dict[str, Dict]:
+        """Get each listing URL's crawl cursor (high-water mark and resume point)"""
+        cursors = {}
+        for url in urls:
+            try:
+                response = self.table.get_item(Key={'document_id': self._cursor_key(url)})
+                item = response.get('Item', {})
+                cursor = {k: item[k] for k in ('high_water_mark', 'resume_mark') if item.get(k)}
+                if item.get('resume_page'):
+                    cursor['resume_page'] = int(item['resume_page'])
+                if cursor:
+                    cursors[url] = cursor
+            except Exception as e:
+                logger.warning(f"Error reading crawl cursor for {url}: {str(e)}")
+        return cursors
+    
+    def save_crawl_cursors(self, cursors: Dict[str, Dict]):
+        """Persist each listing URL's crawl cursor"""
+        for url, cursor in cursors.items():
+            try:
+                self.table.put_item(Item={
+                    'document_id': self._cursor_key(url),
+                    'url': url,
+                    'type': 'crawl_cursor',
+                    **cursor,
+                    'checked_at': datetime.utcnow().isoformat()
+                })
+            except Exception as e:
+                logger.error(f"Error saving crawl cursor for {url}: {str(e)}")
+    
+    def _cursor_key(self, url: str) -> str:
+        """Tracking key for a listing's crawl cursor"""
+        return f"cursor#{hashlib.md5(url.encode()).hexdigest()}"
+    
+    def _page_key(self, url: str) -> str:
+        """Tracking key for a listing page, kept apart from document IDs"""
+        return f"page#{hashlib.md5(url.encode()).hexdigest()}"
 
 class DocumentDownloader:
     """Download documents to S3"""
     
-    def __init__(self, bucket_name: str):
+    def __init__(self, bucket_name: str, max_workers: int = 1, max_per_host: int = 4):
         self.bucket_name = bucket_name
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.max_workers = max(1, max_workers)
+        self.max_per_host = max(1, max_per_host)
+        self.session = _http_session()
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_limits_lock = threading.Lock()
+    
+    def download_documents(self, documents: List[Dict]) -> Iterator[Tuple[Dict, bool]]:
+        """Download documents to S3, yielding (doc_info, success) as each finishes"""
+        if self.max_workers == 1 or len(documents) <= 1:
+            for doc_info in documents:
+                yield doc_info, self.download_document(doc_info)
+            return
+        
+        logger.info(
+            f"Downloading {len(documents)} documents with {self.max_workers} workers "
+            f"(max {self.max_per_host} per host)"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._download_with_host_limit, doc_info): doc_info
+                for doc_info in documents
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+    
+    def _download_with_host_limit(self, doc_info: Dict) -> bool:
+        """Download a document while holding its host's politeness slot"""
+        with self._get_host_limit(urlparse(doc_info['url']).netloc):
+            return self.download_document(doc_info)
+    
+    def _get_host_limit(self, host: str) -> threading.BoundedSemaphore:
+        """Get the semaphore capping concurrent requests to a host"""
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[host]
     
     def download_document(self, doc_info: Dict) -> bool:
         """Download document to S3"""
         try:
             logger.info(f"Downloading document: {doc_info['title']}")
             
-            # Download the document
-            response = self.session.get(doc_info['url'], timeout=60)
-            response.raise_for_status()
-            
-            # Determine file extension
-            content_type = response.headers.get('content-type', '').lower()
-            if 'pdf' in content_type:
-                extension = '.pdf'
-            elif 'html' in content_type:
-                extension = '.html'
-            else:
-                # Try to get extension from URL
-                parsed_url = urlparse(doc_info['url'])
-                if parsed_url.path.endswith('.pdf'):
-                    extension = '.pdf'
-                else:
-                    extension = '.html'
-            
-            # Create S3 key
-            timestamp = datetime.utcnow().strftime('%Y/%m/%d')
-            s3_key = f"mas-documents/{timestamp}/{doc_info['document_id']}{extension}"
-            
-            # Upload to S3
-            s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=response.content,
-                ContentType=content_type,
-                Metadata={
-                    'title': doc_info['title'],
-                    'source_url': doc_info['url'],
-                    'document_type': doc_info['type'],
-                    'downloaded_at': datetime.utcnow().isoformat()
-                }
-            )
+            # Download the document, skipping the body if it is unchanged
+            with self.session.get(
+                doc_info['url'],
+                headers=_conditional_headers(doc_info.get('validators')),
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code == 304:
+                    logger.info(f"Document not modified: {doc_info['title']}")
+                    # A 304 may carry fresher validators than the ones we sent
+                    doc_info['validators'] = {**doc_info.get('validators', {}), **_response_validators(response)}
+                    doc_info['not_modified'] = True
+                    return True
+                response.raise_for_status()
+                doc_info['validators'] = _response_validators(response)
+                
+                # Stream the body to a bounded spool, hashing as we go, so
+                # peak memory stays flat regardless of document size
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as body:
+                    sha256 = hashlib.sha256()
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                        sha256.update(chunk)
+                        body.write(chunk)
+                    
+                    # A republished URL only counts as a revision if the bytes changed
+                    content_sha256 = sha256.hexdigest()
+                    doc_info['content_sha256'] = content_sha256
+                    if content_sha256 == doc_info.get('previous_sha256'):
+                        logger.info(f"Document content unchanged: {doc_info['title']}")
+                        doc_info['not_modified'] = True
+                        return True
+                    
+                    # Determine file extension
+                    content_type = response.headers.get('content-type', '').lower()
+                    if 'pdf' in content_type:
+                        extension = '.pdf'
+                    elif 'html' in content_type:
+                        extension = '.html'
+                    else:
+                        # Try to get extension from URL
+                        parsed_url = urlparse(doc_info['url'])
+                        if parsed_url.path.endswith('.pdf'):
+                            extension = '.pdf'
+                        else:
+                            extension = '.html'
+                    
+                    # Create S3 key, versioned so revisions never overwrite earlier copies
+                    timestamp = datetime.utcnow().strftime('%Y/%m/%d')
+                    version = doc_info.get('version', 1)
+                    s3_key = f"mas-documents/{timestamp}/{doc_info['document_id']}-v{version}{extension}"
+                    
+                    # Upload to S3, switching to multipart for large bodies
+                    body.seek(0)
+                    s3_client.upload_fileobj(
+                        body,
+                        self.bucket_name,
+                        s3_key,
+                        ExtraArgs={
+                            'ContentType': content_type,
+                            'Metadata': {
+                                'title': doc_info['title'],
+                                'source_url': doc_info['url'],
+                                'document_type': doc_info['type'],
+                                'content_sha256': content_sha256,
+                                'document_version': str(version),
+                                'downloaded_at': datetime.utcnow().isoformat()
+                            }
+                        },
+                        Config=_upload_config()
+                    )
+            doc_info['s3_key'] = s3_key
             
             logger.info(f"Successfully uploaded document to s3://{self.bucket_name}/{s3_key}")
             return True
@@ -220,22 +694,89 @@ def lambda_handler(event, context):
         # Initialize components
         scraper = MASDocumentScraper()
         tracker = DocumentTracker(TRACKING_TABLE)
-        downloader = DocumentDownloader(BUCKET_NAME)
+        downloader = DocumentDownloader(
+            BUCKET_NAME,
+            max_workers=DOWNLOAD_CONCURRENCY,
+            max_per_host=MAX_REQUESTS_PER_HOST
+        )
         
-        # Scrape for documents
-        documents = scraper.scrape_documents()
+        # Scrape the landing page (conditionally) and crawl the paginated
+        # listings down to the items already seen on previous runs
+        page_validators = tracker.get_page_validators(scraper.regulations_url)
+        documents = scraper.scrape_documents(page_validators)
+        cursors = tracker.get_crawl_cursors(scraper.listing_urls)
+        listing_documents = scraper.crawl_listings(cursors)
+        
+        changed_cursors = {
+            url: cursor for url, cursor in scraper.crawl_cursors.items()
+            if cursors.get(url) != cursor
+        }
+        
+        if documents is None and not listing_documents:
+            # A walk can finish (or move its resume point) without finding anything new
+            tracker.save_crawl_cursors(changed_cursors)
+            result = {
+                'statusCode': 200,
+                'body': {
+                    'message': 'No new MAS documents since last run',
+                    'total_documents_found': 0,
+                    'new_documents_downloaded': 0,
+                    'updated_documents_downloaded': 0,
+                    'unchanged_documents': 0,
+                    'failed_downloads': 0,
+                    'timestamp': datetime.utcnow().isoformat()
+                }
+            }
+            logger.info(f"Monitoring completed: {json.dumps(result['body'])}")
+            return result
+        documents = (documents or []) + listing_documents
         
-        # Process new documents
+        # Process new and revised documents
         new_documents = 0
+        updated_documents = 0
+        unchanged_documents = 0
         failed_downloads = 0
         
+        # The same link can appear several times on a page; fetch it once
+        unique_documents = []
+        seen_ids = set()
         for doc_info in documents:
-            if not tracker.is_document_processed(doc_info['document_id']):
-                if downloader.download_document(doc_info):
-                    tracker.mark_document_processed(doc_info)
-                    new_documents += 1
+            if doc_info['document_id'] not in seen_ids:
+                seen_ids.add(doc_info['document_id'])
+                unique_documents.append(doc_info)
+        tracked = tracker.get_tracked_documents(
+            [doc_info['document_id'] for doc_info in unique_documents]
+        )
+        for doc_info in unique_documents:
+            previous = tracked.get(doc_info['document_id'])
+            if previous:
+                # Revalidate known documents so revisions at the same URL are caught
+                doc_info['validators'] = {
+                    k: previous[k] for k in ('etag', 'last_modified') if previous.get(k)
+                }
+                doc_info['previous_sha256'] = previous.get('content_sha256')
+                doc_info['version'] = int(previous.get('version', 1)) + 1
+        
+        # Downloads run concurrently; tracking writes stay on this thread
+        for doc_info, downloaded in downloader.download_documents(unique_documents):
+            if not downloaded:
+                failed_downloads += 1
+            elif doc_info.get('not_modified'):
+                # Revalidated (304 or identical bytes): keep the tracked validators current
+                unchanged_documents += 1
+                tracker.refresh_validators(doc_info)
+            else:
+                tracker.mark_document_processed(doc_info)
+                if doc_info['document_id'] in tracked:
+                    updated_documents += 1
                 else:
-                    failed_downloads += 1
+                    new_documents += 1
+        
+        # Only remember the page version and crawl cursors once every document
+        # is stored, otherwise the next run would skip the failed downloads
+        if failed_downloads == 0:
+            tracker.save_page_validators(scraper.regulations_url, scraper.page_validators)
+            tracker.save_crawl_cursors(changed_cursors)
         
         # Prepare response
         result = {
@@ -244,6 +785,8 @@ def lambda_handler(event, context):
                 'message': 'MAS document monitoring completed',
                 'total_documents_found': len(documents),
                 'new_documents_downloaded': new_documents,
+                'updated_documents_downloaded': updated_documents,
+                'unchanged_documents': unchanged_documents,
                 'failed_downloads': failed_downloads,
                 'timestamp': datetime.utcnow().isoformat()
             }
@@ -1,18 +1,16 @@
 import json
-import boto3
+import aws_clients
 import logging
 from datetime import datetime
 import os
 from typing import Dict, List, Optional
-from opensearchpy import OpenSearch, RequestsHttpConnection
-from requests_aws4auth import AWS4Auth
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-bedrock_client = boto3.client('bedrock-runtime')
+bedrock_client = aws_clients.lazy_client('bedrock-runtime')
 
 # Environment variables
 OPENSEARCH_ENDPOINT = os.environ.get('OPENSEARCH_ENDPOINT')
@@ -23,25 +21,8 @@ class OpenSearchQueryService:
     """Service for querying OpenSearch with vector similarity"""
     
     def __init__(self):
-        # Set up authentication for OpenSearch Serverless
-        credentials = boto3.Session().get_credentials()
-        awsauth = AWS4Auth(
-            credentials.access_key,
-            credentials.secret_key,
-            AWS_REGION,
-            'aoss',
-            session_token=credentials.token
-        )
-        
-        # Initialize OpenSearch client
-        self.client = OpenSearch(
-            hosts=[{'host': OPENSEARCH_ENDPOINT.replace('https://', ''), 'port': 443}],
-            http_auth=awsauth,
-            use_ssl=True,
-            verify_certs=True,
-            connection_class=RequestsHttpConnection,
-            timeout=60
-        )
+        # Shared across warm invocations; signs with refreshable credentials
+        self.client = aws_clients.get_opensearch_client(OPENSEARCH_ENDPOINT, AWS_REGION)
         
         self.index_name = OPENSEARCH_INDEX
         self.bedrock_client = bedrock_client
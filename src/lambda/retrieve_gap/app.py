@@ -1,5 +1,5 @@
 import json
-import boto3
+import aws_clients
 import logging
 from datetime import datetime
 import os
@@ -10,7 +10,7 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
+dynamodb = aws_clients.lazy_resource('dynamodb')
 
 # Environment variables
 GAPS_TABLE_NAME = os.environ.get('GAPS_TABLE_NAME', 'CompliAgent-GapsTable')
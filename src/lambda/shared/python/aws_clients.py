@@ -0,0 +1,162 @@
+"""
+Shared registry of AWS and HTTP clients for the CompliAgent-SG Lambda handlers
+
+Deployed as a Lambda layer. Clients are created on first use and cached at
+module level, so warm invocations reuse keep-alive connections instead of
+rebuilding sessions and re-signing credentials on every call. boto3 and the
+HTTP libraries are only imported when a client is first needed, keeping them
+out of the init phase of code paths that never touch AWS.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger()
+
+_lock = threading.RLock()
+_boto_session = None
+_clients: Dict[tuple, object] = {}
+_resources: Dict[str, object] = {}
+_http_sessions: Dict[str, object] = {}
+_opensearch_clients: Dict[tuple, object] = {}
+
+def _get_boto_session():
+    """Get the process-wide boto3 session (must be called holding _lock)"""
+    global _boto_session
+    if _boto_session is None:
+        import boto3
+        _boto_session = boto3.session.Session()
+    return _boto_session
+
+def get_client(service_name: str, endpoint_url: Optional[str] = None, config=None):
+    """Get a cached boto3 client, creating it on first use
+
+    config (a botocore Config, or a dict of Config arguments) only applies
+    when the client is first created.
+    """
+    key = (service_name, endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                kwargs = {}
+                if endpoint_url:
+                    kwargs['endpoint_url'] = endpoint_url
+                if isinstance(config, dict):
+                    from botocore.config import Config
+                    config = Config(**config)
+                if config is not None:
+                    kwargs['config'] = config
+                client = _get_boto_session().client(service_name, **kwargs)
+                _clients[key] = client
+    return client
+
+def get_resource(service_name: str):
+    """Get a cached boto3 service resource, creating it on first use"""
+    resource = _resources.get(service_name)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(service_name)
+            if resource is None:
+                resource = _get_boto_session().resource(service_name)
+                _resources[service_name] = resource
+    return resource
+
+def get_http_session(name: str = 'default', headers: Optional[Dict] = None, pool_maxsize: int = 10):
+    """Get a cached requests.Session with a connection pool of pool_maxsize"""
+    session = _http_sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _http_sessions.get(name)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                session.headers.update(headers or {})
+                adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_sessions[name] = session
+    return session
+
+def get_opensearch_client(endpoint: str, region: str, service: str = 'aoss', timeout: int = 60):
+    """Get a cached OpenSearch client signed with refreshable SigV4 credentials
+
+    The signer re-reads the role credentials on each request, so a client
+    cached across warm invocations keeps working after the credentials rotate.
+    An http:// endpoint connects without TLS, for local stand-ins.
+    """
+    key = (endpoint, region, service)
+    client = _opensearch_clients.get(key)
+    if client is None:
+        with _lock:
+            client = _opensearch_clients.get(key)
+            if client is None:
+                from opensearchpy import OpenSearch, RequestsHttpConnection
+                from requests_aws4auth import AWS4Auth
+
+                awsauth = AWS4Auth(
+                    region=region,
+                    service=service,
+                    refreshable_credentials=_get_boto_session().get_credentials()
+                )
+                use_ssl = not endpoint.startswith('http://')
+                host = endpoint.replace('https://', '').replace('http://', '')
+                host, _, port = host.partition(':')
+                client = OpenSearch(
+                    hosts=[{'host': host, 'port': int(port) if port else (443 if use_ssl else 80)}],
+                    http_auth=awsauth,
+                    use_ssl=use_ssl,
+                    verify_certs=use_ssl,
+                    connection_class=RequestsHttpConnection,
+                    timeout=timeout
+                )
+                _opensearch_clients[key] = client
+    return client
+
+class _LazyProxy:
+    """Module-level stand-in that looks up the real object on each attribute access"""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+
+def lazy_client(service_name: str, endpoint_url: Optional[str] = None, config=None):
+    """Like get_client, but defers importing boto3 and creating the client until first use"""
+    return _LazyProxy(lambda: get_client(service_name, endpoint_url, config))
+
+def lazy_resource(service_name: str):
+    """Like get_resource, but defers importing boto3 and creating the resource until first use"""
+    return _LazyProxy(lambda: get_resource(service_name))
+
+def register_client(service_name: str, client, endpoint_url: Optional[str] = None):
+    """Pre-seed the registry with a client, e.g. an in-memory fake for local runs"""
+    with _lock:
+        _clients[(service_name, endpoint_url)] = client
+
+def register_resource(service_name: str, resource):
+    """Pre-seed the registry with a service resource"""
+    with _lock:
+        _resources[service_name] = resource
+
+def register_opensearch_client(endpoint: str, region: str, client, service: str = 'aoss'):
+    """Pre-seed the registry with an OpenSearch client"""
+    with _lock:
+        _opensearch_clients[(endpoint, region, service)] = client
+
+def reset():
+    """Drop every cached client, as a cold start would"""
+    global _boto_session
+    with _lock:
+        for session in _http_sessions.values():
+            session.close()
+        _boto_session = None
+        _clients.clear()
+        _resources.clear()
+        _http_sessions.clear()
+        _opensearch_clients.clear()
@@ -0,0 +1,199 @@
+"""
+Client-side rate limiting and retry for throttled AWS APIs
+
+A RateLimiter paces calls with a token bucket shared by every thread in the
+container, retries throttling errors with full-jitter exponential backoff
+and halves its rate on each throttle (recovering gradually on success), so
+throughput settles just under the account limit. Limiters built with
+retryable=is_retryable_error also retry transient failures (5xx responses,
+connection and read timeouts) with the same backoff, in place of the
+botocore retries their clients turn off, without slowing down for them.
+Limiters are registered by name and live for the lifetime of the container,
+like the clients in aws_clients.
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+THROTTLING_ERROR_CODES = frozenset([
+    'ThrottlingException',
+    'Throttling',
+    'ProvisionedThroughputExceededException',
+    'LimitExceededException',
+    'TooManyRequestsException',
+    'RequestLimitExceeded',
+    'SlowDown'
+])
+
+# Server-side failures worth another attempt; any 5xx response also counts
+TRANSIENT_ERROR_CODES = frozenset([
+    'InternalServerError',
+    'InternalServerException',
+    'InternalFailure',
+    'ServiceUnavailable',
+    'ServiceUnavailableException',
+    'RequestTimeout',
+    'RequestTimeoutException',
+    # Bedrock runtime: model invocation timed out or the model is still loading
+    'ModelTimeoutException',
+    'ModelNotReadyException'
+])
+
+# botocore.exceptions classes (and their subclasses) raised for dropped or
+# timed-out connections, matched by name to keep botocore out of init
+CONNECTION_ERROR_NAMES = frozenset(['ConnectionError', 'HTTPClientError'])
+
+_lock = threading.Lock()
+_limiters: Dict[str, 'RateLimiter'] = {}
+
+def is_throttling_error(error: Exception) -> bool:
+    """True for botocore ClientErrors whose code marks a throttle"""
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') in THROTTLING_ERROR_CODES
+
+def is_transient_error(error: Exception) -> bool:
+    """True for 5xx/transient error codes and connection or read timeouts"""
+    if any(cls.__name__ in CONNECTION_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    response = getattr(error, 'response', None) or {}
+    if response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES:
+        return True
+    return response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500
+
+def is_retryable_error(error: Exception) -> bool:
+    """True for throttles and transient failures"""
+    return is_throttling_error(error) or is_transient_error(error)
+
+class RateLimiter:
+    """Adaptive token-bucket limiter with jittered exponential backoff"""
+
+    def __init__(self, name: str, rate: float, burst: Optional[float] = None, max_attempts: int = 8,
+                 base_delay: float = 0.2, max_delay: float = 20.0, min_rate: Optional[float] = None,
+                 retryable: Callable[[Exception], bool] = is_throttling_error):
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate if min_rate is not None else max(self.max_rate / 16, 0.05)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats = self._empty_stats()
+
+    def _empty_stats(self) -> Dict:
+        return {'calls': 0, 'throttles': 0, 'transient_errors': 0, 'failures': 0,
+                'rate_limit_wait_s': 0.0, 'backoff_wait_s': 0.0}
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._stats['rate_limit_wait_s'] += waited
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Call func under the limiter, retrying retryable errors with full-jitter backoff"""
+        for attempt in range(1, self.max_attempts + 1):
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not self.retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                with self._lock:
+                    if is_throttling_error(e):
+                        self._stats['throttles'] += 1
+                        # Multiplicative decrease on every throttle
+                        self.rate = max(self.min_rate, self.rate / 2)
+                    else:
+                        # Server errors and timeouts say nothing about our rate
+                        self._stats['transient_errors'] += 1
+                    if attempt == self.max_attempts:
+                        self._stats['failures'] += 1
+                        raise
+                    self._stats['backoff_wait_s'] += delay
+                time.sleep(delay)
+                continue
+
+            with self._lock:
+                self._stats['calls'] += 1
+                # Additive increase back towards the configured rate
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+            return result
+
+    def stats(self, reset: bool = False) -> Dict:
+        """Counters since creation (or the last reset), plus the current rate"""
+        with self._lock:
+            stats = dict(self._stats, rate=self.rate)
+            if reset:
+                self._stats = self._empty_stats()
+        return stats
+
+def get_limiter(name: str, rate: float, **kwargs) -> RateLimiter:
+    """Get the container-wide limiter for name, creating it on first use"""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                limiter = RateLimiter(name, rate, **kwargs)
+                _limiters[name] = limiter
+    return limiter
+
+def emit_metrics(namespace: str, reset: bool = True):
+    """Print each limiter's counters as a CloudWatch embedded-metric-format record
+
+    EMF records must be bare JSON lines, so they go to stdout rather than
+    through the logging formatter.
+    """
+    for name, limiter in list(_limiters.items()):
+        stats = limiter.stats(reset=reset)
+        if not stats['calls'] and not stats['throttles'] and not stats['transient_errors']:
+            continue
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': namespace,
+                    'Dimensions': [['Operation']],
+                    'Metrics': [
+                        {'Name': 'Calls', 'Unit': 'Count'},
+                        {'Name': 'Throttles', 'Unit': 'Count'},
+                        {'Name': 'TransientErrors', 'Unit': 'Count'},
+                        {'Name': 'ThrottleFailures', 'Unit': 'Count'},
+                        {'Name': 'RateLimitWait', 'Unit': 'Milliseconds'},
+                        {'Name': 'BackoffWait', 'Unit': 'Milliseconds'}
+                    ]
+                }]
+            },
+            'Operation': name,
+            'Calls': stats['calls'],
+            'Throttles': stats['throttles'],
+            'TransientErrors': stats['transient_errors'],
+            'ThrottleFailures': stats['failures'],
+            'RateLimitWait': round(stats['rate_limit_wait_s'] * 1000, 1),
+            'BackoffWait': round(stats['backoff_wait_s'] * 1000, 1),
+            'CurrentRate': round(stats['rate'], 3)
+        }))
+
+def reset():
+    """Drop every limiter, as a cold start would"""
+    with _lock:
+        _limiters.clear()
@@ -1,24 +1,393 @@
 import json
-import boto3
+import aws_clients
+import throttling
+import gzip
+import hashlib
+import io
 import logging
 from datetime import datetime
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-import uuid
+from urllib.parse import unquote_plus
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-textract_client = boto3.client('textract')
-s3_client = boto3.client('s3')
-sns_client = boto3.client('sns')
+# Throttles and transient errors are retried by TextractProcessor._call_textract,
+# not botocore; total_max_attempts (unlike max_attempts) really means one attempt
+textract_client = aws_clients.lazy_client('textract', config={'retries': {'mode': 'standard', 'total_max_attempts': 1}})
+s3_client = aws_clients.lazy_client('s3')
+sns_client = aws_clients.lazy_client('sns')
+dynamodb = aws_clients.lazy_resource('dynamodb')
 
 # Environment variables
 PROCESSED_DOCS_BUCKET = os.environ.get('PROCESSED_DOCS_BUCKET')
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN')
 TEXTRACT_ROLE_ARN = os.environ.get('TEXTRACT_ROLE_ARN')
+TRACKING_TABLE = os.environ.get('TRACKING_TABLE')
+STREAM_TEXTRACT_RESULTS = os.environ.get('STREAM_TEXTRACT_RESULTS', 'true').lower() == 'true'
+BLOCK_PART_BYTES = int(os.environ.get('BLOCK_PART_BYTES', str(8 * 1024 * 1024)))
+COMPACT_OUTPUT = os.environ.get('COMPACT_OUTPUT', 'true').lower() == 'true'
+STORE_RAW_BLOCKS = os.environ.get('STORE_RAW_BLOCKS', 'true').lower() == 'true'
+PDF_TEXT_LAYER_FAST_PATH = os.environ.get('PDF_TEXT_LAYER_FAST_PATH', 'true').lower() == 'true'
+MIN_PAGE_TEXT_CHARS = int(os.environ.get('MIN_PAGE_TEXT_CHARS', '20'))
+MAX_TEXT_LAYER_OCR_PAGES = int(os.environ.get('MAX_TEXT_LAYER_OCR_PAGES', '10'))
+MAX_LOCAL_PDF_BYTES = int(os.environ.get('MAX_LOCAL_PDF_BYTES', str(64 * 1024 * 1024)))
+RECORD_CONCURRENCY = int(os.environ.get('RECORD_CONCURRENCY', '4'))
+IMAGE_BATCH_CONCURRENCY = int(os.environ.get('IMAGE_BATCH_CONCURRENCY', '8'))
+TEXTRACT_TPS = {
+    'start_document_analysis': float(os.environ.get('TEXTRACT_START_TPS', '2')),
+    'get_document_analysis': float(os.environ.get('TEXTRACT_GET_TPS', '5')),
+    'analyze_document': float(os.environ.get('TEXTRACT_ANALYZE_TPS', '2'))
+}
+TEXTRACT_MAX_ATTEMPTS = int(os.environ.get('TEXTRACT_MAX_ATTEMPTS', '8'))
+TEXTRACT_BACKOFF_BASE_MS = int(os.environ.get('TEXTRACT_BACKOFF_BASE_MS', '200'))
+TEXTRACT_BACKOFF_MAX_MS = int(os.environ.get('TEXTRACT_BACKOFF_MAX_MS', '20000'))
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'CompliAgent/Textract')
+TEXTRACT_COMPLETION_APIS = ('StartDocumentAnalysis', 'GetDocumentAnalysis')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# Written after the last page image of a scanned upload; the S3 notification
+# for it starts one batch over the images in its folder
+IMAGE_BATCH_MARKER = '_UPLOAD_COMPLETE'
+
+# Layout cues for section segmentation
+HEADING_PATTERN = re.compile(r'^(?i:PART|CHAPTER|ANNEX|APPENDIX|SCHEDULE|SECTION)\s+[A-Z0-9]+\b.*$')
+PARAGRAPH_NUMBER_PATTERN = re.compile(r'^(\d{1,2}(?:\.\d{1,3})+)\.?\s+\S')
+# "2 Definitions" heads a section, but "2 A bank shall take ..." opens paragraph 2
+TOP_LEVEL_NUMBER_PATTERN = re.compile(r'^(\d{1,2})\.?\s+[A-Z]')
+PAGE_FURNITURE_PATTERN = re.compile(r'^(?:page\s+)?\d{1,4}(?:\s+of\s+\d{1,4})?$', re.IGNORECASE)
+MAX_HEADING_CHARS = 100
+MAX_NUMBERED_HEADING_CHARS = 60
+HEADING_HEIGHT_RATIO = 1.25
+PAGE_MARGIN = 0.04
+
+def _to_ndjson(records: List[Dict]) -> bytes:
+    """Serialise records as newline-delimited compact JSON"""
+    return ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+
+def _put_gzip(s3_client, bucket: str, key: str, body: bytes, content_type: str):
+    """Store a gzip-compressed sidecar object"""
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=gzip.compress(body, compresslevel=6),
+        ContentType=content_type,
+        ContentEncoding='gzip'
+    )
+
+class TextractJobRegistry:
+    """Map versions of source objects to the Textract jobs analysing them
+    
+    Entries live in the tracking table under textract#<source_id> keys, or
+    in a per-container dict when no table is configured.
+    """
+    
+    _local_entries: Dict[str, Dict] = {}
+    _local_lock = threading.Lock()
+    
+    def __init__(self, table_name: Optional[str] = None):
+        self.table = dynamodb.Table(table_name) if table_name else None
+    
+    def _key(self, source_id: str) -> str:
+        return f"textract#{source_id}"
+    
+    def get(self, source_id: str) -> Optional[Dict]:
+        """Get the registered job for a source object version"""
+        if self.table is None:
+            with self._local_lock:
+                entry = self._local_entries.get(source_id)
+            return dict(entry) if entry else None
+        
+        response = self.table.get_item(Key={'document_id': self._key(source_id)}, ConsistentRead=True)
+        return response.get('Item')
+    
+    def record_submission(self, source_id: str, job_id: str, bucket: str, key: str, etag: str, attempt: int):
+        """Register a started job"""
+        entry = {
+            'document_id': self._key(source_id),
+            'job_id': job_id,
+            'source_bucket': bucket,
+            'source_key': key,
+            'etag': etag,
+            'attempt': attempt,
+            'status': 'IN_PROGRESS',
+            'submitted_at': datetime.utcnow().isoformat()
+        }
+        if self.table is None:
+            with self._local_lock:
+                self._local_entries[source_id] = entry
+        else:
+            self.table.put_item(Item=entry)
+    
+    def record_completion(self, source_id: str, status: str, output_location: str = ''):
+        """Mark a job COMPLETED or FAILED"""
+        completed_at = datetime.utcnow().isoformat()
+        if self.table is None:
+            with self._local_lock:
+                entry = self._local_entries.get(source_id)
+                if entry:
+                    entry.update({'status': status, 'output_location': output_location, 'completed_at': completed_at})
+            return
+        
+        self.table.update_item(
+            Key={'document_id': self._key(source_id)},
+            UpdateExpression='SET #s = :s, output_location = :o, completed_at = :c',
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={':s': status, ':o': output_location, ':c': completed_at}
+        )
+
+class SectionSegmenter:
+    """Split processed text into sections from LINE block layout in one pass
+    
+    A section is a numbered paragraph, or the unnumbered text under a
+    heading. Each carries its heading, paragraph number, page range and
+    character offsets into the processed text (the newline-joined LINE
+    text), so lines must be fed in the order they are joined. Running
+    headers, footers and page numbers are dropped from sections but still
+    advance the offsets. The first section under a heading starts at the
+    heading, so its text is part of the section.
+    
+    A short "N Title" line is a heading unless the next line continues it
+    in lower case, in which case it opens top-level paragraph N; it is held
+    until that line arrives, possibly on the next page.
+    """
+    
+    def __init__(self):
+        self.sections: List[Dict] = []
+        self.offset = 0
+        self.heading = ''
+        self.heading_start: Optional[int] = None
+        self.current: Optional[Dict] = None
+        self.held: Optional[tuple] = None
+    
+    def add_lines(self, line_blocks: List[Dict]):
+        """Consume the LINE blocks of one or more pages, in text order"""
+        # Mean line height per page, for spotting headings set in larger type
+        heights: Dict[int, List[float]] = {}
+        for block in line_blocks:
+            height = block.get('Geometry', {}).get('BoundingBox', {}).get('Height')
+            if height:
+                total = heights.setdefault(block.get('Page', 1), [0.0, 0])
+                total[0] += height
+                total[1] += 1
+        
+        for block in line_blocks:
+            page = block.get('Page', 1)
+            line = block.get('Text', '')
+            start = self.offset
+            self.offset += len(line) + 1
+            text = line.strip()
+            if not text:
+                continue
+            
+            kind = self._classify(text, block, heights.get(page))
+            if kind == 'furniture':
+                continue
+            if self.held:
+                held, self.held = self.held, None
+                self._add_line(*held, 'paragraph' if text[0].islower() else 'heading')
+            if kind == 'numbered':
+                self.held = (page, line, start)
+                continue
+            self._add_line(page, line, start, kind)
+    
+    def finish(self) -> List[Dict]:
+        """Close the open section and return every section in text order"""
+        if self.held:
+            held, self.held = self.held, None
+            self._add_line(*held, 'heading')
+        self._close()
+        return self.sections
+    
+    def _add_line(self, page: int, line: str, start: int, kind: str):
+        text = line.strip()
+        if kind == 'heading':
+            self._close()
+            self.heading = text
+            if self.heading_start is None:
+                self.heading_start = start
+            return
+        
+        match = PARAGRAPH_NUMBER_PATTERN.match(text)
+        if not match and kind == 'paragraph':
+            match = TOP_LEVEL_NUMBER_PATTERN.match(text)
+        if match or self.current is None:
+            self._close()
+            self.current = {
+                'heading': self.heading,
+                'paragraph_number': match.group(1) if match else None,
+                'page_start': page,
+                'page_end': page,
+                'start': start if self.heading_start is None else self.heading_start,
+                'end': start + len(line)
+            }
+            self.heading_start = None
+        else:
+            # Wrapped lines and (a)/(i) sub-items stay in their paragraph
+            self.current['page_end'] = page
+            self.current['end'] = start + len(line)
+    
+    def _close(self):
+        if self.current:
+            self.sections.append(self.current)
+            self.current = None
+    
+    def _classify(self, text: str, block: Dict, page_heights: Optional[List[float]]) -> str:
+        """Label a line as page furniture, a heading, body text, a top-level paragraph or numbered (either)"""
+        box = block.get('Geometry', {}).get('BoundingBox')
+        if PAGE_FURNITURE_PATTERN.match(text):
+            return 'furniture'
+        if box and (box.get('Top', 0.5) < PAGE_MARGIN
+                    or box.get('Top', 0.5) + box.get('Height', 0) > 1 - PAGE_MARGIN):
+            return 'furniture'
+        
+        if PARAGRAPH_NUMBER_PATTERN.match(text):
+            return 'body'
+        if TOP_LEVEL_NUMBER_PATTERN.match(text):
+            if len(text) > MAX_NUMBERED_HEADING_CHARS or re.search(r'[.;:]', text):
+                return 'paragraph'
+            return 'numbered'
+        if len(text) > MAX_HEADING_CHARS or text.endswith(('.', ',', ';', ':')):
+            return 'body'
+        if HEADING_PATTERN.match(text):
+            return 'heading'
+        letters = [c for c in text if c.isalpha()]
+        if len(letters) >= 4 and text.upper() == text:
+            return 'heading'
+        if box and page_heights and page_heights[1] > 1:
+            mean_height = page_heights[0] / page_heights[1]
+            if box.get('Height', 0) >= HEADING_HEIGHT_RATIO * mean_height:
+                return 'heading'
+        return 'body'
+
+class TextractResultStream:
+    """Consume Textract job results page by page without holding the whole job
+    
+    Raw blocks are dropped once their page is extracted; each page keeps only
+    its line layout, tables and forms. The document text and sections are
+    assembled in page order at the end, so a block arriving for a page that
+    was already extracted is merged into that page rather than appended.
+    """
+    
+    def __init__(self, s3_client, bucket: str, prefix: str, extract_page, part_bytes: int = BLOCK_PART_BYTES,
+                 store_blocks: bool = True, compress: bool = False):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.extract_page = extract_page
+        self.part_bytes = part_bytes
+        self.store_blocks = store_blocks
+        self.compress = compress
+        # Blocks of document pages that may still receive blocks
+        self.pending_pages: Dict[int, List[Dict]] = {}
+        # Extracted pages, and blocks that arrived after their page was extracted
+        self.pages: Dict[int, Dict] = {}
+        self.late_pages: Dict[int, List[Dict]] = {}
+        self.last_page = 1
+        self.part_lines: List[str] = []
+        self.part_size = 0
+        self.part_keys: List[str] = []
+    
+    def add_response(self, response: Dict):
+        """Buffer one get_document_analysis response and flush completed document pages"""
+        for block in response.get('Blocks', []):
+            page = block.get('Page', self.last_page)
+            self.last_page = max(self.last_page, page)
+            if page in self.pages:
+                if page not in self.late_pages:
+                    logger.warning(f"Block {block.get('Id')} arrived after page {page} was extracted; "
+                                   f"merging it at the end")
+                self.late_pages.setdefault(page, []).append(block)
+            else:
+                self.pending_pages.setdefault(page, []).append(block)
+        
+        # Textract returns blocks in page order and relationships never cross
+        # document pages, so every page before the latest one is complete
+        for page in sorted(p for p in self.pending_pages if p < self.last_page):
+            self._flush_page(page, self.pending_pages.pop(page))
+    
+    def finish(self) -> Dict:
+        """Flush remaining pages and blocks, returning the processed-data summary"""
+        for page in sorted(self.pending_pages):
+            self._flush_page(page, self.pending_pages[page])
+        self.pending_pages = {}
+        for page in sorted(self.late_pages):
+            self._flush_page(page, self.late_pages[page])
+        self.late_pages = {}
+        self._write_part()
+        
+        text_parts = []
+        tables = []
+        forms = []
+        segmenter = SectionSegmenter()
+        for page in sorted(self.pages):
+            lines = self.pages[page]['lines']
+            page_text = '\n'.join(line['Text'] for line in lines)
+            # Pages without text are left out of the joined document text
+            if page_text:
+                text_parts.append(page_text)
+                segmenter.add_lines(lines)
+            tables.extend(self.pages[page]['tables'])
+            forms.extend(self.pages[page]['forms'])
+        
+        return {
+            'text': '\n'.join(text_parts),
+            'tables': tables,
+            'forms': forms,
+            'sections': segmenter.finish(),
+            'page_count': len(self.pages),
+            'block_parts': [f"s3://{self.bucket}/{key}" for key in self.part_keys],
+            'extracted_at': datetime.utcnow().isoformat()
+        }
+    
+    def _flush_page(self, page: int, blocks: List[Dict]):
+        """Extract a page's blocks, merging them into the page if it was extracted before"""
+        page_data = self.extract_page({'Blocks': blocks}, SectionSegmenter())
+        extracted = self.pages.setdefault(page, {'lines': [], 'tables': [], 'forms': []})
+        extracted['lines'].extend(
+            {
+                'Text': block.get('Text', ''),
+                'Page': page,
+                'Geometry': {'BoundingBox': block.get('Geometry', {}).get('BoundingBox', {})}
+            }
+            for block in blocks if block['BlockType'] == 'LINE'
+        )
+        extracted['tables'].extend(page_data['tables'])
+        extracted['forms'].extend(page_data['forms'])
+        
+        if not self.store_blocks:
+            return
+        for block in blocks:
+            line = json.dumps(block, separators=(',', ':'))
+            self.part_lines.append(line)
+            self.part_size += len(line) + 1
+        if self.part_size >= self.part_bytes:
+            self._write_part()
+    
+    def _write_part(self):
+        if not self.part_lines:
+            return
+        # .ndjson parts do not match the textract-output/*.json vectorization trigger
+        key = f"{self.prefix}/blocks-{len(self.part_keys) + 1:05d}.ndjson"
+        body = ('\n'.join(self.part_lines) + '\n').encode('utf-8')
+        if self.compress:
+            key += '.gz'
+            _put_gzip(self.s3_client, self.bucket, key, body, 'application/x-ndjson')
+        else:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=body,
+                ContentType='application/x-ndjson'
+            )
+        self.part_keys.append(key)
+        self.part_lines = []
+        self.part_size = 0
 
 class TextractProcessor:
     """Process documents using Amazon Textract"""
@@ -27,33 +396,70 @@ class TextractProcessor:
         self.textract_client = textract_client
         self.s3_client = s3_client
         self.sns_client = sns_client
+        self.job_registry = TextractJobRegistry(TRACKING_TABLE)
     
-    def process_document(self, bucket: str, key: str) -> Dict:
+    def process_document(self, bucket: str, key: str, etag: Optional[str] = None) -> Dict:
         """Process document with Textract"""
         try:
             logger.info(f"Processing document: s3://{bucket}/{key}")
             
-            # Check if document is PDF or image
-            if key.lower().endswith('.pdf'):
-                return self._process_pdf_document(bucket, key)
-            elif key.lower().endswith(('.png', '.jpg', '.jpeg')):
-                return self._process_image_document(bucket, key)
-            else:
+            is_pdf = key.lower().endswith('.pdf')
+            if not is_pdf and not key.lower().endswith(IMAGE_EXTENSIONS):
                 logger.warning(f"Unsupported document type: {key}")
                 return {'error': 'Unsupported document type'}
+            
+            # Outputs are keyed by source version, so reprocessing is a no-op
+            if not etag:
+                etag = self.s3_client.head_object(Bucket=bucket, Key=key)['ETag']
+            etag = etag.strip('"')
+            source_id = self._source_id(bucket, key, etag)
+            output_key = self._output_key(source_id)
+            if self._output_exists(output_key):
+                logger.info(f"Output for s3://{bucket}/{key} already exists, skipping")
+                return {
+                    'status': 'COMPLETED',
+                    'document_location': f"s3://{bucket}/{key}",
+                    'output_location': f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}",
+                    'skipped': True
+                }
+            
+            # Check if document is PDF or image
+            if is_pdf:
+                return self._process_pdf_document(bucket, key, etag, source_id)
+            else:
+                return self._process_image_document(bucket, key, source_id)
                 
         except Exception as e:
             logger.error(f"Error processing document {key}: {str(e)}")
             raise
     
-    def _process_pdf_document(self, bucket: str, key: str) -> Dict:
+    def _process_pdf_document(self, bucket: str, key: str, etag: str, source_id: str) -> Dict:
         """Process PDF document asynchronously"""
+        if PDF_TEXT_LAYER_FAST_PATH:
+            result = self._process_pdf_text_layer(bucket, key, source_id)
+            if result is not None:
+                return result
+        
         try:
-            # Generate job ID
-            job_id = str(uuid.uuid4())
+            # Duplicate or retried events reuse the job already running (or done)
+            entry = self.job_registry.get(source_id)
+            if entry and entry.get('status') in ('IN_PROGRESS', 'COMPLETED'):
+                logger.info(f"Reusing Textract job {entry['job_id']} for {key}")
+                return {
+                    'job_id': entry['job_id'],
+                    'status': entry['status'],
+                    'document_location': f"s3://{bucket}/{key}",
+                    'output_location': entry.get('output_location', ''),
+                    'deduplicated': True
+                }
+            
+            # A failed job needs a fresh token, otherwise Textract returns it again
+            attempt = int(entry.get('attempt', 0)) + 1 if entry else 1
+            client_request_token = source_id if attempt == 1 else self._source_id(source_id, str(attempt))
             
             # Start async document analysis
-            response = self.textract_client.start_document_analysis(
+            response = self._call_textract(
+                'start_document_analysis',
                 DocumentLocation={
                     'S3Object': {
                         'Bucket': bucket,
@@ -65,15 +471,13 @@ class TextractProcessor:
                     'SNSTopicArn': SNS_TOPIC_ARN,
                     'RoleArn': TEXTRACT_ROLE_ARN
                 },
-                JobTag=json.dumps({
-                    'source_bucket': bucket,
-                    'source_key': key,
-                    'job_id': job_id,
-                    'started_at': datetime.utcnow().isoformat()
-                })
+                ClientRequestToken=client_request_token,
+                # Echoed back in the completion notification
+                JobTag=source_id
             )
             
             textract_job_id = response['JobId']
+            self.job_registry.record_submission(source_id, textract_job_id, bucket, key, etag, attempt)
             logger.info(f"Started Textract job {textract_job_id} for {key}")
             
             return {
@@ -87,11 +491,178 @@ class TextractProcessor:
             logger.error(f"Error starting Textract job for {key}: {str(e)}")
             raise
     
-    def _process_image_document(self, bucket: str, key: str) -> Dict:
+    def _call_textract(self, operation: str, **kwargs) -> Dict:
+        """Call a Textract API through its container-wide rate limiter
+        
+        Throttles, 5xx errors and connection/read timeouts are retried with
+        backoff; job submission carries a ClientRequestToken, so a retried
+        start never launches a second job.
+        """
+        limiter = throttling.get_limiter(
+            f"textract.{operation}",
+            TEXTRACT_TPS[operation],
+            max_attempts=TEXTRACT_MAX_ATTEMPTS,
+            base_delay=TEXTRACT_BACKOFF_BASE_MS / 1000,
+            max_delay=TEXTRACT_BACKOFF_MAX_MS / 1000,
+            retryable=throttling.is_retryable_error
+        )
+        return limiter.call(getattr(self.textract_client, operation), **kwargs)
+    
+    def _source_id(self, *parts: str) -> str:
+        """Stable ID for a source object version, valid as a Textract token and job tag"""
+        return hashlib.sha256('/'.join(parts).encode('utf-8')).hexdigest()
+    
+    def _output_key(self, source_id: str) -> str:
+        """Content-addressed key of the processed document for a source object version"""
+        return f"textract-output/{source_id}.json"
+    
+    def _output_exists(self, output_key: str) -> bool:
+        """Check whether a processed document has already been written"""
+        try:
+            self.s3_client.head_object(Bucket=PROCESSED_DOCS_BUCKET, Key=output_key)
+            return True
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+    
+    def _process_pdf_text_layer(self, bucket: str, key: str, source_id: str) -> Optional[Dict]:
+        """Extract a born-digital PDF from its embedded text layer
+        
+        Pages without usable text are sent to synchronous Textract one page at
+        a time. Returns None when the whole document should go to an async
+        Textract job instead (no pypdf, unreadable or oversized PDF, or too
+        many scanned pages).
+        """
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning("pypdf not available, skipping PDF text-layer fast path")
+            return None
+        
+        try:
+            response = self.s3_client.get_object(Bucket=bucket, Key=key)
+            if response.get('ContentLength', 0) > MAX_LOCAL_PDF_BYTES:
+                logger.info(f"{key} is too large for local text extraction")
+                return None
+            reader = PdfReader(io.BytesIO(response['Body'].read()))
+            page_texts = [self._page_text_layer(page) for page in reader.pages]
+        except Exception as e:
+            logger.warning(f"Could not read text layer of {key}, using Textract: {str(e)}")
+            return None
+        
+        ocr_pages = [index for index, text in enumerate(page_texts) if text is None]
+        if len(ocr_pages) > MAX_TEXT_LAYER_OCR_PAGES:
+            logger.info(f"{key} has {len(ocr_pages)} pages without a text layer, using Textract")
+            return None
+        
+        try:
+            processed_data = self._build_text_layer_data(reader, page_texts)
+        except Exception as e:
+            logger.warning(f"Per-page Textract failed for {key}, using async Textract: {str(e)}")
+            return None
+        
+        output_key = self._save_processed_data(bucket, key, processed_data, source_id)
+        logger.info(f"Extracted {key} from its text layer "
+                    f"({len(ocr_pages)} of {len(page_texts)} pages sent to Textract)")
+        
+        return {
+            'status': 'COMPLETED',
+            'document_location': f"s3://{bucket}/{key}",
+            'output_location': f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}",
+            'extraction_method': processed_data['extraction_method'],
+            'pages_sent_to_textract': len(ocr_pages),
+            'completed_at': datetime.utcnow().isoformat()
+        }
+    
+    def _page_text_layer(self, page) -> Optional[str]:
+        """Text of a PDF page, or None if the page looks scanned"""
+        text = page.extract_text() or ''
+        if sum(1 for char in text if char.isalnum()) >= MIN_PAGE_TEXT_CHARS:
+            return text
+        
+        # Little or no text: only worth OCR if the page draws images
+        resources = page.get('/Resources') or {}
+        return None if '/XObject' in resources else text
+    
+    def _build_text_layer_data(self, reader, page_texts: List[Optional[str]]) -> Dict:
+        """Build processed data in the Textract schema from text-layer and OCR pages"""
+        text_parts = []
+        blocks = []
+        tables = []
+        forms = []
+        segmenter = SectionSegmenter()
+        
+        for index, page_text in enumerate(page_texts):
+            page_number = index + 1
+            if page_text is None:
+                page_data = self._analyze_single_page(reader, index, segmenter)
+            else:
+                page_data = self._text_layer_page_data(page_text, page_number, segmenter)
+            
+            if page_data['text']:
+                text_parts.append(page_data['text'])
+            blocks.extend(page_data['blocks'])
+            tables.extend(page_data['tables'])
+            forms.extend(page_data['forms'])
+        
+        ocr_page_count = sum(1 for page_text in page_texts if page_text is None)
+        return {
+            'text': '\n'.join(text_parts),
+            'blocks': blocks,
+            'tables': tables,
+            'forms': forms,
+            'sections': segmenter.finish(),
+            'page_count': len(page_texts),
+            'extraction_method': 'pdf_text_layer+textract' if ocr_page_count else 'pdf_text_layer',
+            'extracted_at': datetime.utcnow().isoformat()
+        }
+    
+    def _text_layer_page_data(self, page_text: str, page_number: int, segmenter: SectionSegmenter) -> Dict:
+        """Represent a text-layer page as Textract-style PAGE and LINE blocks"""
+        lines = [line.strip() for line in page_text.splitlines() if line.strip()]
+        line_blocks = [
+            {
+                'Id': f"text-layer-{page_number}-{line_number}",
+                'BlockType': 'LINE',
+                'Text': line,
+                'Page': page_number
+            }
+            for line_number, line in enumerate(lines, start=1)
+        ]
+        page_block = {
+            'Id': f"text-layer-{page_number}",
+            'BlockType': 'PAGE',
+            'Page': page_number,
+            'Relationships': [{'Type': 'CHILD', 'Ids': [block['Id'] for block in line_blocks]}]
+        }
+        return self._extract_text_from_response({'Blocks': [page_block] + line_blocks}, segmenter)
+    
+    def _analyze_single_page(self, reader, index: int, segmenter: SectionSegmenter) -> Dict:
+        """Run synchronous Textract on one page of a PDF"""
+        from pypdf import PdfWriter
+        
+        writer = PdfWriter()
+        writer.add_page(reader.pages[index])
+        page_pdf = io.BytesIO()
+        writer.write(page_pdf)
+        
+        response = self._call_textract(
+            'analyze_document',
+            Document={'Bytes': page_pdf.getvalue()},
+            FeatureTypes=['TABLES', 'FORMS']
+        )
+        # Single-page responses number their page 1
+        for block in response.get('Blocks', []):
+            block['Page'] = index + 1
+        return self._extract_text_from_response(response, segmenter)
+    
+    def _process_image_document(self, bucket: str, key: str, source_id: str) -> Dict:
         """Process image document synchronously"""
         try:
             # For images, use synchronous processing
-            response = self.textract_client.analyze_document(
+            response = self._call_textract(
+                'analyze_document',
                 Document={
                     'S3Object': {
                         'Bucket': bucket,
@@ -105,7 +676,7 @@ class TextractProcessor:
             processed_data = self._extract_text_from_response(response)
             
             # Save processed data to S3
-            output_key = self._save_processed_data(bucket, key, processed_data)
+            output_key = self._save_processed_data(bucket, key, processed_data, source_id)
             
             return {
                 'status': 'COMPLETED',
@@ -118,40 +689,185 @@ class TextractProcessor:
             logger.error(f"Error processing image {key}: {str(e)}")
             raise
     
-    def process_textract_completion(self, job_id: str) -> Dict:
+    def process_image_batch(self, bucket: str, prefix: str, images: Optional[Dict[str, str]] = None) -> Dict:
+        """Analyze the page images of one upload concurrently into a single processed document
+        
+        images maps keys to ETags; without it every image under prefix is
+        part of the upload. Pages are ordered by key, with numbers compared
+        numerically so page-10 follows page-9. Pages that fail are listed in
+        failed_pages and the rest are saved as a partial document, keyed by
+        the images that succeeded, so a retry of the whole upload still runs.
+        """
+        try:
+            if images is None:
+                images = self._list_images(bucket, prefix)
+            images = {key: etag.strip('"') for key, etag in images.items()}
+            keys = sorted((key for key in images if key.lower().endswith(IMAGE_EXTENSIONS)), key=_natural_key)
+            if not keys:
+                logger.warning(f"No images found in s3://{bucket}/{prefix}")
+                return {'error': 'No images in upload'}
+            
+            # The upload's identity is the exact set of image versions in it
+            source_id = self._source_id(bucket, *(f"{key}@{images[key]}" for key in keys))
+            output_key = self._output_key(source_id)
+            upload_location = f"s3://{bucket}/{prefix}"
+            if self._output_exists(output_key):
+                logger.info(f"Output for {len(keys)} images in {upload_location} already exists, skipping")
+                return {
+                    'status': 'COMPLETED',
+                    'document_location': upload_location,
+                    'output_location': f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}",
+                    'skipped': True
+                }
+            
+            # Every worker shares the analyze_document limiter, so the pool
+            # only overlaps request latency and never exceeds the TPS limit
+            workers = max(1, min(IMAGE_BATCH_CONCURRENCY, len(keys)))
+            logger.info(f"Analyzing {len(keys)} images in {upload_location} with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                responses = list(executor.map(lambda key: self._analyze_image(bucket, key), keys))
+            
+            failed_pages = [
+                {'page': page, 'key': key, 'error': str(response)}
+                for page, (key, response) in enumerate(zip(keys, responses), start=1)
+                if isinstance(response, Exception)
+            ]
+            analyzed = [key for key, response in zip(keys, responses) if not isinstance(response, Exception)]
+            if not analyzed:
+                logger.error(f"All {len(keys)} images in {upload_location} failed: {failed_pages[0]['error']}")
+                return {'error': 'No images could be analyzed', 'failed_pages': failed_pages}
+            if failed_pages:
+                logger.error(f"{len(failed_pages)} of {len(keys)} images in {upload_location} failed")
+                source_id = self._source_id(bucket, *(f"{key}@{images[key]}" for key in analyzed))
+            
+            processed_data = self._combine_image_pages(
+                response for response in responses if not isinstance(response, Exception)
+            )
+            processed_data['source_images'] = [f"s3://{bucket}/{key}" for key in analyzed]
+            if failed_pages:
+                processed_data['failed_pages'] = failed_pages
+            output_key = self._save_processed_data(bucket, prefix, processed_data, source_id)
+            
+            result = {
+                'status': 'PARTIAL' if failed_pages else 'COMPLETED',
+                'document_location': upload_location,
+                'page_count': len(analyzed),
+                'output_location': f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}",
+                'completed_at': datetime.utcnow().isoformat()
+            }
+            if failed_pages:
+                result['failed_pages'] = failed_pages
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error processing image batch s3://{bucket}/{prefix}: {str(e)}")
+            raise
+    
+    def _analyze_image(self, bucket: str, key: str):
+        """AnalyzeDocument response for one page image, or the exception it raised"""
+        try:
+            return self._call_textract(
+                'analyze_document',
+                Document={'S3Object': {'Bucket': bucket, 'Name': key}},
+                FeatureTypes=['TABLES', 'FORMS']
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing image s3://{bucket}/{key}: {str(e)}")
+            return e
+    
+    def _list_images(self, bucket: str, prefix: str) -> Dict[str, str]:
+        """Map every image key under prefix to its ETag"""
+        images = {}
+        kwargs = {'Bucket': bucket, 'Prefix': prefix}
+        while True:
+            response = self.s3_client.list_objects_v2(**kwargs)
+            for item in response.get('Contents', []):
+                if item['Key'].lower().endswith(IMAGE_EXTENSIONS):
+                    images[item['Key']] = item['ETag']
+            if not response.get('IsTruncated'):
+                return images
+            kwargs['ContinuationToken'] = response['NextContinuationToken']
+    
+    def _combine_image_pages(self, responses) -> Dict:
+        """Merge single-image Textract responses, in order, into one document"""
+        text_parts = []
+        blocks = []
+        tables = []
+        forms = []
+        segmenter = SectionSegmenter()
+        page_count = 0
+        
+        for page_number, response in enumerate(responses, start=1):
+            # Each image is page 1 of its own response
+            for block in response.get('Blocks', []):
+                block['Page'] = page_number
+            page_data = self._extract_text_from_response(response, segmenter)
+            if page_data['text']:
+                text_parts.append(page_data['text'])
+            blocks.extend(page_data['blocks'])
+            tables.extend(page_data['tables'])
+            forms.extend(page_data['forms'])
+            page_count = page_number
+        
+        return {
+            'text': '\n'.join(text_parts),
+            'blocks': blocks,
+            'tables': tables,
+            'forms': forms,
+            'sections': segmenter.finish(),
+            'page_count': page_count,
+            'extraction_method': 'textract_image_batch',
+            'extracted_at': datetime.utcnow().isoformat()
+        }
+    
+    def process_textract_completion(self, job_id: str, job_tag: Optional[str] = None) -> Dict:
         """Process completed Textract job"""
         try:
             logger.info(f"Processing completed Textract job: {job_id}")
             
+            # Jobs started here are tagged with their registry source ID
+            entry = self.job_registry.get(job_tag) if job_tag else None
+            source_id = job_tag if entry else None
+            output_key = self._output_key(source_id) if source_id else self._job_output_key(job_id)
+            
+            # Duplicate completion notifications find the output already written
+            if source_id and self._output_exists(output_key):
+                logger.info(f"Output for Textract job {job_id} already exists, skipping")
+                return {
+                    'job_id': job_id,
+                    'status': 'COMPLETED',
+                    'output_location': f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}",
+                    'skipped': True
+                }
+            
             # Get job results
-            response = self.textract_client.get_document_analysis(JobId=job_id)
+            response = self._call_textract('get_document_analysis', JobId=job_id)
             
             if response['JobStatus'] != 'SUCCEEDED':
                 logger.error(f"Textract job {job_id} failed: {response.get('StatusMessage', 'Unknown error')}")
+                if entry:
+                    self.job_registry.record_completion(job_tag, 'FAILED')
                 return {'error': f"Textract job failed: {response.get('StatusMessage', 'Unknown error')}"}
             
             # Extract text and metadata
-            processed_data = self._extract_text_from_response(response)
+            if STREAM_TEXTRACT_RESULTS:
+                processed_data = self._stream_job_results(job_id, response, output_key)
+            else:
+                processed_data = self._collect_job_results(job_id, response)
             
-            # Get additional pages if they exist
-            next_token = response.get('NextToken')
-            while next_token:
-                response = self.textract_client.get_document_analysis(
-                    JobId=job_id,
-                    NextToken=next_token
-                )
-                additional_data = self._extract_text_from_response(response)
-                processed_data['text'] += '\n' + additional_data['text']
-                processed_data['blocks'].extend(additional_data['blocks'])
-                next_token = response.get('NextToken')
+            if entry:
+                processed_data['source_document'] = f"s3://{entry['source_bucket']}/{entry['source_key']}"
             
             # Save processed data
-            output_key = self._save_processed_data_from_job(job_id, processed_data)
+            output_key = self._save_processed_data_from_job(job_id, processed_data, source_id)
+            output_location = f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}"
+            if entry:
+                self.job_registry.record_completion(job_tag, 'COMPLETED', output_location)
             
             return {
                 'job_id': job_id,
                 'status': 'COMPLETED',
-                'output_location': f"s3://{PROCESSED_DOCS_BUCKET}/{output_key}",
+                'output_location': output_location,
                 'completed_at': datetime.utcnow().isoformat()
             }
             
@@ -159,76 +875,174 @@ class TextractProcessor:
             logger.error(f"Error processing Textract completion for job {job_id}: {str(e)}")
             raise
     
-    def _extract_text_from_response(self, response: Dict) -> Dict:
-        """Extract text and structure from Textract response"""
+    def _collect_job_results(self, job_id: str, response: Dict) -> Dict:
+        """Load every result page into memory, then extract"""
+        # Relationships can point at blocks returned in a later page
+        blocks = list(response.get('Blocks', []))
+        next_token = response.get('NextToken')
+        while next_token:
+            response = self._call_textract(
+                'get_document_analysis',
+                JobId=job_id,
+                NextToken=next_token
+            )
+            blocks.extend(response.get('Blocks', []))
+            next_token = response.get('NextToken')
+        
+        return self._extract_text_from_response({'Blocks': blocks})
+    
+    def _stream_job_results(self, job_id: str, response: Dict, output_key: str) -> Dict:
+        """Process result pages as they arrive, writing raw blocks as NDJSON parts"""
+        stream = TextractResultStream(
+            self.s3_client,
+            PROCESSED_DOCS_BUCKET,
+            output_key[:-len('.json')],
+            self._extract_text_from_response,
+            store_blocks=STORE_RAW_BLOCKS or not COMPACT_OUTPUT,
+            compress=COMPACT_OUTPUT
+        )
+        
+        while True:
+            stream.add_response(response)
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
+            response = self._call_textract(
+                'get_document_analysis',
+                JobId=job_id,
+                NextToken=next_token
+            )
+        
+        processed_data = stream.finish()
+        logger.info(f"Streamed {processed_data['page_count']} pages of job {job_id} "
+                    f"into {len(processed_data['block_parts'])} block parts")
+        return processed_data
+    
+    def _extract_text_from_response(self, response: Dict, segmenter: Optional[SectionSegmenter] = None) -> Dict:
+        """Extract text and structure from Textract response
+        
+        Without a segmenter the response is a whole document and its sections
+        are returned; callers assembling a document page by page pass one
+        segmenter for every page and collect the sections at the end.
+        """
         blocks = response.get('Blocks', [])
         
+        # Index blocks by ID once so relationship lookups are O(1)
+        block_index = self._index_blocks(blocks)
+        
         # Extract text content
-        text_blocks = []
+        line_blocks = []
         tables = []
         forms = []
         
         for block in blocks:
             if block['BlockType'] == 'LINE':
-                text_blocks.append(block.get('Text', ''))
+                line_blocks.append(block)
             elif block['BlockType'] == 'TABLE':
-                tables.append(self._extract_table_data(block, blocks))
-            elif block['BlockType'] == 'KEY_VALUE_SET':
-                forms.append(self._extract_form_data(block, blocks))
+                tables.append(self._extract_table_data(block, block_index))
+            elif block['BlockType'] == 'KEY_VALUE_SET' and 'KEY' in block.get('EntityTypes', []):
+                # VALUE blocks are resolved through their KEY
+                forms.append(self._extract_form_data(block, block_index))
         
         # Combine all text
-        full_text = '\n'.join(text_blocks)
+        full_text = '\n'.join(block.get('Text', '') for block in line_blocks)
         
-        return {
+        # Pages without text are left out of the joined document text
+        document_segmenter = segmenter or SectionSegmenter()
+        if full_text:
+            document_segmenter.add_lines(line_blocks)
+        
+        processed_data = {
             'text': full_text,
             'blocks': blocks,
             'tables': tables,
             'forms': forms,
             'extracted_at': datetime.utcnow().isoformat()
         }
+        if segmenter is None:
+            processed_data['sections'] = document_segmenter.finish()
+        return processed_data
+    
+    def _index_blocks(self, blocks: List[Dict]) -> Dict[str, Dict]:
+        """Map block ID to block"""
+        return {block['Id']: block for block in blocks if 'Id' in block}
     
-    def _extract_table_data(self, table_block: Dict, all_blocks: List[Dict]) -> Dict:
-        """Extract table data from Textract blocks"""
-        # Simplified table extraction - can be enhanced
+    def _related_blocks(self, block: Dict, block_index: Dict[str, Dict], relationship_type: str) -> List[Dict]:
+        """Resolve a block's relationships of one type through the block index"""
+        related = []
+        for relationship in block.get('Relationships', []):
+            if relationship.get('Type') == relationship_type:
+                for block_id in relationship.get('Ids', []):
+                    related_block = block_index.get(block_id)
+                    if related_block is not None:
+                        related.append(related_block)
+        return related
+    
+    def _block_text(self, block: Dict, block_index: Dict[str, Dict]) -> str:
+        """Join the words (and selection marks) under a CELL or KEY_VALUE_SET block"""
+        parts = []
+        for child in self._related_blocks(block, block_index, 'CHILD'):
+            if child['BlockType'] == 'WORD':
+                parts.append(child.get('Text', ''))
+            elif child['BlockType'] == 'SELECTION_ELEMENT' and child.get('SelectionStatus') == 'SELECTED':
+                parts.append('[X]')
+        return ' '.join(parts)
+    
+    def _extract_table_data(self, table_block: Dict, block_index: Dict[str, Dict]) -> Dict:
+        """Extract table data from Textract blocks as a grid of cell text"""
+        cells = [
+            cell for cell in self._related_blocks(table_block, block_index, 'CHILD')
+            if cell['BlockType'] == 'CELL'
+        ]
+        row_count = max((cell.get('RowIndex', 0) for cell in cells), default=0)
+        column_count = max((cell.get('ColumnIndex', 0) for cell in cells), default=0)
+        
+        # RowIndex/ColumnIndex are 1-based
+        rows = [[''] * column_count for _ in range(row_count)]
+        for cell in cells:
+            row_index = cell.get('RowIndex', 0) - 1
+            column_index = cell.get('ColumnIndex', 0) - 1
+            if row_index >= 0 and column_index >= 0:
+                rows[row_index][column_index] = self._block_text(cell, block_index)
+        
         return {
             'id': table_block.get('Id'),
+            'page': table_block.get('Page', 1),
             'confidence': table_block.get('Confidence', 0),
-            'geometry': table_block.get('Geometry', {})
+            'geometry': table_block.get('Geometry', {}),
+            'row_count': row_count,
+            'column_count': column_count,
+            'rows': rows
         }
     
-    def _extract_form_data(self, form_block: Dict, all_blocks: List[Dict]) -> Dict:
-        """Extract form data from Textract blocks"""
-        # Simplified form extraction - can be enhanced
+    def _extract_form_data(self, key_block: Dict, block_index: Dict[str, Dict]) -> Dict:
+        """Extract a key/value pair from a KEY block and its VALUE block"""
+        value_blocks = self._related_blocks(key_block, block_index, 'VALUE')
         return {
-            'id': form_block.get('Id'),
-            'confidence': form_block.get('Confidence', 0),
-            'geometry': form_block.get('Geometry', {})
+            'id': key_block.get('Id'),
+            'page': key_block.get('Page', 1),
+            'confidence': key_block.get('Confidence', 0),
+            'geometry': key_block.get('Geometry', {}),
+            'key': self._block_text(key_block, block_index),
+            'value': ' '.join(self._block_text(value_block, block_index) for value_block in value_blocks)
         }
     
-    def _save_processed_data(self, source_bucket: str, source_key: str, processed_data: Dict) -> str:
+    def _save_processed_data(self, source_bucket: str, source_key: str, processed_data: Dict, source_id: str) -> str:
         """Save processed data to S3"""
         try:
-            # Generate output key
-            timestamp = datetime.utcnow().strftime('%Y/%m/%d')
-            filename = source_key.split('/')[-1].split('.')[0]
-            output_key = f"textract-output/{timestamp}/{filename}.json"
+            output_key = self._output_key(source_id)
             
             # Add metadata
             processed_data['source_document'] = f"s3://{source_bucket}/{source_key}"
+            processed_data['content_id'] = source_id
             processed_data['processing_completed_at'] = datetime.utcnow().isoformat()
             
             # Save to S3
-            self.s3_client.put_object(
-                Bucket=PROCESSED_DOCS_BUCKET,
-                Key=output_key,
-                Body=json.dumps(processed_data, indent=2),
-                ContentType='application/json',
-                Metadata={
-                    'source_bucket': source_bucket,
-                    'source_key': source_key,
-                    'processed_at': datetime.utcnow().isoformat()
-                }
-            )
+            self._put_processed_output(output_key, processed_data, {
+                'source_bucket': source_bucket,
+                'source_key': source_key,
+                'processed_at': datetime.utcnow().isoformat()
+            })
             
             logger.info(f"Saved processed data to s3://{PROCESSED_DOCS_BUCKET}/{output_key}")
             return output_key
@@ -237,25 +1051,26 @@ class TextractProcessor:
             logger.error(f"Error saving processed data: {str(e)}")
             raise
     
-    def _save_processed_data_from_job(self, job_id: str, processed_data: Dict) -> str:
+    def _job_output_key(self, job_id: str) -> str:
+        """Output key for a job not started by this processor (no known source version)"""
+        return f"textract-output/jobs/{job_id}.json"
+    
+    def _save_processed_data_from_job(self, job_id: str, processed_data: Dict, source_id: Optional[str] = None) -> str:
         """Save processed data from Textract job"""
         try:
-            timestamp = datetime.utcnow().strftime('%Y/%m/%d')
-            output_key = f"textract-output/{timestamp}/{job_id}.json"
+            if source_id:
+                output_key = self._output_key(source_id)
+                processed_data['content_id'] = source_id
+            else:
+                output_key = self._job_output_key(job_id)
             
             processed_data['textract_job_id'] = job_id
             processed_data['processing_completed_at'] = datetime.utcnow().isoformat()
             
-            self.s3_client.put_object(
-                Bucket=PROCESSED_DOCS_BUCKET,
-                Key=output_key,
-                Body=json.dumps(processed_data, indent=2),
-                ContentType='application/json',
-                Metadata={
-                    'textract_job_id': job_id,
-                    'processed_at': datetime.utcnow().isoformat()
-                }
-            )
+            self._put_processed_output(output_key, processed_data, {
+                'textract_job_id': job_id,
+                'processed_at': datetime.utcnow().isoformat()
+            })
             
             logger.info(f"Saved processed data to s3://{PROCESSED_DOCS_BUCKET}/{output_key}")
             return output_key
@@ -263,6 +1078,118 @@ class TextractProcessor:
         except Exception as e:
             logger.error(f"Error saving processed data for job {job_id}: {str(e)}")
             raise
+    
+    def _put_processed_output(self, output_key: str, processed_data: Dict, metadata: Dict):
+        """Write the processed-document object, splitting out bulky parts in compact mode
+        
+        Compact mode keeps only text, sections and metadata in the .json
+        object that triggers vectorization. Tables and forms go to
+        <name>.structure.json.gz and raw blocks to <name>.blocks.ndjson.gz;
+        both are written first so they exist by the time the main object is
+        picked up.
+        """
+        if not COMPACT_OUTPUT:
+            self.s3_client.put_object(
+                Bucket=PROCESSED_DOCS_BUCKET,
+                Key=output_key,
+                Body=json.dumps(processed_data, indent=2),
+                ContentType='application/json',
+                Metadata=metadata
+            )
+            return
+        
+        base_key = output_key[:-len('.json')]
+        blocks = processed_data.pop('blocks', None)
+        if blocks is not None and STORE_RAW_BLOCKS:
+            blocks_key = f"{base_key}.blocks.ndjson.gz"
+            _put_gzip(self.s3_client, PROCESSED_DOCS_BUCKET, blocks_key, _to_ndjson(blocks), 'application/x-ndjson')
+            processed_data['blocks_location'] = f"s3://{PROCESSED_DOCS_BUCKET}/{blocks_key}"
+        
+        structure = {
+            'tables': processed_data.pop('tables', []),
+            'forms': processed_data.pop('forms', [])
+        }
+        structure_key = f"{base_key}.structure.json.gz"
+        _put_gzip(self.s3_client, PROCESSED_DOCS_BUCKET, structure_key,
+                  json.dumps(structure, separators=(',', ':')).encode('utf-8'), 'application/json')
+        processed_data['structure_location'] = f"s3://{PROCESSED_DOCS_BUCKET}/{structure_key}"
+        processed_data['table_count'] = len(structure['tables'])
+        processed_data['form_count'] = len(structure['forms'])
+        
+        self.s3_client.put_object(
+            Bucket=PROCESSED_DOCS_BUCKET,
+            Key=output_key,
+            Body=json.dumps(processed_data, separators=(',', ':')),
+            ContentType='application/json',
+            Metadata=metadata
+        )
+
+def _natural_key(key: str) -> List:
+    """Sort key comparing runs of digits as numbers"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', key)]
+
+def _route_record(processor: TextractProcessor, record: Dict) -> Dict:
+    """Dispatch one S3 upload or SNS Textract-completion record"""
+    if record.get('eventSource') == 'aws:s3':
+        bucket = record['s3']['bucket']['name']
+        # S3 event keys are URL-encoded
+        key = unquote_plus(record['s3']['object']['key'])
+        if key.rsplit('/', 1)[-1] == IMAGE_BATCH_MARKER:
+            prefix = key[:-len(IMAGE_BATCH_MARKER)]
+            result = processor.process_image_batch(bucket, prefix)
+            return {
+                'source': 'aws:s3',
+                'document_location': f"s3://{bucket}/{prefix}",
+                'status': 'error' if 'error' in result or result.get('failed_pages') else 'processed',
+                'result': result
+            }
+        result = processor.process_document(bucket, key, record['s3']['object'].get('eTag'))
+        return {
+            'source': 'aws:s3',
+            'document_location': f"s3://{bucket}/{key}",
+            'status': 'error' if 'error' in result else 'processed',
+            'result': result
+        }
+    
+    if record.get('EventSource') == 'aws:sns':
+        sns_message = json.loads(record['Sns']['Message'])
+        job_id = sns_message.get('JobId')
+        # Completion notifications name the Start* API that launched the job
+        if sns_message.get('API') not in TEXTRACT_COMPLETION_APIS or not job_id:
+            return {'source': 'aws:sns', 'status': 'skipped', 'reason': 'Not a Textract analysis completion'}
+        result = processor.process_textract_completion(job_id, sns_message.get('JobTag'))
+        return {
+            'source': 'aws:sns',
+            'job_id': job_id,
+            'status': 'error' if 'error' in result else 'processed',
+            'result': result
+        }
+    
+    return {
+        'source': record.get('eventSource') or record.get('EventSource'),
+        'status': 'skipped',
+        'reason': 'Unsupported record source'
+    }
+
+def _process_records(processor: TextractProcessor, records: List[Dict]) -> List[Dict]:
+    """Process independent records concurrently, returning one result per record in order"""
+    def process(indexed_record) -> Dict:
+        index, record = indexed_record
+        try:
+            result = _route_record(processor, record)
+        except Exception as e:
+            logger.error(f"Error processing record {index}: {str(e)}")
+            result = {
+                'source': record.get('eventSource') or record.get('EventSource'),
+                'status': 'error',
+                'error': str(e)
+            }
+        result['record_index'] = index
+        return result
+    
+    workers = max(1, min(RECORD_CONCURRENCY, len(records)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(process, enumerate(records)))
 
 def lambda_handler(event, context):
     """Main Lambda handler"""
@@ -271,47 +1198,43 @@ def lambda_handler(event, context):
         
         processor = TextractProcessor()
         
-        # Handle S3 event (new document uploaded)
+        # Handle S3 uploads and SNS Textract completions, in any mix
         if 'Records' in event:
-            results = []
-            for record in event['Records']:
-                if record.get('eventSource') == 'aws:s3':
-                    bucket = record['s3']['bucket']['name']
-                    key = record['s3']['object']['key']
-                    
-                    result = processor.process_document(bucket, key)
-                    results.append(result)
+            results = _process_records(processor, event['Records'])
+            failed = sum(1 for result in results if result['status'] == 'error')
+            processed = sum(1 for result in results if result['status'] == 'processed')
+            
+            if failed == 0:
+                status_code = 200
+            elif failed < len(results):
+                status_code = 207
+            else:
+                status_code = 500
             
             return {
-                'statusCode': 200,
+                'statusCode': status_code,
                 'body': {
-                    'message': 'Documents processed',
+                    'message': 'Records processed',
+                    'records_processed': processed,
+                    'records_skipped': len(results) - processed - failed,
+                    'records_failed': failed,
                     'results': results,
                     'timestamp': datetime.utcnow().isoformat()
                 }
             }
         
-        # Handle SNS notification (Textract job completion)
-        elif 'Records' in event and event['Records'][0].get('EventSource') == 'aws:sns':
-            sns_message = json.loads(event['Records'][0]['Sns']['Message'])
-            
-            if sns_message.get('API') == 'GetDocumentAnalysis':
-                job_id = sns_message.get('JobId')
-                if job_id:
-                    result = processor.process_textract_completion(job_id)
-                    
-                    return {
-                        'statusCode': 200,
-                        'body': {
-                            'message': 'Textract job processed',
-                            'result': result,
-                            'timestamp': datetime.utcnow().isoformat()
-                        }
-                    }
+        # Reprocess a bulk image upload without its marker: {"image_batch": {"bucket": ..., "prefix": ...}}
+        elif 'image_batch' in event:
+            batch = event['image_batch']
+            result = processor.process_image_batch(batch['bucket'], batch.get('prefix', ''), batch.get('images'))
+            return {
+                'statusCode': 400 if 'error' in result else 200,
+                'body': result
+            }
         
         # Handle direct invocation
         elif 'job_id' in event:
-            result = processor.process_textract_completion(event['job_id'])
+            result = processor.process_textract_completion(event['job_id'], event.get('job_tag'))
             return {
                 'statusCode': 200,
                 'body': result
@@ -336,3 +1259,7 @@ def lambda_handler(event, context):
                 'timestamp': datetime.utcnow().isoformat()
             }
         }
+    
+    finally:
+        # Throttle counts and time spent waiting on the Textract limiters
+        throttling.emit_metrics(METRICS_NAMESPACE)
@@ -1,113 +1,393 @@
 import json
-import boto3
+import aws_clients
+import throttling
+import gzip
 import logging
+import time
+from array import array
+from collections import OrderedDict
 from datetime import datetime
 import os
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import hashlib
 import re
-from opensearchpy import OpenSearch, RequestsHttpConnection
-from requests_aws4auth import AWS4Auth
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-bedrock_client = boto3.client('bedrock-runtime')
-s3_client = boto3.client('s3')
-
 # Environment variables
 OPENSEARCH_ENDPOINT = os.environ.get('OPENSEARCH_ENDPOINT')
 OPENSEARCH_INDEX = os.environ.get('OPENSEARCH_INDEX', 'documents')
 AWS_REGION = os.environ.get('AWS_REGION', 'us-east-1')
+EMBEDDING_MAX_IN_FLIGHT = int(os.environ.get('EMBEDDING_MAX_IN_FLIGHT', '8'))
+BEDROCK_EMBED_TPS = float(os.environ.get('BEDROCK_EMBED_TPS', '20'))
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get('BEDROCK_MAX_ATTEMPTS', '6'))
+BEDROCK_BACKOFF_BASE_MS = int(os.environ.get('BEDROCK_BACKOFF_BASE_MS', '200'))
+BEDROCK_BACKOFF_MAX_MS = int(os.environ.get('BEDROCK_BACKOFF_MAX_MS', '10000'))
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'CompliAgent/Vectorization')
+EMBEDDING_CACHE_TABLE = os.environ.get('EMBEDDING_CACHE_TABLE')
+TRACKING_TABLE = os.environ.get('TRACKING_TABLE')
+EMBEDDING_CACHE_SIZE = int(os.environ.get('EMBEDDING_CACHE_SIZE', '2048'))
+EMBEDDING_CACHE_TTL_DAYS = int(os.environ.get('EMBEDDING_CACHE_TTL_DAYS', '90'))
+INCREMENTAL_VECTORIZATION = os.environ.get('INCREMENTAL_VECTORIZATION', 'true').lower() == 'true'
+CHUNK_MAX_TOKENS = int(os.environ.get('CHUNK_MAX_TOKENS', '0'))
+CHUNK_OVERLAP = int(os.environ.get('CHUNK_OVERLAP', '0'))
+# Conservative for legal text, where numbers and section references split into short tokens
+CHUNK_CHARS_PER_TOKEN = float(os.environ.get('CHUNK_CHARS_PER_TOKEN', '3.0'))
+EMBEDDING_WINDOW = int(os.environ.get('EMBEDDING_WINDOW', '64'))
+OPENSEARCH_BULK_MAX_BYTES = int(os.environ.get('OPENSEARCH_BULK_MAX_BYTES', str(5 * 1024 * 1024)))
+
+# Sentences end at terminal punctuation followed by whitespace, not at the
+# point inside 2.1
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+(?=\s|$)')
+
+# MAS monitor stores each revision as <prefix>/YYYY/MM/DD/<id>-v<version>.<ext>;
+# the prefix and id identify the document across revisions
+VERSIONED_SOURCE_PATTERN = re.compile(r'^(?P<prefix>.*/)\d{4}/\d{2}/\d{2}/(?P<name>[^/]+?)-v\d+(?:\.[^./]+)?$')
+
+# Initialize AWS clients
+# Throttles and transient errors are retried by BedrockEmbeddings._invoke_model,
+# not botocore; the connection pool must fit every in-flight embedding request
+bedrock_client = aws_clients.lazy_client('bedrock-runtime', config={
+    'retries': {'mode': 'standard', 'total_max_attempts': 1},
+    'max_pool_connections': max(10, EMBEDDING_MAX_IN_FLIGHT)
+})
+s3_client = aws_clients.lazy_client('s3')
+dynamodb = aws_clients.lazy_resource('dynamodb')
+
+def load_processed_document(bucket: str, key: str) -> Optional[Dict]:
+    """Fetch the text-and-metadata object of a processed document
+    
+    Returns None for the .structure.json.gz / .ndjson(.gz) sidecars written
+    next to it, which vectorization never reads.
+    """
+    if not key.endswith('.json'):
+        logger.info(f"Skipping processed-document sidecar {key}")
+        return None
+    
+    response = s3_client.get_object(Bucket=bucket, Key=key)
+    body = response['Body'].read()
+    if response.get('ContentEncoding') == 'gzip':
+        body = gzip.decompress(body)
+    processed_doc_data = json.loads(body)
+    
+    # Outputs written before compact mode embed the raw Textract blocks
+    processed_doc_data.pop('blocks', None)
+    return processed_doc_data
 
 class TextChunker:
-    """Split text into chunks for vectorization"""
+    """Split text into chunks for vectorization
+    
+    Chunks are located as (start, end) offsets into the cleaned text and
+    sliced once, so building a chunk never copies the text before it. Sizes
+    are in characters, or in estimated tokens when max_tokens is set; the
+    overlap is in the same unit, a fifth of the chunk size by default, and
+    never more than half a chunk.
+    """
     
-    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
+    def __init__(self, chunk_size: int = 1000, overlap: Optional[int] = None, max_tokens: Optional[int] = None,
+                 chars_per_token: float = CHUNK_CHARS_PER_TOKEN):
         self.chunk_size = chunk_size
-        self.overlap = overlap
+        self.max_tokens = max_tokens
+        self.overlap = overlap if overlap is not None else (max_tokens or chunk_size) // 5
+        # Titan ships no local tokenizer; token budgets are converted to characters
+        if max_tokens:
+            self.max_chars = int(max_tokens * chars_per_token)
+            self.overlap_chars = int(self.overlap * chars_per_token)
+        else:
+            self.max_chars = chunk_size
+            self.overlap_chars = self.overlap
+        self.overlap_chars = min(self.overlap_chars, self.max_chars // 2)
     
     def chunk_text(self, text: str, metadata: Dict = None) -> List[Dict]:
         """Split text into overlapping chunks"""
+        chunks = list(self.iter_chunks(text, metadata))
+        logger.info(f"Split text into {len(chunks)} chunks")
+        return chunks
+    
+    def iter_chunks(self, text: str, metadata: Dict = None) -> Iterator[Dict]:
+        """Yield the chunks of chunk_text one at a time"""
         if not text or not text.strip():
-            return []
+            return
         
         # Clean and normalize text
         text = self._clean_text(text)
         
-        # Split into sentences for better chunking
-        sentences = self._split_into_sentences(text)
-        
-        chunks = []
-        current_chunk = ""
-        current_length = 0
+        for start, end in self._chunk_spans(text):
+            yield self._make_chunk(text[start:end], metadata)
+    
+    def chunk_sections(self, text: str, sections: List[Dict], metadata: Dict = None) -> List[Dict]:
+        """Split text into chunks along the sections found by the Textract processor"""
+        chunks = list(self.iter_section_chunks(text, sections, metadata))
+        logger.info(f"Split {len(sections)} sections into {len(chunks)} chunks")
+        return chunks
+    
+    def iter_section_chunks(self, text: str, sections: List[Dict], metadata: Dict = None) -> Iterator[Dict]:
+        """Yield the chunks of chunk_sections one at a time
         
-        for sentence in sentences:
-            sentence_length = len(sentence)
-            
-            # If adding this sentence would exceed chunk size, save current chunk
-            if current_length + sentence_length > self.chunk_size and current_chunk:
-                chunk_data = {
-                    'text': current_chunk.strip(),
-                    'chunk_id': self._generate_chunk_id(current_chunk),
-                    'length': current_length,
-                    'metadata': metadata or {}
-                }
-                chunks.append(chunk_data)
-                
-                # Start new chunk with overlap
-                overlap_text = self._get_overlap_text(current_chunk)
-                current_chunk = overlap_text + " " + sentence
-                current_length = len(current_chunk)
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
-                current_length += sentence_length
+        Consecutive paragraphs under the same heading are packed together up
+        to the chunk size. Chunks never span two headings, and overlap is only
+        used inside a section too long for a single chunk.
+        """
+        group = []
+        group_length = 0
         
-        # Add the last chunk
-        if current_chunk.strip():
-            chunk_data = {
-                'text': current_chunk.strip(),
-                'chunk_id': self._generate_chunk_id(current_chunk),
-                'length': current_length,
-                'metadata': metadata or {}
-            }
-            chunks.append(chunk_data)
+        for section in sections:
+            section_text = self._clean_text(text[section['start']:section['end']])
+            if not section_text:
+                continue
+            if group and (section['heading'] != group[0][0]['heading']
+                          or group_length + len(section_text) + 1 > self.max_chars):
+                yield from self._chunk_section_group(group, metadata)
+                group = []
+                group_length = 0
+            group.append((section, section_text))
+            group_length += len(section_text) + 1
         
-        logger.info(f"Split text into {len(chunks)} chunks")
-        return chunks
+        if group:
+            yield from self._chunk_section_group(group, metadata)
+    
+    def _chunk_section_group(self, group: List[tuple], metadata: Dict = None) -> List[Dict]:
+        """Chunk sections sharing a heading, tagging chunks with their position"""
+        sections = [section for section, _ in group]
+        section_metadata = {
+            **(metadata or {}),
+            'section_heading': sections[0]['heading'],
+            'paragraph_numbers': [s['paragraph_number'] for s in sections if s['paragraph_number']],
+            'page_start': min(s['page_start'] for s in sections),
+            'page_end': max(s['page_end'] for s in sections)
+        }
+        text = ' '.join(section_text for _, section_text in group)
+        if len(text) > self.max_chars:
+            # Only a single oversized section gets here
+            return list(self.iter_chunks(text, section_metadata))
+        return [self._make_chunk(text, section_metadata)]
+    
+    def _make_chunk(self, text: str, metadata: Dict = None) -> Dict:
+        return {
+            'text': text,
+            'chunk_id': self._generate_chunk_id(text),
+            'length': len(text),
+            'metadata': metadata or {}
+        }
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
         # Remove special characters but keep punctuation
         text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', ' ', text)
-        return text.strip()
+        # Remove extra whitespace, leaving single spaces between words
+        return ' '.join(text.split())
+    
+    def _chunk_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield the (start, end) offsets of each chunk of cleaned text
+        
+        Sentences are packed greedily up to max_chars. When a chunk closes,
+        the next one starts at the first word boundary within overlap_chars
+        of its end, found without looking further back than that.
+        """
+        chunk_start = chunk_end = None
+        for sentence_start, sentence_end in self._sentence_spans(text):
+            if chunk_start is None:
+                chunk_start = sentence_start
+            elif sentence_end - chunk_start > self.max_chars:
+                yield chunk_start, chunk_end
+                chunk_start = self._overlap_start(text, chunk_start, chunk_end)
+                if chunk_start is None or sentence_end - chunk_start > self.max_chars:
+                    chunk_start = sentence_start
+            chunk_end = sentence_end
+        
+        if chunk_start is not None:
+            yield chunk_start, chunk_end
+    
+    def _sentence_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield sentence offsets, splitting sentences longer than max_chars at spaces"""
+        start = 0
+        for match in SENTENCE_END_PATTERN.finditer(text):
+            yield from self._fit_span(text, start, match.end())
+            # Cleaned text has exactly one space between sentences
+            start = match.end() + 1
+        if start < len(text):
+            yield from self._fit_span(text, start, len(text))
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences"""
-        # Simple sentence splitting - can be enhanced with NLTK
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+    def _fit_span(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        while end - start > self.max_chars:
+            cut = text.rfind(' ', start, start + self.max_chars + 1)
+            if cut <= start:
+                cut = start + self.max_chars
+            yield start, cut
+            start = cut + 1 if text[cut] == ' ' else cut
+        yield start, end
     
-    def _get_overlap_text(self, text: str) -> str:
-        """Get overlap text from the end of current chunk"""
-        words = text.split()
-        overlap_words = words[-self.overlap//10:] if len(words) > self.overlap//10 else words
-        return " ".join(overlap_words)
+    def _overlap_start(self, text: str, chunk_start: int, chunk_end: int) -> Optional[int]:
+        """Start of the overlap carried from a chunk into the next one"""
+        if self.overlap_chars <= 0:
+            return None
+        space = text.find(' ', max(chunk_start, chunk_end - self.overlap_chars), chunk_end)
+        return space + 1 if space != -1 else None
     
     def _generate_chunk_id(self, text: str) -> str:
         """Generate unique ID for chunk"""
         return hashlib.md5(text.encode()).hexdigest()[:16]
 
+class VectorizationRegistry:
+    """Record which version of each document has been completely vectorized
+    
+    A version is recorded only after its chunks are indexed and the previous
+    version's leftovers deleted, so a run that stops part-way leaves the
+    document to be finished by the next attempt. Entries live in the
+    tracking table under vectorized#<document_id> keys, or in a
+    per-container dict when no table is configured.
+    """
+    
+    _local_entries: Dict[str, Dict] = {}
+    _local_lock = threading.Lock()
+    
+    def __init__(self, table_name: Optional[str] = TRACKING_TABLE):
+        self.table = dynamodb.Table(table_name) if table_name else None
+    
+    def _key(self, document_id: str) -> str:
+        return f"vectorized#{document_id}"
+    
+    def is_complete(self, document_id: str, content_id: str) -> bool:
+        """Check whether this version of a document was completely vectorized"""
+        if self.table is None:
+            with self._local_lock:
+                entry = self._local_entries.get(document_id)
+        else:
+            entry = self.table.get_item(Key={'document_id': self._key(document_id)}, ConsistentRead=True).get('Item')
+        return bool(entry) and entry.get('content_id') == content_id
+    
+    def record_completion(self, document_id: str, content_id: str, chunk_count: int):
+        """Mark a version of a document as completely vectorized"""
+        entry = {
+            'document_id': self._key(document_id),
+            'content_id': content_id,
+            'chunk_count': chunk_count,
+            'vectorized_at': datetime.utcnow().isoformat()
+        }
+        if self.table is None:
+            with self._local_lock:
+                self._local_entries[document_id] = entry
+        else:
+            self.table.put_item(Item=entry)
+
+class EmbeddingCache:
+    """Embeddings of previously seen text, keyed by model and text hash
+    
+    An in-process LRU shared by every invocation in the container sits in
+    front of an optional DynamoDB table shared by every container. Vectors
+    are kept as packed float32, a fraction of the size of a list of floats.
+    Table errors are logged and treated as misses.
+    """
+    
+    _memory: 'OrderedDict[str, bytes]' = OrderedDict()
+    _memory_lock = threading.Lock()
+    
+    def __init__(self, table_name: Optional[str] = EMBEDDING_CACHE_TABLE, max_entries: int = EMBEDDING_CACHE_SIZE):
+        self.table_name = table_name
+        self.max_entries = max_entries
+        self.stats = self._empty_stats()
+    
+    def _empty_stats(self) -> Dict:
+        return {'memory_hits': 0, 'table_hits': 0, 'misses': 0}
+    
+    def key(self, model_id: str, text: str) -> str:
+        """Cache key for text embedded by model_id"""
+        return f"{model_id}#{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Look keys up in memory, then in the table; returns the hits"""
+        found = {}
+        missing = []
+        with self._memory_lock:
+            for key in keys:
+                packed = self._memory.get(key)
+                if packed is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = packed
+        self.stats['memory_hits'] += len(found)
+        
+        if missing and self.table_name:
+            from_table = self._get_from_table(missing)
+            self.stats['table_hits'] += len(from_table)
+            self._remember(from_table)
+            found.update(from_table)
+        
+        self.stats['misses'] += len(keys) - len(found)
+        return {key: array('f', packed).tolist() for key, packed in found.items()}
+    
+    def put_many(self, embeddings: Dict[str, List[float]]):
+        """Store new embeddings in memory and in the table"""
+        packed = {key: array('f', embedding).tobytes() for key, embedding in embeddings.items()}
+        self._remember(packed)
+        if packed and self.table_name:
+            self._put_to_table(packed)
+    
+    def report(self, reset: bool = True) -> Dict:
+        """Hit counts and hit rate since creation (or the last reset)"""
+        stats = dict(self.stats)
+        lookups = stats['memory_hits'] + stats['table_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        if reset:
+            self.stats = self._empty_stats()
+        return stats
+    
+    def _remember(self, packed: Dict[str, bytes]):
+        if self.max_entries <= 0:
+            return
+        with self._memory_lock:
+            for key, value in packed.items():
+                self._memory[key] = value
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+    
+    def _get_from_table(self, keys: List[str]) -> Dict[str, bytes]:
+        found = {}
+        try:
+            # BatchGetItem takes at most 100 keys
+            for start in range(0, len(keys), 100):
+                request = {self.table_name: {
+                    'Keys': [{'cache_key': key} for key in keys[start:start + 100]],
+                    'ProjectionExpression': 'cache_key, embedding'
+                }}
+                for _ in range(3):
+                    response = dynamodb.batch_get_item(RequestItems=request)
+                    for item in response['Responses'].get(self.table_name, []):
+                        # The resource API wraps binary attributes in Binary
+                        found[item['cache_key']] = bytes(getattr(item['embedding'], 'value', item['embedding']))
+                    request = response.get('UnprocessedKeys')
+                    if not request:
+                        break
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {str(e)}")
+        return found
+    
+    def _put_to_table(self, packed: Dict[str, bytes]):
+        expires_at = int(time.time()) + EMBEDDING_CACHE_TTL_DAYS * 86400
+        try:
+            with dynamodb.Table(self.table_name).batch_writer() as batch:
+                for key, value in packed.items():
+                    batch.put_item(Item={'cache_key': key, 'embedding': value, 'expires_at': expires_at})
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {str(e)}")
+
 class BedrockEmbeddings:
     """Generate embeddings using Amazon Bedrock"""
     
-    def __init__(self):
+    def __init__(self, max_in_flight: int = EMBEDDING_MAX_IN_FLIGHT, cache: Optional[EmbeddingCache] = None):
         self.client = bedrock_client
         self.model_id = "amazon.titan-embed-text-v1"
+        self.max_in_flight = max_in_flight
+        self.cache = cache
+        # Shared by every batch, so overlapping batches together stay within max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight) if max_in_flight > 1 else None
     
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text"""
@@ -118,12 +398,7 @@ class BedrockEmbeddings:
             })
             
             # Call Bedrock
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=body,
-                contentType='application/json',
-                accept='application/json'
-            )
+            response = self._invoke_model(body)
             
             # Parse response
             response_body = json.loads(response['body'].read())
@@ -138,43 +413,75 @@ class BedrockEmbeddings:
             logger.error(f"Error generating embedding: {str(e)}")
             raise
     
+    def _invoke_model(self, body: str) -> Dict:
+        """Call Bedrock through the container-wide limiter, retrying throttles and transient errors"""
+        limiter = throttling.get_limiter(
+            'bedrock.invoke_model',
+            BEDROCK_EMBED_TPS,
+            max_attempts=BEDROCK_MAX_ATTEMPTS,
+            base_delay=BEDROCK_BACKOFF_BASE_MS / 1000,
+            max_delay=BEDROCK_BACKOFF_MAX_MS / 1000,
+            retryable=throttling.is_retryable_error
+        )
+        return limiter.call(
+            self.client.invoke_model,
+            modelId=self.model_id,
+            body=body,
+            contentType='application/json',
+            accept='application/json'
+        )
+    
     def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
-        embeddings = []
-        for text in texts:
-            embedding = self.generate_embedding(text)
-            embeddings.append(embedding)
-        return embeddings
+        """Generate embeddings for multiple texts, returned in input order
+        
+        With a cache, only distinct texts it has not seen go to Bedrock.
+        """
+        if self.cache is None:
+            return self._invoke_batch(texts)
+        
+        keys = [self.cache.key(self.model_id, text) for text in texts]
+        embeddings = self.cache.get_many(list(dict.fromkeys(keys)))
+        pending = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+        if pending:
+            fresh = dict(zip(pending, self._invoke_batch(list(pending.values()))))
+            self.cache.put_many(fresh)
+            embeddings.update(fresh)
+        return [embeddings[key] for key in keys]
+    
+    def _invoke_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with up to max_in_flight requests at once, in input order
+        
+        Each text is retried on its own when throttled; the first text that
+        still fails cancels the requests not yet started and is raised.
+        """
+        if self._executor is None or len(texts) <= 1:
+            return [self.generate_embedding(text) for text in texts]
+        
+        futures = [self._executor.submit(self.generate_embedding, text) for text in texts]
+        try:
+            return [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
 
 class OpenSearchVectorStore:
     """Store and search vectors in OpenSearch Serverless"""
     
+    # Indices already checked by this execution environment
+    _verified_indices = set()
+    
     def __init__(self):
-        # Set up authentication for OpenSearch Serverless
-        credentials = boto3.Session().get_credentials()
-        awsauth = AWS4Auth(
-            credentials.access_key,
-            credentials.secret_key,
-            AWS_REGION,
-            'aoss',
-            session_token=credentials.token
-        )
-        
-        # Initialize OpenSearch client
-        self.client = OpenSearch(
-            hosts=[{'host': OPENSEARCH_ENDPOINT.replace('https://', ''), 'port': 443}],
-            http_auth=awsauth,
-            use_ssl=True,
-            verify_certs=True,
-            connection_class=RequestsHttpConnection,
-            timeout=60
-        )
+        # Shared across warm invocations; signs with refreshable credentials
+        self.client = aws_clients.get_opensearch_client(OPENSEARCH_ENDPOINT, AWS_REGION)
         
         self.index_name = OPENSEARCH_INDEX
-        self._ensure_index_exists()
+        if self.index_name not in OpenSearchVectorStore._verified_indices:
+            self._ensure_index_exists()
+            OpenSearchVectorStore._verified_indices.add(self.index_name)
     
     def _ensure_index_exists(self):
-        """Create index if it doesn't exist"""
+        """Create index if it doesn't exist, or add mappings it predates"""
         try:
             if not self.client.indices.exists(index=self.index_name):
                 # Define index mapping for vector search
@@ -193,6 +500,7 @@ class OpenSearchVectorStore:
                             },
                             "chunk_id": {"type": "keyword"},
                             "document_id": {"type": "keyword"},
+                            "content_id": {"type": "keyword"},
                             "document_title": {"type": "text"},
                             "document_type": {"type": "keyword"},
                             "source_location": {"type": "keyword"},
@@ -210,62 +518,210 @@ class OpenSearchVectorStore:
                 
                 self.client.indices.create(index=self.index_name, body=mapping)
                 logger.info(f"Created OpenSearch index: {self.index_name}")
+            else:
+                self._ensure_content_id_mapping()
         
         except Exception as e:
             logger.error(f"Error ensuring index exists: {str(e)}")
             raise
     
-    def store_vectors(self, chunks: List[Dict], embeddings: List[List[float]], document_metadata: Dict):
-        """Store text chunks and their embeddings"""
+    def _ensure_content_id_mapping(self):
+        """Map content_id as a keyword in an index created before it was mapped
+        
+        An index that has already stored content IDs keeps the dynamic text
+        mapping it gave them; mappings of existing fields cannot change.
+        """
+        response = self.client.indices.get_mapping(index=self.index_name)
+        properties = next(iter(response.values()))['mappings'].get('properties', {})
+        if 'content_id' not in properties:
+            self.client.indices.put_mapping(index=self.index_name, body={
+                "properties": {"content_id": {"type": "keyword"}}
+            })
+            logger.info(f"Added content_id mapping to OpenSearch index: {self.index_name}")
+    
+    def existing_chunks(self, document_id: str, page_size: int = 1000) -> Dict[str, str]:
+        """Map the chunk IDs indexed for a document to their OpenSearch document IDs"""
+        existing = {}
+        query = {
+            "size": page_size,
+            "_source": ["chunk_id"],
+            "query": {"term": {"document_id": document_id}},
+            "sort": [{"chunk_id": "asc"}]
+        }
+        while True:
+            hits = self.client.search(index=self.index_name, body=query)['hits']['hits']
+            for hit in hits:
+                existing[hit['_source']['chunk_id']] = hit['_id']
+            if len(hits) < page_size:
+                return existing
+            query['search_after'] = hits[-1]['sort']
+    
+    def delete_chunks(self, vector_ids: List[str]) -> int:
+        """Delete indexed chunks by OpenSearch document ID"""
+        if not vector_ids:
+            return 0
         try:
-            documents = []
-            
-            for chunk, embedding in zip(chunks, embeddings):
-                doc = {
-                    "text": chunk['text'],
-                    "embedding": embedding,
-                    "chunk_id": chunk['chunk_id'],
-                    "document_id": document_metadata.get('document_id', ''),
-                    "document_title": document_metadata.get('title', ''),
-                    "document_type": document_metadata.get('type', ''),
-                    "source_location": document_metadata.get('source_location', ''),
-                    "created_at": datetime.utcnow().isoformat(),
-                    "metadata": {
-                        **chunk.get('metadata', {}),
-                        **document_metadata
-                    }
-                }
-                documents.append(doc)
-            
-            # Bulk index documents
-            bulk_body = []
-            for doc in documents:
-                bulk_body.append({"index": {"_index": self.index_name, "_id": doc['chunk_id']}})
-                bulk_body.append(doc)
-            
+            bulk_body = [{"delete": {"_index": self.index_name, "_id": vector_id}} for vector_id in vector_ids]
             response = self.client.bulk(body=bulk_body)
             
-            # Check for errors
+            deleted = len(vector_ids)
             if response.get('errors'):
-                logger.warning("Some documents failed to index")
                 for item in response['items']:
-                    if 'error' in item.get('index', {}):
-                        logger.error(f"Indexing error: {item['index']['error']}")
+                    error = item.get('delete', {}).get('error')
+                    # Already gone is as good as deleted
+                    if error and item['delete'].get('status') != 404:
+                        deleted -= 1
+                        logger.error(f"Delete error: {error}")
+            
+            logger.info(f"Deleted {deleted} stale document chunks from OpenSearch")
+            return deleted
+            
+        except Exception as e:
+            logger.error(f"Error deleting vectors: {str(e)}")
+            raise
+    
+    def _vector_id(self, document_id: str, chunk_id: str) -> str:
+        """Document-scoped ID, so identical text in two documents is indexed (and deleted) separately"""
+        return f"{document_id}_{chunk_id}"
+    
+    def _vector_document(self, chunk: Dict, embedding: List[float], document_metadata: Dict) -> Dict:
+        """OpenSearch source document for one chunk"""
+        return {
+            "text": chunk['text'],
+            "embedding": embedding,
+            "chunk_id": chunk['chunk_id'],
+            "document_id": document_metadata.get('document_id', ''),
+            "content_id": document_metadata.get('content_id', ''),
+            "document_title": document_metadata.get('title', ''),
+            "document_type": document_metadata.get('type', ''),
+            "source_location": document_metadata.get('source_location', ''),
+            "created_at": datetime.utcnow().isoformat(),
+            "metadata": {
+                **chunk.get('metadata', {}),
+                **document_metadata
+            }
+        }
+    
+    def bulk_indexer(self) -> 'BulkIndexer':
+        """Indexer sending chunks to this store in bounded bulk requests"""
+        return BulkIndexer(self)
+    
+    def store_vectors(self, chunks: List[Dict], embeddings: List[List[float]], document_metadata: Dict):
+        """Store text chunks and their embeddings"""
+        try:
+            with self.bulk_indexer() as indexer:
+                for chunk, embedding in zip(chunks, embeddings):
+                    indexer.add(chunk, embedding, document_metadata)
             
-            logger.info(f"Stored {len(documents)} document chunks in OpenSearch")
-            return len(documents)
+            logger.info(f"Stored {indexer.indexed} document chunks in OpenSearch")
+            return indexer.indexed
             
         except Exception as e:
             logger.error(f"Error storing vectors: {str(e)}")
             raise
 
+class BulkIndexer:
+    """Index chunks in OpenSearch bulk requests of bounded size
+    
+    Documents are serialized as they are added, so a buffered chunk costs
+    its JSON rather than a list of floats. A full buffer is sent on a
+    background thread while the caller carries on; only one request is in
+    flight, and a failed request is raised by the next flush or on exit.
+    """
+    
+    def __init__(self, store: OpenSearchVectorStore, max_bytes: int = OPENSEARCH_BULK_MAX_BYTES):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.indexed = 0
+        self.updated = 0
+        self.requests = 0
+        self._lines = []
+        self._size = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._in_flight = None
+    
+    def __enter__(self) -> 'BulkIndexer':
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                self._flush()
+                self._wait()
+        finally:
+            self._executor.shutdown(wait=True)
+        return False
+    
+    def add(self, chunk: Dict, embedding: List[float], document_metadata: Dict):
+        """Buffer one chunk, sending the buffer first if the chunk would overfill it"""
+        document = self.store._vector_document(chunk, embedding, document_metadata)
+        self._buffer("index", self.store._vector_id(document['document_id'], document['chunk_id']), document)
+    
+    def update(self, chunk: Dict, document_metadata: Dict, vector_id: str):
+        """Buffer a partial update bringing an indexed chunk's metadata up to date
+        
+        vector_id is the chunk's OpenSearch document ID as indexed, which for
+        vectors older than document-scoped IDs is the bare chunk ID. The
+        text, embedding and creation time stay as indexed.
+        """
+        document = self.store._vector_document(chunk, None, document_metadata)
+        for field in ("text", "embedding", "created_at"):
+            del document[field]
+        self._buffer("update", vector_id, {"doc": document})
+    
+    def _buffer(self, operation: str, vector_id: str, source: Dict):
+        action = json.dumps({operation: {"_index": self.store.index_name, "_id": vector_id}})
+        source = json.dumps(source)
+        size = len(action) + len(source) + 2
+        
+        if self._lines and self._size + size > self.max_bytes:
+            self._flush()
+        self._lines.extend((action, source))
+        self._size += size
+    
+    def _flush(self):
+        """Send the buffered chunks once the previous request has finished"""
+        if not self._lines:
+            return
+        body = '\n'.join(self._lines) + '\n'
+        self._lines = []
+        self._size = 0
+        
+        self._wait()
+        self._in_flight = self._executor.submit(self._send, body)
+    
+    def _wait(self):
+        if self._in_flight is not None:
+            future, self._in_flight = self._in_flight, None
+            done = future.result()
+            self.indexed += done['index']
+            self.updated += done['update']
+    
+    def _send(self, body: str) -> Dict[str, int]:
+        """Send one bulk request, returning how many chunks were indexed and updated"""
+        response = self.store.client.bulk(body=body)
+        self.requests += 1
+        
+        # Check for errors
+        done = {'index': 0, 'update': 0}
+        if response.get('errors'):
+            logger.warning("Some documents failed to index")
+        for item in response['items']:
+            operation, result = next(iter(item.items()))
+            if 'error' in result:
+                logger.error(f"Indexing error: {result['error']}")
+            else:
+                done[operation] += 1
+        return done
+
 class DocumentVectorizer:
     """Main class for document vectorization"""
     
     def __init__(self):
-        self.chunker = TextChunker()
-        self.embeddings = BedrockEmbeddings()
+        self.chunker = TextChunker(overlap=CHUNK_OVERLAP or None, max_tokens=CHUNK_MAX_TOKENS or None)
+        self.embeddings = BedrockEmbeddings(cache=EmbeddingCache())
         self.vector_store = OpenSearchVectorStore()
+        self.registry = VectorizationRegistry()
     
     def vectorize_document(self, processed_doc_data: Dict) -> Dict:
         """Vectorize a processed document"""
@@ -280,29 +736,77 @@ class DocumentVectorizer:
             # Generate document metadata
             document_metadata = {
                 'document_id': self._generate_document_id(processed_doc_data),
-                'title': processed_doc_data.get('source_document', '').split('/')[-1],
+                'title': processed_doc_data.get('source_document', '').rstrip('/').split('/')[-1],
                 'type': 'regulatory_document',
                 'source_location': processed_doc_data.get('source_document', ''),
                 'processed_at': processed_doc_data.get('processing_completed_at', ''),
-                'textract_job_id': processed_doc_data.get('textract_job_id', '')
+                'textract_job_id': processed_doc_data.get('textract_job_id', ''),
+                'content_id': processed_doc_data.get('content_id', '')
             }
             
-            # Chunk the text
-            chunks = self.chunker.chunk_text(text, document_metadata)
-            if not chunks:
+            # Reprocessing a completely vectorized source version is a no-op
+            content_id = document_metadata['content_id']
+            if content_id and self.registry.is_complete(document_metadata['document_id'], content_id):
+                logger.info(f"Document {document_metadata['document_id']} version {content_id} already vectorized")
+                return {
+                    'document_id': document_metadata['document_id'],
+                    'chunks_created': 0,
+                    'vectors_stored': 0,
+                    'vectorization_completed_at': datetime.utcnow().isoformat(),
+                    'status': 'skipped'
+                }
+            
+            # Only chunks not already indexed for this document need work
+            if INCREMENTAL_VECTORIZATION:
+                existing = self.vector_store.existing_chunks(document_metadata['document_id'])
+            else:
+                existing = {}
+            
+            # Chunks are produced, embedded and indexed a window at a time; the
+            # next window is embedded while this one is serialized and sent
+            chunk_ids = []
+            chunks = self._iter_chunks(text, processed_doc_data.get('sections'), document_metadata)
+            with self.vector_store.bulk_indexer() as indexer:
+                # Unchanged chunks keep their embeddings but take this version's metadata
+                new_chunks = self._new_chunks(
+                    chunks, existing, chunk_ids,
+                    lambda chunk, vector_id: indexer.update(chunk, document_metadata, vector_id)
+                )
+                for window, embeddings in self._embedded_windows(new_chunks):
+                    for chunk, embedding in zip(window, embeddings):
+                        indexer.add(chunk, embedding, document_metadata)
+            if not chunk_ids:
                 raise ValueError("No chunks generated from document text")
+            stored_count = indexer.indexed
             
-            # Generate embeddings
-            texts = [chunk['text'] for chunk in chunks]
-            embeddings = self.embeddings.generate_embeddings_batch(texts)
+            # Removed chunks are dropped after the new ones are stored, so searches never see a gap
+            current_ids = set(chunk_ids)
+            removed_ids = [vector_id for chunk_id, vector_id in existing.items() if chunk_id not in current_ids]
+            unchanged_count = indexer.updated
+            deleted_count = self.vector_store.delete_chunks(removed_ids)
+            logger.info(f"Document {document_metadata['document_id']}: {stored_count} chunks indexed "
+                        f"in {indexer.requests} bulk requests, {unchanged_count} unchanged, {deleted_count} deleted")
             
-            # Store in vector database
-            stored_count = self.vector_store.store_vectors(chunks, embeddings, document_metadata)
+            # Only a version with every chunk in place and no leftovers is skipped next time
+            if stored_count + unchanged_count == len(current_ids) and deleted_count == len(removed_ids):
+                if content_id:
+                    self.registry.record_completion(document_metadata['document_id'], content_id, len(current_ids))
+            else:
+                logger.warning(f"Document {document_metadata['document_id']} is incomplete; "
+                               f"the next attempt will finish it")
+            
+            cache_stats = self.embeddings.cache.report()
+            logger.info(f"Embedding cache hit rate {cache_stats['hit_rate']:.1%} "
+                        f"({cache_stats['memory_hits']} memory, {cache_stats['table_hits']} table, "
+                        f"{cache_stats['misses']} misses)")
             
             result = {
                 'document_id': document_metadata['document_id'],
-                'chunks_created': len(chunks),
+                'chunks_created': len(chunk_ids),
                 'vectors_stored': stored_count,
+                'vectors_unchanged': unchanged_count,
+                'vectors_deleted': deleted_count,
+                'embedding_cache': cache_stats,
                 'vectorization_completed_at': datetime.utcnow().isoformat(),
                 'status': 'completed'
             }
@@ -314,15 +818,65 @@ class DocumentVectorizer:
             logger.error(f"Error vectorizing document: {str(e)}")
             raise
     
+    def _iter_chunks(self, text: str, sections: Optional[List[Dict]], document_metadata: Dict) -> Iterator[Dict]:
+        """Chunk on section boundaries when the processor found them"""
+        if sections:
+            return self.chunker.iter_section_chunks(text, sections, document_metadata)
+        return self.chunker.iter_chunks(text, document_metadata)
+    
+    def _new_chunks(self, chunks: Iterator[Dict], existing: Dict[str, str], chunk_ids: List[str],
+                    unchanged: Callable[[Dict, str], None]) -> Iterator[Dict]:
+        """Yield each distinct chunk not already indexed, recording every chunk ID seen
+        
+        Distinct chunks that are already indexed are passed to unchanged with
+        their OpenSearch document ID.
+        """
+        seen = set()
+        for chunk in chunks:
+            chunk_id = chunk['chunk_id']
+            chunk_ids.append(chunk_id)
+            if chunk_id in seen:
+                continue
+            seen.add(chunk_id)
+            if chunk_id in existing:
+                unchanged(chunk, existing[chunk_id])
+            else:
+                yield chunk
+    
+    def _embedded_windows(self, chunks: Iterator[Dict]) -> Iterator[Tuple[List[Dict], List[List[float]]]]:
+        """Yield windows of chunks with their embeddings, embedding one window ahead"""
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            pending = None
+            for window in self._windows(chunks, EMBEDDING_WINDOW):
+                future = prefetch.submit(self.embeddings.generate_embeddings_batch, [chunk['text'] for chunk in window])
+                if pending:
+                    yield pending[0], pending[1].result()
+                pending = (window, future)
+            if pending:
+                yield pending[0], pending[1].result()
+    
+    def _windows(self, items: Iterator, size: int) -> Iterator[List]:
+        """Group an iterator into lists of up to size items"""
+        iterator = iter(items)
+        while True:
+            window = list(islice(iterator, size))
+            if not window:
+                return
+            yield window
+    
     def _generate_document_id(self, processed_doc_data: Dict) -> str:
         """Generate unique document ID"""
         source = processed_doc_data.get('source_document', '')
         job_id = processed_doc_data.get('textract_job_id', '')
         
-        if job_id:
-            return f"doc_{job_id}"
-        else:
+        # Stable across revisions, so new versions replace rather than duplicate
+        match = VERSIONED_SOURCE_PATTERN.match(source)
+        if match:
+            source = match.group('prefix') + match.group('name')
+        if source:
             return f"doc_{hashlib.md5(source.encode()).hexdigest()[:16]}"
+        else:
+            return f"doc_{job_id}"
 
 def lambda_handler(event, context):
     """Main Lambda handler"""
@@ -341,8 +895,9 @@ def lambda_handler(event, context):
                     key = record['s3']['object']['key']
                     
                     # Download processed document data
-                    response = s3_client.get_object(Bucket=bucket, Key=key)
-                    processed_doc_data = json.loads(response['Body'].read())
+                    processed_doc_data = load_processed_document(bucket, key)
+                    if processed_doc_data is None:
+                        continue
                     
                     # Vectorize the document
                     result = vectorizer.vectorize_document(processed_doc_data)
@@ -384,3 +939,7 @@ def lambda_handler(event, context):
                 'timestamp': datetime.utcnow().isoformat()
             }
         }
+    
+    finally:
+        # Throttle counts and time spent waiting on the Bedrock limiter
+        throttling.emit_metrics(METRICS_NAMESPACE)
@@ -1,5 +1,5 @@
 import json
-import boto3
+import aws_clients
 import logging
 from datetime import datetime
 import os
@@ -10,8 +10,7 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-apigateway_client = boto3.client('apigatewaymanagementapi')
+dynamodb = aws_clients.lazy_resource('dynamodb')
 
 # Environment variables
 CONNECTIONS_TABLE_NAME = os.environ.get('CONNECTIONS_TABLE_NAME', 'CompliAgent-WebSocketConnections')
@@ -25,7 +24,7 @@ class WebSocketHandler:
         
         # Initialize API Gateway Management API client with endpoint
         if WEBSOCKET_API_ENDPOINT:
-            self.apigateway_client = boto3.client(
+            self.apigateway_client = aws_clients.get_client(
                 'apigatewaymanagementapi',
                 endpoint_url=WEBSOCKET_API_ENDPOINT
             )